@@ -0,0 +1,75 @@
+"""Client identification and disconnect handling for per-client requests"""
+
+import asyncio
+from typing import Awaitable, TypeVar
+from fastapi import Request
+from starlette.requests import HTTPConnection
+from app.services.metrics import metrics
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """The client went away before the response was ready"""
+
+
+def get_client_id(request: HTTPConnection) -> str:
+    """
+    Identify the client making a request (or opening a WebSocket)
+    
+    This is the key for rate limits and load shedding, so it is the remote
+    address: the X-Client-Id header is chosen by the caller, and a fresh
+    value per request would get a fresh token bucket every time. Behind a
+    reverse proxy, run uvicorn with --proxy-headers so this is the real
+    client address.
+    """
+    return request.client.host if request.client else "unknown"
+
+
+def get_client_label(request: HTTPConnection) -> str:
+    """
+    Tell apart sessions of one client, e.g. browser tabs sharing an address
+    
+    The X-Client-Id header, scoped to the remote address so a caller can
+    only ever affect its own sessions. Never use it as a limiting key.
+    """
+    client_id = get_client_id(request)
+    label = request.headers.get("x-client-id")
+    return f"{client_id}/{label}" if label else client_id
+
+
+async def run_until_disconnected(request: Request, work: Awaitable[T], poll_seconds: float) -> T:
+    """
+    Await `work`, cancelling it if the client disconnects first
+    
+    Args:
+        request: The incoming request to watch
+        work: Coroutine producing the response
+        poll_seconds: How often to check the connection
+        
+    Returns:
+        The result of `work`
+        
+    Raises:
+        ClientDisconnected: If the client disconnected and `work` was cancelled
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_seconds)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                break
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        # The client is gone; whatever the work ended with is discarded
+        pass
+    metrics.increment("requests.client_disconnected")
+    raise ClientDisconnected()
@@ -0,0 +1,57 @@
+"""ASGI middleware"""
+
+import random
+import time
+from app.config import settings
+from app.services.profiling import request_profiler
+
+
+class ProfilingMiddleware:
+    """
+    Captures a sampling profile of selected requests
+
+    A request is profiled when it carries `X-Profile: 1` and
+    `profiling_header_enabled` is set, or at random with probability
+    `profiling_sample_rate`. The profile's file name is returned in the
+    `X-Profile-Name` response header. Written as plain ASGI so it doesn't
+    interfere with disconnect detection or streaming.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _wanted(self, scope) -> bool:
+        if settings.profiling_header_enabled:
+            for name, value in scope.get("headers", []):
+                if name == b"x-profile" and value == b"1":
+                    return True
+        return settings.profiling_sample_rate > 0 and random.random() < settings.profiling_sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = request_profiler.start()
+        if sampler is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        label = f"{scope['method']}-{scope['path']}"
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                # The response is complete as far as our code is concerned
+                name = request_profiler.finish(sampler, label, time.perf_counter() - started)
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-name", name.encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            if not sampler.stopped:
+                # Failed before a response was started
+                request_profiler.finish(sampler, label, time.perf_counter() - started)
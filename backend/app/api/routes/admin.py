@@ -0,0 +1,102 @@
+"""Admin routes for diagnosing latency in production"""
+
+import asyncio
+import hmac
+import threading
+import time
+from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from app.config import settings
+from app.services.profiling import loop_lag_monitor, request_profiler
+from app.services.source_watch import source_watcher
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject requests without the admin token; everything is rejected until one is configured"""
+    if not settings.admin_token:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled (set ADMIN_TOKEN to enable them)"
+        )
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token"
+        )
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+# Upper bound on property ids accepted by /sources/changed
+MAX_CHANGED_IDS = 10_000
+
+
+@router.get("/profiles", summary="List recorded request profiles")
+async def list_profiles():
+    """
+    Sampling profiles written for requests sent with `X-Profile: 1` (when
+    `PROFILING_HEADER_ENABLED`) or sampled via `PROFILING_SAMPLE_RATE`.
+    """
+    return {
+        "directory": request_profiler.directory,
+        "profiles": request_profiler.list_profiles()
+    }
+
+
+@router.get("/profiles/{name}", summary="Download a request profile")
+async def get_profile(name: str):
+    """Collapsed-stack file, loadable in speedscope or flamegraph.pl"""
+    path = request_profiler.path_for(name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile not found: {name}"
+        )
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+
+@router.post("/profiles", summary="Profile the whole worker for a few seconds")
+async def capture_profile(seconds: float = Query(10.0, gt=0, le=120)):
+    """
+    Sample the event-loop thread for `seconds` regardless of which requests
+    are running, and write the result like a request profile.
+    """
+    sampler = request_profiler.start(threading.get_ident())
+    if sampler is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another profile is already running"
+        )
+    started = time.perf_counter()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        name = request_profiler.finish(sampler, "worker", time.perf_counter() - started)
+    return {"name": name, "samples": sampler.samples}
+
+
+@router.get("/loop-lag", summary="Event-loop lag and recent stalls")
+async def get_loop_lag():
+    """
+    Lag statistics from the loop monitor (`LOOP_LAG_MONITOR_ENABLED`), with
+    the stack that was blocking the loop for each recent stall.
+    """
+    return loop_lag_monitor.summary()
+
+
+@router.post("/sources/changed", summary="Check watched properties for source changes now")
+async def sources_changed(
+    property_ids: Optional[List[str]] = Body(None, embed=True, max_length=MAX_CHANGED_IDS)
+):
+    """
+    Tell the watcher that source data changed (e.g. right after an ingest)
+    instead of waiting for its next poll. Without `property_ids`, every
+    watched property is checked. Properties whose source records are
+    unchanged are not re-analyzed, and re-analyses run at most
+    `WATCH_MAX_CONCURRENT_ANALYSES` at a time, so repeated calls cannot
+    queue more LLM work than there are changed, watched properties.
+    Requires the admin token like every `/admin` route.
+    """
+    source_watcher.notify(property_ids)
+    return {"watched_properties": source_watcher.watched}
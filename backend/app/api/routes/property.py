@@ -1,14 +1,42 @@
 """Property analysis API routes"""
 
-from fastapi import APIRouter, HTTPException, status, Query
-from typing import List
-from app.models.property import PropertyAnalysis, PropertySearchResult
+import asyncio
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from fastapi import APIRouter, HTTPException, status, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Iterator, List, Literal, Optional, Tuple
+from app.models.property import (
+    AnalysisDiff,
+    AnalysisVersion,
+    ComparablesResult,
+    PropertyAnalysis,
+    PropertyHistory,
+    PropertySearchResult
+)
 from app.services.property_service import PropertyService
-from app.data import search_properties
+from app.services.comparables_service import ComparablesService
+from app.services.admission import AdmissionRejected, admission
+from app.services.analysis_cache import analysis_cache, cache_key
+from app.services.analysis_history import HistoryEntry, analysis_history, diff_analyses
+from app.services.deadline import Deadline
+from app.services.executor import offload
+from app.services.export import MEDIA_TYPES, ExportUnavailable, ExportWriter, build_schema, stream_export
+from app.services.cache_warming import access_tracker
+from app.services.metrics import metrics
+from app.services.prefetch import prefetcher
+from app.services.source_watch import Subscriber, source_watcher
+from app.api.clients import ClientDisconnected, get_client_id, get_client_label, run_until_disconnected
+from app.config import settings
+from app.data import get_property_by_id, search_properties
 
 router = APIRouter()
 
 
+def _search(query: str) -> List[PropertySearchResult]:
+    return [PropertySearchResult(**prop) for prop in search_properties(query)]
+
+
 @router.get(
     "/search",
     response_model=List[PropertySearchResult],
@@ -17,16 +45,28 @@ router = APIRouter()
     description="Search properties by address, city, or zip code"
 )
 async def search_for_properties(
-    q: str = Query("", description="Search query (address, city, or zip)")
+    request: Request,
+    q: str = Query("", description="Search query (address, city, or zip)"),
+    prefetch: Optional[bool] = Query(
+        None, description="Start background analysis of the top results (default from settings)"
+    )
 ):
     """
     Search for properties in the database.
     
-    Returns a list of properties matching the search query.
+    Returns a list of properties matching the search query. With prefetch,
+    source data for the top results (and optionally their full analysis) is
+    prepared in the background, since users usually open one of them next.
     """
+    admission.check_rate(get_client_id(request), "search")
     try:
-        results = search_properties(q)
-        return [PropertySearchResult(**prop) for prop in results]
+        # Scanning the catalog and building models is CPU-bound
+        results = await offload(_search, q)
+        for result in results:
+            access_tracker.record(result.id, weight=settings.search_access_weight)
+        if prefetch if prefetch is not None else settings.prefetch_enabled:
+            prefetcher.schedule(get_client_label(request), [result.id for result in results])
+        return results
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -34,6 +74,102 @@ async def search_for_properties(
         )
 
 
+def _stored_analyses(
+    since: Optional[datetime],
+    until: Optional[datetime],
+    latest_only: bool,
+    property_ids: Optional[List[str]]
+) -> Iterator[Tuple[PropertyAnalysis, HistoryEntry]]:
+    wanted = set(property_ids) if property_ids else None
+    for entry, analysis in analysis_history.scan(
+        since=since.timestamp() if since else None,
+        until=until.timestamp() if until else None,
+        latest_only=latest_only
+    ):
+        if wanted is None or analysis.property_id in wanted:
+            yield analysis, entry
+
+
+async def _fresh_export(property_ids: List[str], fmt: str, include_text: bool) -> AsyncIterator[bytes]:
+    # Flattening and Arrow/Parquet encoding run on the executor, like the
+    # history export's worker thread, so a full batch doesn't stall the loop
+    writer = await offload(ExportWriter, fmt, batch_size=settings.export_batch_size, include_text=include_text)
+    for property_id in property_ids:
+        try:
+            analysis = await analysis_cache.get_or_compute(
+                cache_key(property_id),
+                lambda pid=property_id: PropertyService().analyze_property(pid)
+            )
+        except Exception:
+            # The response has started; leave the property out rather than abort the stream
+            metrics.increment("export.failed")
+            continue
+        await offload(writer.add, analysis)
+        chunk = writer.drain()
+        if chunk:
+            yield chunk
+    await offload(writer.close)
+    yield writer.drain()
+
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    summary="Bulk export analyses as Arrow or Parquet",
+    description="Stream stored (or freshly computed) analyses as flattened, typed columns"
+)
+async def export_analyses(
+    request: Request,
+    fmt: Literal["arrow", "parquet"] = Query("parquet", alias="format", description="Arrow IPC stream or Parquet file"),
+    source: Literal["history", "fresh"] = Query(
+        "history", description="Stored analyses, or run the pipeline for the given properties"
+    ),
+    property_ids: Optional[List[str]] = Query(None, description="Restrict to these properties (required for fresh)"),
+    since: Optional[datetime] = Query(None, description="Earliest stored analysis time (inclusive)"),
+    until: Optional[datetime] = Query(None, description="Latest stored analysis time (inclusive)"),
+    all_versions: bool = Query(False, description="Export every stored version, not only the latest per property"),
+    include_text: bool = Query(False, description="Also export the analysis text and insights")
+):
+    """
+    Export analyses for analytics in one streamed response.
+    
+    Each analysis is one row with resolved values, per-field recommended
+    values, confidence and conflict flags as typed columns. Rows are
+    encoded in record batches of `EXPORT_BATCH_SIZE` and sent as each batch
+    is ready, so memory use does not grow with the export size.
+    """
+    admission.check_rate(get_client_id(request), "export")
+    try:
+        build_schema(include_text)
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    
+    if source == "fresh":
+        if not property_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="property_ids is required with source=fresh"
+            )
+        if len(property_ids) > settings.export_max_fresh:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.export_max_fresh} properties can be analyzed per export"
+            )
+        admission.check_queue()
+        body = _fresh_export(property_ids, fmt, include_text)
+    else:
+        # A sync iterator: Starlette runs it on a worker thread, off the event loop
+        body = stream_export(
+            _stored_analyses(since, until, not all_versions, property_ids),
+            fmt, settings.export_batch_size, include_text
+        )
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="analyses.{fmt}"'}
+    )
+
+
 @router.get(
     "/{property_id}/analyze",
     response_model=PropertyAnalysis,
@@ -41,7 +177,16 @@ async def search_for_properties(
     summary="Analyze property from multiple sources",
     description="Fetch data from multiple sources, resolve conflicts, and generate comprehensive analysis"
 )
-async def analyze_property(property_id: str):
+async def analyze_property(
+    property_id: str,
+    request: Request,
+    profile: Literal["full", "fast"] = Query(
+        "full", description="Pipeline profile: full (four LLM stages) or fast (two, for bulk screening)"
+    ),
+    deadline: Optional[float] = Query(
+        None, gt=0, description="Time budget in seconds (default and cap from settings)"
+    )
+):
     """
     Analyze property information from multiple data sources.
     
@@ -51,17 +196,328 @@ async def analyze_property(property_id: str):
     3. Uses AI to resolve conflicts and determine reliable values
     4. Generates comprehensive analysis with data quality assessment
     5. Provides actionable insights and recommendations
+    
+    The fast profile fuses the summary, analysis and insights stages into
+    one generation and returns a shorter analysis.
+    
+    Results are cached per profile; popular properties may be served from
+    analyses pre-computed in the background.
+    
+    Stages that would overrun the deadline fall back to deterministic
+    results and are listed in `degraded_stages`. Degraded analyses are not
+    cached.
+    
+    Requests are rate limited per client, and new analyses are refused with
+    429 and Retry-After while the estimated queue wait is too long.
+    
+    If the client disconnects, the remaining LLM stages are cancelled unless
+    another request is waiting for the same analysis or the property is
+    popular enough that the cached result will likely be read.
+    """
+    
+    # Start the clock before anything else so the budget covers the whole request
+    budget = Deadline(min(
+        deadline or settings.analysis_deadline_seconds,
+        settings.analysis_max_deadline_seconds
+    ))
+    client_id = get_client_id(request)
+    key = cache_key(property_id, profile)
+    
+    # Cached or already-running analyses add no LLM load, so they're cheap
+    needs_llm = analysis_cache.get_entry(key) is None and not analysis_cache.is_inflight(key)
+    if needs_llm:
+        admission.check_queue()
+    admission.check_rate(client_id, "analyze" if needs_llm else "cached")
+    
+    access_tracker.record(property_id)
+    prefetcher.on_selected(get_client_label(request), property_id)
+    
+    # Popular properties are worth finishing for the cache even if this client leaves
+    cancellable = (
+        settings.cancel_on_disconnect
+        and access_tracker.score(property_id) < settings.warm_min_score
+    )
+    try:
+        work = analysis_cache.get_or_compute(
+            key,
+            lambda: PropertyService().analyze_property(property_id, profile=profile, deadline=budget),
+            cancel_if_abandoned=cancellable
+        )
+        with admission.track() if needs_llm else nullcontext():
+            if not settings.cancel_on_disconnect:
+                return await work
+            return await run_until_disconnected(request, work, settings.disconnect_poll_seconds)
+    except ClientDisconnected:
+        # Nobody will read the response; 499 is the conventional "client closed request"
+        raise HTTPException(status_code=499, detail="Client disconnected")
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.get(
+    "/{property_id}/comparables",
+    response_model=ComparablesResult,
+    status_code=status.HTTP_200_OK,
+    summary="Find comparable properties",
+    description="Return the nearest properties (optionally within a radius) with price-per-sqft, size and age statistics"
+)
+async def get_comparables(
+    property_id: str,
+    k: int = Query(5, ge=1, le=100, description="Maximum number of comparables"),
+    radius_km: Optional[float] = Query(None, gt=0, description="Search radius in kilometres")
+):
+    """
+    Find comparable properties near the given property.
+    
+    Statistics are computed from deterministically resolved source values,
+    so no LLM call is made.
+    """
+    try:
+        result = await offload(ComparablesService().get_comparables, property_id, k=k, radius_km=radius_km)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Property not found: {property_id}"
+        )
+    return result
+
+
+def _to_version(entry: HistoryEntry) -> AnalysisVersion:
+    return AnalysisVersion(
+        version=entry.timestamp_us,
+        recorded_at=datetime.fromtimestamp(entry.timestamp_us / 1_000_000, tz=timezone.utc),
+        confidence_score=round(entry.confidence, 4),  # stored as float32
+        source_fingerprint=f"{entry.fingerprint:016x}"
+    )
+
+
+def _history_not_found(property_id: str, version: Optional[int] = None) -> HTTPException:
+    detail = f"No stored analysis for property: {property_id}"
+    if version is not None:
+        detail = f"No stored analysis version {version} for property: {property_id}"
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+
+@router.get(
+    "/{property_id}/history",
+    response_model=PropertyHistory,
+    status_code=status.HTTP_200_OK,
+    summary="List stored analyses of a property",
+    description="Versions recorded within a time range, with their confidence scores, oldest first"
+)
+async def get_property_history(
+    property_id: str,
+    since: Optional[datetime] = Query(None, description="Earliest analysis time (inclusive)"),
+    until: Optional[datetime] = Query(None, description="Latest analysis time (inclusive)"),
+    limit: int = Query(100, ge=1, le=10_000, description="Return at most this many of the most recent versions")
+):
     """
+    List a property's analysis history.
     
+    Answered from the history index alone, so confidence trends over long
+    ranges don't load any stored analysis.
+    """
     try:
-        service = PropertyService()
-        result = await service.analyze_property(property_id)
-        return result
+        entries = await offload(
+            analysis_history.entries,
+            property_id,
+            since=since.timestamp() if since else None,
+            until=until.timestamp() if until else None,
+            limit=limit
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+    return PropertyHistory(property_id=property_id, versions=[_to_version(entry) for entry in entries])
+
+
+@router.get(
+    "/{property_id}/history/latest",
+    response_model=PropertyAnalysis,
+    status_code=status.HTTP_200_OK,
+    summary="Most recent stored analysis",
+    description="Return the last recorded analysis without running the pipeline"
+)
+async def get_latest_analysis(property_id: str):
+    """Get the most recent stored analysis of a property."""
+    try:
+        stored = await offload(analysis_history.latest, property_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    if stored is None:
+        raise _history_not_found(property_id)
+    return stored[1]
+
+
+@router.get(
+    "/{property_id}/history/diff",
+    response_model=AnalysisDiff,
+    status_code=status.HTTP_200_OK,
+    summary="Compare two stored analyses",
+    description="Changed fields between two versions (default: the latest and the one before it)"
+)
+async def diff_analysis_versions(
+    property_id: str,
+    from_version: Optional[int] = Query(None, description="Older version (default: the one before to_version)"),
+    to_version: Optional[int] = Query(None, description="Newer version (default: latest)")
+):
+    """
+    Compare two stored analyses of a property.
+    
+    Lists of sources and field analyses are matched by source and field
+    name, so a change reads as e.g. `data_sources[Zillow].price`.
+    """
+    try:
+        if to_version is None:
+            newer = await offload(analysis_history.latest, property_id)
+        else:
+            newer = await offload(analysis_history.get, property_id, to_version)
+        if newer is None:
+            raise _history_not_found(property_id, to_version)
+        
+        if from_version is None:
+            previous = await offload(analysis_history.previous, property_id, newer[0].timestamp_us)
+            if previous is None:
+                raise _history_not_found(property_id, newer[0].timestamp_us - 1)
+            from_version = previous.timestamp_us
+        older = await offload(analysis_history.get, property_id, from_version)
+        if older is None:
+            raise _history_not_found(property_id, from_version)
+        
+        changes = await offload(diff_analyses, older[1], newer[1])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    return AnalysisDiff(
+        property_id=property_id,
+        from_version=_to_version(older[0]),
+        to_version=_to_version(newer[0]),
+        sources_changed=older[0].fingerprint != newer[0].fingerprint,
+        changes=changes
+    )
+
+
+@router.get(
+    "/{property_id}/history/{version}",
+    response_model=PropertyAnalysis,
+    status_code=status.HTTP_200_OK,
+    summary="Stored analysis by version"
+)
+async def get_analysis_version(property_id: str, version: int):
+    """Get one stored analysis of a property by its version id."""
+    try:
+        stored = await offload(analysis_history.get, property_id, version)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    if stored is None:
+        raise _history_not_found(property_id, version)
+    return stored[1]
+
+
+async def _send_watch_messages(websocket: WebSocket, subscriber: Subscriber) -> None:
+    while True:
+        await websocket.send_json(await subscriber.next())
+
+
+async def _handle_watch_message(websocket: WebSocket, subscriber: Subscriber, message: Any) -> None:
+    action = message.get("action") if isinstance(message, dict) else None
+    property_ids = message.get("property_ids") if isinstance(message, dict) else None
+    if action not in ("subscribe", "unsubscribe") or not isinstance(property_ids, list):
+        subscriber.send({
+            "type": "error",
+            "detail": 'Expected {"action": "subscribe" | "unsubscribe", "property_ids": [...]}'
+        })
+        return
+    property_ids = [str(pid) for pid in property_ids]
+    
+    if action == "unsubscribe":
+        source_watcher.unsubscribe(subscriber, property_ids)
+        subscriber.send({"type": "unsubscribed", "property_ids": sorted(subscriber.property_ids)})
+        return
+    
+    try:
+        admission.check_rate(get_client_id(websocket), "search")
+    except AdmissionRejected as e:
+        subscriber.send({"type": "error", "detail": e.reason, "retry_after": e.retry_after})
+        return
+    new_ids = [pid for pid in dict.fromkeys(property_ids) if pid not in subscriber.property_ids]
+    if len(subscriber.property_ids) + len(new_ids) > settings.watch_max_properties:
+        subscriber.send({
+            "type": "error",
+            "detail": f"At most {settings.watch_max_properties} properties can be watched per connection"
+        })
+        return
+    unknown = [pid for pid in new_ids if await offload(get_property_by_id, pid) is None]
+    if unknown:
+        subscriber.send({"type": "error", "detail": "Unknown properties", "property_ids": unknown})
+    new_ids = [pid for pid in new_ids if pid not in unknown]
+    
+    watching = await source_watcher.subscribe(subscriber, new_ids)
+    subscriber.send({"type": "subscribed", "property_ids": watching})
+    if message.get("include_latest"):
+        for property_id in new_ids:
+            analysis = await source_watcher.latest_known(property_id)
+            if analysis is not None:
+                subscriber.offer(property_id, analysis, None)
+
+
+@router.websocket("/watch")
+async def watch_properties(
+    websocket: WebSocket,
+    mode: Literal["diff", "full"] = Query("diff", description="Push changed fields only, or whole analyses")
+):
+    """
+    Receive re-analyses of properties whose source data changed.
+    
+    Client messages:
+        {"action": "subscribe", "property_ids": [...], "include_latest": true}
+        {"action": "unsubscribe", "property_ids": [...]}
+    
+    Server messages have a "type": "subscribed" / "unsubscribed" (with the
+    properties now watched), "error", or "analysis". An analysis message
+    carries "changes" (diff mode, relative to the previous analysis) or the
+    whole "analysis". The pipeline runs only when a property's source
+    records change, once for all subscribers; `include_latest` sends the
+    cached or stored analysis right away without running it.
+    """
+    await websocket.accept()
+    subscriber = Subscriber(mode)
+    sender = asyncio.create_task(_send_watch_messages(websocket, subscriber))
+    metrics.increment("watch.connections")
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except ValueError:
+                subscriber.send({"type": "error", "detail": "Messages must be JSON"})
+                continue
+            await _handle_watch_message(websocket, subscriber, message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        source_watcher.unsubscribe(subscriber)
 
 
 @router.get("/health")
@@ -0,0 +1,355 @@
+"""
+Command-line entry point for offline maintenance tasks
+
+Usage:
+    python -m app.cli build-catalog catalog.bin
+    python -m app.cli ingest zillow_export.csv --source Zillow --catalog catalog.bin
+    python -m app.cli export analyses.parquet --since 2024-01-01
+    python -m app.cli analyze --output analyses.jsonl --city "San Francisco"
+"""
+
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+
+def _build_catalog(args: argparse.Namespace) -> int:
+    from app.data.mock_properties import iter_properties
+    from app.data.mock_sources import get_property_data_from_sources
+    from app.data.shared_catalog import build_catalog
+    
+    started = time.perf_counter()
+    count = build_catalog(args.path, iter_properties(), get_property_data_from_sources)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {count} properties to {args.path} in {elapsed:.2f}s")
+    return 0
+
+
+def _catalog_readers(catalog_path: str):
+    """(iter_properties, get_sources) of an existing catalog, or of the mock data"""
+    import os
+    
+    if os.path.exists(catalog_path):
+        from app.data.shared_catalog import SharedCatalog
+        catalog = SharedCatalog(catalog_path)
+        return catalog.iter_properties, catalog.get_property_data_from_sources
+    from app.data.mock_properties import iter_properties
+    from app.data.mock_sources import get_property_data_from_sources
+    return iter_properties, get_property_data_from_sources
+
+
+def _ingest(args: argparse.Namespace) -> int:
+    import csv
+    from app.data.entity_resolution import EntityResolver
+    from app.data.ingest import SortedSourceMerge, ingest_file
+    from app.data.shared_catalog import build_catalog
+    
+    # Only the property table is loaded up front; source records are
+    # staged on disk and merged into the catalog once, at the end
+    iter_properties, _ = _catalog_readers(args.catalog)
+    properties = {prop['id']: dict(prop) for prop in iter_properties()}
+    resolver = EntityResolver(
+        properties.values(),
+        link_threshold=args.link_threshold,
+        review_threshold=min(args.review_threshold, args.link_threshold)
+    )
+    
+    report_file = open(args.match_report, "a", newline="", encoding="utf-8") if args.match_report else None
+    report = csv.writer(report_file) if report_file else None
+    if report_file and report_file.tell() == 0:
+        report.writerow(["address", "city", "state", "zip", "status", "property_id", "confidence", "candidates"])
+    
+    def on_match(record, match):
+        if report:
+            report.writerow([
+                record.get("address"), record.get("city"), record.get("state"), record.get("zip"),
+                match.status, match.property_id or "", f"{match.confidence:.3f}", match.candidates
+            ])
+    
+    def merge(staged):
+        # Streams the existing catalog's records and the sorted staged ones
+        # into the new catalog, one property at a time
+        _, get_existing = _catalog_readers(args.catalog)
+        print("\nWriting catalog...", end="", flush=True)
+        build_catalog(args.catalog, properties.values(), SortedSourceMerge(get_existing, staged))
+    
+    def progress(stats, rate):
+        print(
+            f"\r{stats.rows_read:,} rows read, {stats.rows_upserted:,} upserted, "
+            f"{stats.rows_rejected:,} rejected ({rate:,.0f} rows/s)",
+            end="", flush=True
+        )
+    
+    started = time.perf_counter()
+    stats = ingest_file(
+        args.path,
+        properties,
+        merge,
+        fmt=args.format,
+        default_source=args.source,
+        chunk_size=args.chunk_size,
+        checkpoint_path=args.checkpoint or f"{args.catalog}.ingest-checkpoint",
+        checkpoint_every=args.checkpoint_every,
+        progress=progress,
+        resolver=resolver,
+        create_unmatched=args.create_unmatched,
+        on_match=on_match
+    )
+    elapsed = time.perf_counter() - started
+    if report_file:
+        report_file.close()
+    print()
+    for error in stats.errors:
+        print(f"  rejected {error}")
+    if stats.rows_linked or stats.rows_created or stats.rows_unresolved:
+        print(
+            f"Address matching: {stats.rows_linked:,} linked "
+            f"(mean confidence {stats.mean_link_confidence or 0:.2f}), "
+            f"{stats.rows_created:,} created, {stats.rows_unresolved:,} unresolved"
+        )
+    print(f"Ingested {stats.rows_upserted:,} of {stats.rows_read:,} rows into {args.catalog} in {elapsed:.1f}s")
+    return 0
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    """ISO date or datetime (UTC unless it has an offset) as Unix time"""
+    if not value:
+        return None
+    from datetime import datetime, timezone
+    
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+async def _analyze_for_export(property_ids, writer, concurrency: int) -> int:
+    """Run the pipeline for each property and add results to the writer as they finish"""
+    import asyncio
+    from app.services.property_service import PropertyService
+    
+    ids = iter(property_ids)
+    failed = 0
+    
+    async def worker():
+        nonlocal failed
+        for property_id in ids:
+            try:
+                writer.add(await PropertyService().analyze_property(property_id))
+            except Exception as e:
+                failed += 1
+                print(f"  failed {property_id}: {e}", file=sys.stderr)
+    
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return failed
+
+
+def _export(args: argparse.Namespace) -> int:
+    import asyncio
+    from app.services.analysis_history import AnalysisHistory
+    from app.services.export import ExportUnavailable, ExportWriter
+    
+    fmt = args.format or ("arrow" if args.path.endswith((".arrow", ".arrows")) else "parquet")
+    try:
+        writer = ExportWriter(fmt, args.path, batch_size=args.batch_size, include_text=args.include_text)
+    except ExportUnavailable as e:
+        print(e, file=sys.stderr)
+        return 1
+    
+    started = time.perf_counter()
+    failed = 0
+    if args.fresh:
+        if args.property_id:
+            property_ids = args.property_id
+        else:
+            from app.data import iter_properties
+            property_ids = (prop['id'] for prop in iter_properties())
+        failed = asyncio.run(_analyze_for_export(property_ids, writer, args.concurrency))
+    else:
+        history = AnalysisHistory(args.history_dir, compact_threshold=10_000)
+        wanted = set(args.property_id) if args.property_id else None
+        reported = 0
+        for entry, analysis in history.scan(
+            since=_parse_time(args.since),
+            until=_parse_time(args.until),
+            latest_only=not args.all_versions
+        ):
+            if wanted is None or analysis.property_id in wanted:
+                writer.add(analysis, entry)
+                if writer.rows != reported:
+                    reported = writer.rows
+                    print(f"\r{reported:,} rows", end="", flush=True)
+    writer.close()
+    elapsed = time.perf_counter() - started
+    print(f"\rExported {writer.rows:,} analyses to {args.path} ({fmt}) in {elapsed:.1f}s")
+    return 1 if failed else 0
+
+
+def _select_properties(args: argparse.Namespace) -> List[str]:
+    """Property ids matching the analyze filters, in catalog order"""
+    from app.data import iter_properties
+    
+    wanted = set(args.property_id or [])
+    if args.ids_file:
+        with open(args.ids_file, encoding="utf-8") as f:
+            wanted.update(line.strip() for line in f if line.strip())
+    city = args.city.lower() if args.city else None
+    state = args.state.lower() if args.state else None
+    
+    property_ids = []
+    for prop in iter_properties():
+        if wanted and prop['id'] not in wanted:
+            continue
+        if city and (prop.get('city') or '').lower() != city:
+            continue
+        if state and (prop.get('state') or '').lower() != state:
+            continue
+        property_ids.append(prop['id'])
+        if args.limit and len(property_ids) >= args.limit:
+            break
+    return property_ids
+
+
+def _analyze(args: argparse.Namespace) -> int:
+    import asyncio
+    import os
+    from app.config import settings
+    from app.services.batch_analysis import BatchAnalyzer
+    
+    if not args.output and not settings.history_enabled:
+        print("Nowhere to write results: pass --output or enable HISTORY_ENABLED", file=sys.stderr)
+        return 1
+    checkpoint = args.checkpoint
+    if not checkpoint:
+        if args.output:
+            checkpoint = f"{args.output}.checkpoint"
+        else:
+            os.makedirs(settings.history_dir, exist_ok=True)
+            checkpoint = os.path.join(settings.history_dir, "analyze.checkpoint")
+    
+    property_ids = _select_properties(args)
+    
+    def progress(stats):
+        eta = f", ETA {stats.eta_seconds / 60:.0f} min" if stats.eta_seconds is not None else ""
+        print(
+            f"\r{stats.skipped + stats.completed:,}/{stats.total:,} done "
+            f"({stats.skipped:,} from checkpoint, {stats.failed:,} failed, {stats.prepared:,} prepared), "
+            f"{stats.rate:.2f} analyses/s{eta}   ",
+            end="", flush=True
+        )
+    
+    analyzer = BatchAnalyzer(
+        output_path=args.output,
+        checkpoint_path=checkpoint,
+        profile=args.profile,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        deadline_seconds=args.deadline,
+        progress=progress
+    )
+    try:
+        stats = asyncio.run(analyzer.run(property_ids))
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; re-run the same command to resume from {checkpoint}", file=sys.stderr)
+        return 130
+    print()
+    for error in stats.errors:
+        print(f"  failed {error}", file=sys.stderr)
+    target = args.output or f"history in {settings.history_dir}"
+    print(
+        f"Analyzed {stats.completed:,} properties ({stats.degraded:,} degraded, {stats.failed:,} failed) "
+        f"into {target} in {stats.elapsed:.1f}s ({stats.rate:.2f}/s)"
+    )
+    if stats.failed:
+        print(f"Re-run the same command to retry failures (checkpoint: {checkpoint})", file=sys.stderr)
+    return 1 if stats.failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app.config import settings
+    
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.strip().splitlines()[0])
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    
+    build = subcommands.add_parser(
+        "build-catalog",
+        help="Build the shared memory-mapped catalog file (set CATALOG_PATH to use it)"
+    )
+    build.add_argument("path", help="Output catalog file")
+    build.set_defaults(handler=_build_catalog)
+    
+    ingest = subcommands.add_parser(
+        "ingest",
+        help="Stream a CSV/JSONL source export into the catalog (resumable)"
+    )
+    ingest.add_argument("path", help="Export file (.csv or .jsonl)")
+    ingest.add_argument("--catalog", required=True, help="Catalog file to update (created if missing)")
+    ingest.add_argument("--source", help="Source name for rows without a 'source' column, e.g. Zillow")
+    ingest.add_argument("--format", choices=["csv", "jsonl"], help="Input format (default: from extension)")
+    ingest.add_argument("--chunk-size", type=int, default=10_000, help="Rows validated per batch")
+    ingest.add_argument("--checkpoint", help="Checkpoint file (default: <catalog>.ingest-checkpoint)")
+    ingest.add_argument("--checkpoint-every", type=int, default=100_000, help="Rows between checkpoints")
+    ingest.add_argument(
+        "--link-threshold", type=float, default=0.85,
+        help="Minimum match confidence to attach a row without property_id to a property by address"
+    )
+    ingest.add_argument(
+        "--review-threshold", type=float, default=0.6,
+        help="Rows scoring between this and --link-threshold are rejected as needing review"
+    )
+    ingest.add_argument(
+        "--create-unmatched", action="store_true",
+        help="Create properties for addresses that match none (default: reject the rows)"
+    )
+    ingest.add_argument("--match-report", help="Append every address match decision to this CSV file")
+    ingest.set_defaults(handler=_ingest)
+    
+    export = subcommands.add_parser(
+        "export",
+        help="Write stored (or freshly computed) analyses to Parquet or an Arrow IPC stream (needs pyarrow)"
+    )
+    export.add_argument("path", help="Output file (.parquet, or .arrow for an Arrow stream)")
+    export.add_argument("--format", choices=["arrow", "parquet"], help="Output format (default: from extension)")
+    export.add_argument("--history-dir", default=settings.history_dir, help="Analysis history directory")
+    export.add_argument("--since", help="Earliest analysis time, ISO format (UTC unless an offset is given)")
+    export.add_argument("--until", help="Latest analysis time, ISO format")
+    export.add_argument("--all-versions", action="store_true", help="Every stored version, not only the latest")
+    export.add_argument("--property-id", action="append", help="Restrict to this property (repeatable)")
+    export.add_argument("--fresh", action="store_true", help="Run the pipeline instead of reading history")
+    export.add_argument("--concurrency", type=int, default=2, help="Concurrent analyses with --fresh")
+    export.add_argument("--include-text", action="store_true", help="Also export analysis text and insights")
+    export.add_argument("--batch-size", type=int, default=settings.export_batch_size, help="Rows per batch")
+    export.set_defaults(handler=_export)
+    
+    analyze = subcommands.add_parser(
+        "analyze",
+        help="Analyze all or some catalog properties without the API (resumable)"
+    )
+    analyze.add_argument("--output", help="JSONL file receiving one analysis per line (default: history only)")
+    analyze.add_argument("--property-id", action="append", help="Analyze this property (repeatable)")
+    analyze.add_argument("--ids-file", help="File with one property id per line")
+    analyze.add_argument("--city", help="Only properties in this city")
+    analyze.add_argument("--state", help="Only properties in this state")
+    analyze.add_argument("--limit", type=int, help="Analyze at most this many properties")
+    analyze.add_argument("--profile", choices=["full", "fast"], default="full", help="Pipeline profile")
+    analyze.add_argument("--concurrency", type=int, default=4, help="Analyses with LLM calls in flight")
+    analyze.add_argument(
+        "--workers", type=int, default=settings.heavy_executor_workers,
+        help="Processes loading sources, detecting conflicts and finding comparables"
+    )
+    analyze.add_argument("--chunk-size", type=int, default=64, help="Properties prepared per worker job")
+    analyze.add_argument("--deadline", type=float, default=300.0, help="Seconds per analysis before stages degrade")
+    analyze.add_argument(
+        "--checkpoint",
+        help="Checkpoint file (default: <output>.checkpoint, or analyze.checkpoint in the history directory)"
+    )
+    analyze.set_defaults(handler=_analyze)
+    
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
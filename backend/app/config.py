@@ -1,7 +1,7 @@
 """Application configuration"""
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -10,12 +10,133 @@ class Settings(BaseSettings):
     # Ollama Configuration
     ollama_host: str = "http://localhost:11434"
     ollama_model: str = "llama3.2:latest"
+    # Several hosts as a JSON list, e.g. '["http://gpu1:11434", "http://gpu2:11434"]';
+    # when empty, ollama_host is the only backend
+    ollama_hosts: List[str] = []
+    ollama_eject_after_failures: int = 2  # Consecutive failures before a host is ejected
+    ollama_reprobe_seconds: float = 10.0  # First re-probe delay, doubled per ejection
+    ollama_affinity: bool = True  # Keep the stages of one analysis on one host
+    ollama_affinity_max_imbalance: int = 2  # Break affinity if that host is this much busier
+    
+    # Model tiering: properties whose sources mostly agree (difficulty score
+    # below the stage's threshold) use ollama_small_model instead of ollama_model
+    llm_tiering_enabled: bool = False
+    ollama_small_model: str = "llama3.2:1b"
+    llm_tier_threshold: float = 0.3
+    llm_tier_stage_thresholds: Dict[str, float] = {}  # e.g. {"resolve": 0.2, "insights": 0.5}
+    llm_tier_stage_small_models: Dict[str, str] = {}  # e.g. {"summary": "qwen2.5:0.5b"}
+    
+    # Semantic cache: reuse descriptive summary outputs (key features, condition,
+    # highlights) for listings whose descriptions embed nearly identically
+    semantic_cache_enabled: bool = False
+    ollama_embedding_model: str = "nomic-embed-text"
+    semantic_cache_threshold: float = 0.95  # Minimum cosine similarity for reuse
+    semantic_cache_max_entries: int = 50_000
+    
+    # Prompt token budgets: prompts are trimmed to fit (descriptions and long
+    # analysis text first) and num_ctx is sized to the prompt per request
+    llm_prompt_token_budget: int = 3000
+    llm_stage_token_budgets: Dict[str, int] = {}  # e.g. {"insights": 1500}
+    llm_output_token_reserve: int = 1024
+    llm_min_num_ctx: int = 2048
+    llm_max_num_ctx: int = 8192
+    
+    # LLM record/replay: "off", "record" (write cassettes) or "replay" (serve them)
+    llm_cassette_mode: str = "off"
+    llm_cassette_dir: str = "cassettes"
+    llm_replay_timing: str = "original"  # "original" recorded durations or "none"
     
     # API Configuration
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     cors_origins: List[str] = ["http://localhost:3000", "http://localhost:3001"]
     
+    # Data Configuration
+    # Path to a catalog built with `python -m app.cli build-catalog`; when set,
+    # every worker memory-maps it instead of loading the mock data
+    catalog_path: Optional[str] = None
+    
+    # Analysis Cache
+    analysis_cache_ttl_seconds: float = 3600.0
+    analysis_cache_max_entries: int = 1000
+    
+    # Analysis History: when enabled, every completed analysis (degraded ones
+    # included, with their degraded_stages) is appended to a log in
+    # history_dir; recent appends are merged into the sorted index file once
+    # there are history_compact_threshold of them
+    history_enabled: bool = False
+    history_dir: str = "history"
+    history_compact_threshold: int = 10_000
+    history_fsync: bool = False  # fsync each append (durable across power loss, slower)
+    
+    # Bulk Export (Arrow/Parquet; requires pyarrow)
+    export_batch_size: int = 10_000  # Rows per record batch / Parquet row group
+    export_max_fresh: int = 100  # Properties per /export?source=fresh request
+    
+    # Watch Subscriptions (WebSocket push of re-analyses when source data changes)
+    watch_interval_seconds: float = 5.0  # How often to check for a replaced catalog file
+    watch_max_properties: int = 100  # Per connection
+    watch_max_concurrent_analyses: int = 1  # Re-analyses triggered by source changes
+    
+    # Cache Warming (background pre-analysis of popular properties)
+    warm_enabled: bool = False
+    warm_budget: int = 10  # Max properties considered per pass
+    warm_interval_seconds: float = 30.0
+    warm_refresh_after_seconds: float = 1800.0  # Re-analyze entries older than this
+    warm_min_score: float = 2.0  # Minimum decayed access score to be warmed
+    access_half_life_seconds: float = 3600.0
+    search_access_weight: float = 0.2  # /search hits count less than /analyze
+    
+    # Speculative Prefetch (top /search results)
+    prefetch_enabled: bool = False  # Default for /search?prefetch=
+    prefetch_top_n: int = 3
+    prefetch_llm: bool = False  # Also run the LLM stages, not just sources
+    prefetch_llm_concurrency: int = 1
+    prefetch_llm_max_active: int = 1  # Skip LLM prefetch if this many generations are running
+    prefetch_prepared_ttl_seconds: float = 300.0
+    
+    # Deadlines (per /analyze request, split across LLM stages by weight)
+    analysis_deadline_seconds: float = 240.0  # Default when the client sends none
+    analysis_max_deadline_seconds: float = 600.0
+    analysis_stage_min_seconds: float = 5.0  # Degrade a stage given less than this
+    analysis_stage_weights: Dict[str, float] = {
+        "resolve": 3.0,
+        "summary": 2.0,
+        "analysis": 4.0,
+        "insights": 2.0,
+        "fast": 5.0,
+    }
+    
+    # Admission Control (per-client token buckets and load shedding, 429 + Retry-After)
+    admission_enabled: bool = True
+    rate_limit_per_minute: float = 60.0  # Tokens refilled per client per minute
+    rate_limit_burst: float = 30.0
+    rate_limit_costs: Dict[str, float] = {"search": 1.0, "analyze": 10.0, "cached": 1.0, "export": 10.0}
+    admission_max_queue_wait_seconds: float = 60.0  # Shed new analyses beyond this estimated wait
+    admission_parallel_per_host: int = 1  # Concurrent generations per Ollama host
+    admission_initial_analysis_seconds: float = 30.0  # Until real durations are measured
+    
+    # Client Disconnects
+    cancel_on_disconnect: bool = True  # Abort /analyze work nobody else is waiting for
+    disconnect_poll_seconds: float = 1.0
+    
+    # CPU Executors (keep CPU-bound steps off the event loop)
+    cpu_executor_workers: int = 4  # Threads for per-request steps; 0 runs them inline
+    heavy_executor: str = "process"  # "process" or "thread" for bulk jobs and index builds
+    heavy_executor_workers: int = 2
+    spatial_index_prebuild: bool = False  # Build the comparables index at startup
+    
+    # Profiling and Diagnostics (/admin endpoints)
+    admin_token: Optional[str] = None  # Required as X-Admin-Token on /admin; unset disables /admin
+    profiling_header_enabled: bool = False  # Profile requests sent with X-Profile: 1
+    profiling_sample_rate: float = 0.0  # Fraction of requests profiled automatically
+    profiling_dir: str = "profiles"
+    profiling_interval_ms: float = 5.0
+    profiling_max_files: int = 200
+    loop_lag_monitor_enabled: bool = False
+    loop_lag_interval_ms: float = 100.0
+    loop_lag_threshold_ms: float = 250.0  # Record the blocking stack beyond this lag
+    
     # Environment
     environment: str = "development"
     
@@ -1,11 +1,55 @@
 """Mock data module"""
 
-from .mock_properties import search_properties, get_property_by_id, PROPERTIES
-from .mock_sources import get_property_data_from_sources
+from app.config import settings
+from .mock_properties import PROPERTIES
+
+if settings.catalog_path:
+    # Serve everything from the shared memory-mapped catalog
+    from .shared_catalog import SharedCatalog
+    
+    catalog = SharedCatalog(settings.catalog_path)
+    
+    # Look the catalog up on every call so a reloaded one takes effect everywhere
+    def search_properties(query):
+        return catalog.search_properties(query)
+    
+    def get_property_by_id(property_id):
+        return catalog.get_property_by_id(property_id)
+    
+    def iter_properties():
+        return catalog.iter_properties()
+    
+    def get_property_data_from_sources(property_id):
+        return catalog.get_property_data_from_sources(property_id)
+else:
+    catalog = None
+    from .mock_properties import search_properties, get_property_by_id, iter_properties
+    from .mock_sources import get_property_data_from_sources
+
+
+def reload_catalog() -> bool:
+    """
+    Map the catalog again if its file was replaced (e.g. by `app.cli ingest`)
+    
+    The previous mapping stays valid for readers still holding records
+    from it.
+    
+    Returns:
+        True if a new catalog was loaded
+    """
+    global catalog
+    if catalog is None or not catalog.is_stale():
+        return False
+    catalog = SharedCatalog(catalog.path)
+    return True
+
 
 __all__ = [
     "search_properties",
     "get_property_by_id", 
+    "iter_properties",
     "PROPERTIES",
-    "get_property_data_from_sources"
+    "get_property_data_from_sources",
+    "reload_catalog",
+    "catalog"
 ]
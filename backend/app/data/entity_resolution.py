@@ -0,0 +1,363 @@
+"""
+Entity resolution: link source records keyed by address to properties
+
+Feeds identify listings by free-form addresses ("123 Market St" vs "123
+Market Street, San Francisco, CA 94102"). Comparing every record with every
+property is quadratic, so properties are indexed under blocking keys -
+(zip, street number), plus (street number, first street-name token) for
+records without a zip - and a record is only scored against the properties
+sharing its block. Blocks are small, so a run over N records costs O(N)
+lookups plus a handful of comparisons each.
+
+Scores combine street-name similarity with agreement on suffix, unit and
+locality (zip or city) into a match confidence between 0 and 1.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+STREET_SUFFIXES = {
+    "street": "st", "st": "st", "str": "st",
+    "avenue": "ave", "ave": "ave", "av": "ave",
+    "boulevard": "blvd", "blvd": "blvd",
+    "road": "rd", "rd": "rd",
+    "drive": "dr", "dr": "dr",
+    "lane": "ln", "ln": "ln",
+    "court": "ct", "ct": "ct",
+    "place": "pl", "pl": "pl",
+    "terrace": "ter", "ter": "ter",
+    "circle": "cir", "cir": "cir",
+    "parkway": "pkwy", "pkwy": "pkwy",
+    "highway": "hwy", "hwy": "hwy",
+    "square": "sq", "sq": "sq",
+    "way": "way", "alley": "aly", "plaza": "plz",
+}
+
+DIRECTIONS = {
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+    "n": "n", "s": "s", "e": "e", "w": "w", "ne": "ne", "nw": "nw", "se": "se", "sw": "sw",
+}
+
+UNIT_MARKERS = {"apt", "apartment", "unit", "suite", "ste", "#", "no", "fl", "floor"}
+
+CITY_ALIASES = {
+    "sf": "san francisco",
+    "s f": "san francisco",
+    "san fran": "san francisco",
+    "la": "los angeles",
+    "nyc": "new york",
+    "ny": "new york",
+}
+
+US_STATES = {
+    "al", "ak", "az", "ar", "ca", "co", "ct", "de", "dc", "fl", "ga", "hi", "id", "il", "in",
+    "ia", "ks", "ky", "la", "me", "md", "ma", "mi", "mn", "ms", "mo", "mt", "ne", "nv", "nh",
+    "nj", "nm", "ny", "nc", "nd", "oh", "ok", "or", "pa", "ri", "sc", "sd", "tn", "tx", "ut",
+    "vt", "va", "wa", "wv", "wi", "wy",
+}
+
+STATE_NAMES = {"california": "ca", "new york": "ny", "texas": "tx", "washington": "wa", "oregon": "or"}
+
+# Score weights; street number equality is guaranteed by blocking
+WEIGHTS = {"street": 0.5, "suffix": 0.1, "unit": 0.15, "locality": 0.25}
+
+_ZIP = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+_NUMBER = re.compile(r"^(\d+)[a-z]?(?:-\d+[a-z]?)?$")
+
+
+@dataclass(frozen=True)
+class NormalizedAddress:
+    """Canonical components of a street address (lower case, abbreviated)"""
+
+    number: Optional[str]
+    street: Tuple[str, ...]  # Street name tokens without suffix or direction
+    suffix: Optional[str] = None
+    direction: Optional[str] = None
+    unit: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zip: Optional[str] = None
+
+    @property
+    def street_name(self) -> str:
+        return " ".join(self.street)
+
+    def canonical(self) -> str:
+        """Single-line canonical form (stable id material)"""
+        parts = [self.number or "", self.direction or "", self.street_name, self.suffix or ""]
+        line = " ".join(p for p in parts if p)
+        if self.unit:
+            line += f" #{self.unit}"
+        return ", ".join(p for p in [line, self.city or "", self.state or "", self.zip or ""] if p)
+
+
+def _clean(text: str) -> str:
+    text = text.lower().replace("#", " # ")
+    text = re.sub(r"[^a-z0-9#,\- ]+", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _parse_street_line(tokens: List[str]) -> Tuple[Optional[str], List[str], Optional[str], Optional[str], Optional[str], List[str]]:
+    """Split street-line tokens into number, name, suffix, direction, unit and trailing tokens"""
+    number = None
+    match = _NUMBER.match(tokens[0]) if tokens else None
+    if match:
+        number = match.group(1)
+        tokens = tokens[1:]
+
+    unit = None
+    for i, token in enumerate(tokens):
+        if token in UNIT_MARKERS and i + 1 < len(tokens):
+            unit = tokens[i + 1].lstrip("#")
+            tokens = tokens[:i] + tokens[i + 2:]
+            break
+
+    direction = None
+    if tokens and tokens[0] in DIRECTIONS and len(tokens) > 1:
+        direction = DIRECTIONS[tokens[0]]
+        tokens = tokens[1:]
+
+    # The last suffix ends the street name; anything after it is locality
+    suffix = None
+    trailing: List[str] = []
+    for i in range(len(tokens) - 1, 0, -1):
+        if tokens[i] in STREET_SUFFIXES:
+            suffix = STREET_SUFFIXES[tokens[i]]
+            tokens, trailing = tokens[:i], tokens[i + 1:]
+            break
+    if trailing and trailing[0] in DIRECTIONS and direction is None:
+        direction = DIRECTIONS[trailing[0]]
+        trailing = trailing[1:]
+    return number, tokens, suffix, direction, unit, trailing
+
+
+def _parse_locality(text: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """City, state and zip from the part of an address after the street line"""
+    zip_code = None
+    match = _ZIP.search(text)
+    if match:
+        zip_code = match.group(1)
+        text = (text[:match.start()] + text[match.end():]).strip(" ,")
+    state = None
+    words = [w for w in re.split(r"[ ,]+", text) if w]
+    if words and words[-1] in US_STATES and (len(words) > 1 or zip_code):
+        state = words.pop()
+    elif len(words) >= 2 and " ".join(words[-2:]) in STATE_NAMES:
+        state = STATE_NAMES[" ".join(words[-2:])]
+        words = words[:-2]
+    elif words and words[-1] in STATE_NAMES:
+        state = STATE_NAMES[words.pop()]
+    city = " ".join(words) or None
+    if city:
+        city = CITY_ALIASES.get(city, city)
+    return city, state, zip_code
+
+
+def normalize_address(
+    address: str,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    zip_code: Optional[str] = None
+) -> NormalizedAddress:
+    """
+    Parse and canonicalize a free-form US street address
+
+    Separate city/state/zip values (e.g. from feed columns) take precedence
+    over those parsed from the address text.
+
+    Examples:
+        "123 Market St" and "123 Market Street, SF" both normalize to
+        number "123", street ("market",), suffix "st"; the latter also
+        gets city "san francisco".
+    """
+    text = _clean(address or "")
+    parts = [p.strip() for p in text.split(",") if p.strip()]
+    street_tokens = parts[0].replace(" - ", " ").split() if parts else []
+    number, street, suffix, direction, unit, trailing = _parse_street_line(street_tokens)
+
+    locality = ", ".join(p for p in [" ".join(trailing), *parts[1:]] if p)
+    parsed_city, parsed_state, parsed_zip = _parse_locality(locality) if locality else (None, None, None)
+
+    if city:
+        city = _clean(city)
+        city = CITY_ALIASES.get(city, city)
+    if state:
+        state = _clean(state)
+        state = STATE_NAMES.get(state, state)
+    if zip_code:
+        match = _ZIP.search(str(zip_code))
+        zip_code = match.group(1) if match else None
+
+    return NormalizedAddress(
+        number=number,
+        street=tuple(street),
+        suffix=suffix,
+        direction=direction,
+        unit=unit,
+        city=city or parsed_city,
+        state=state or parsed_state,
+        zip=zip_code or parsed_zip,
+    )
+
+
+def blocking_keys(address: NormalizedAddress) -> List[Tuple[str, ...]]:
+    """Keys a property is indexed under (zip + number first)"""
+    keys: List[Tuple[str, ...]] = []
+    if not address.number:
+        return keys
+    if address.zip:
+        keys.append(("zip", address.zip, address.number))
+    if address.street:
+        keys.append(("street", address.number, address.street[0]))
+    return keys
+
+
+def score(record: NormalizedAddress, candidate: NormalizedAddress) -> float:
+    """Match confidence between a record's address and a candidate property's (0-1)"""
+    if record.street == candidate.street:
+        street = 1.0
+    else:
+        street = SequenceMatcher(None, record.street_name, candidate.street_name).ratio()
+
+    suffix = 1.0 if not record.suffix or not candidate.suffix or record.suffix == candidate.suffix else 0.0
+
+    if record.unit == candidate.unit:
+        unit = 1.0
+    elif not record.unit or not candidate.unit:
+        unit = 0.7
+    else:
+        unit = 0.0
+
+    if record.zip and candidate.zip:
+        locality = 1.0 if record.zip == candidate.zip else 0.0
+    elif record.city and candidate.city:
+        locality = 0.9 if record.city == candidate.city else 0.0
+    else:
+        # Nothing to confirm the town by; the block still matched on number and street
+        locality = 0.6
+
+    return (
+        WEIGHTS["street"] * street
+        + WEIGHTS["suffix"] * suffix
+        + WEIGHTS["unit"] * unit
+        + WEIGHTS["locality"] * locality
+    )
+
+
+@dataclass
+class Match:
+    """Outcome of resolving one record"""
+
+    status: str  # "linked", "review", "ambiguous" or "unmatched" ("created" during ingest)
+    property_id: Optional[str]
+    confidence: float
+    candidates: int  # Properties scored (block size)
+    address: Optional[NormalizedAddress] = None
+
+
+def new_property_id(address: NormalizedAddress) -> str:
+    """Stable id for a property first seen in a feed"""
+    digest = hashlib.blake2b(address.canonical().encode("utf-8"), digest_size=6).hexdigest()
+    return f"prop_{digest}"
+
+
+class EntityResolver:
+    """
+    Links address-keyed source records to known properties
+
+    The block index is built on first use from the property table, and
+    properties created during a run can be added so later records link to
+    them.
+
+    Args:
+        properties: Property dicts with 'id' and 'address' (plus optional
+            city/state/zip)
+        link_threshold: Minimum confidence to attach a record
+        review_threshold: Minimum confidence to report a near miss as "review"
+        ambiguity_margin: A runner-up this close to the best match makes the
+            record "ambiguous" instead of linked
+        max_block_size: Candidates scored per block at most (guards against
+            degenerate blocks, e.g. feeds that put "0" as every street number)
+    """
+
+    def __init__(
+        self,
+        properties: Iterable[Mapping[str, Any]],
+        link_threshold: float = 0.85,
+        review_threshold: float = 0.6,
+        ambiguity_margin: float = 0.05,
+        max_block_size: int = 200
+    ):
+        self._properties = properties
+        self.link_threshold = link_threshold
+        self.review_threshold = review_threshold
+        self.ambiguity_margin = ambiguity_margin
+        self.max_block_size = max_block_size
+        self._blocks: Optional[Dict[Tuple[str, ...], List[Tuple[str, NormalizedAddress]]]] = None
+
+    def _index(self) -> Dict[Tuple[str, ...], List[Tuple[str, NormalizedAddress]]]:
+        if self._blocks is None:
+            self._blocks = {}
+            for prop in self._properties:
+                if prop.get("address"):
+                    self.add(prop["id"], normalize_address(
+                        prop["address"], prop.get("city"), prop.get("state"), prop.get("zip")
+                    ))
+        return self._blocks
+
+    def add(self, property_id: str, address: NormalizedAddress) -> None:
+        """Index a property under its blocking keys"""
+        blocks = self._blocks if self._blocks is not None else self._index()
+        for key in blocking_keys(address):
+            blocks.setdefault(key, []).append((property_id, address))
+
+    def add_property(self, prop: Mapping[str, Any]) -> None:
+        """Index a property added to the table after the index was built"""
+        if self._blocks is not None and prop.get("address"):
+            self.add(prop["id"], normalize_address(
+                prop["address"], prop.get("city"), prop.get("state"), prop.get("zip")
+            ))
+
+    def candidates(self, address: NormalizedAddress) -> List[Tuple[str, NormalizedAddress]]:
+        """Properties sharing any block with the address, each listed once"""
+        blocks = self._index()
+        # Union of the zip + number and number + street blocks: a record whose
+        # zip is wrong still finds its property through the street block
+        found: Dict[str, NormalizedAddress] = {}
+        for key in blocking_keys(address):
+            for property_id, candidate in blocks.get(key, ())[:self.max_block_size]:
+                found.setdefault(property_id, candidate)
+        return list(found.items())
+
+    def resolve(
+        self,
+        address: str,
+        city: Optional[str] = None,
+        state: Optional[str] = None,
+        zip_code: Optional[str] = None
+    ) -> Match:
+        """Find the property a record's address refers to"""
+        normalized = normalize_address(address, city, state, zip_code)
+        candidates = self.candidates(normalized)
+        scored: Dict[str, float] = {}
+        for property_id, candidate in candidates:
+            value = score(normalized, candidate)
+            if value > scored.get(property_id, -1.0):
+                scored[property_id] = value
+        if not scored:
+            return Match("unmatched", None, 0.0, 0, normalized)
+
+        ranked = sorted(scored.items(), key=lambda item: item[1], reverse=True)
+        best_id, best = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if best < self.review_threshold:
+            return Match("unmatched", None, best, len(candidates), normalized)
+        if best - runner_up < self.ambiguity_margin:
+            return Match("ambiguous", None, best, len(candidates), normalized)
+        if best < self.link_threshold:
+            return Match("review", best_id, best, len(candidates), normalized)
+        return Match("linked", best_id, best, len(candidates), normalized)
@@ -0,0 +1,588 @@
+"""
+Streaming bulk ingest of source exports
+
+Reads CSV or JSONL exports (Zillow, Redfin, public records, ...) row by row
+through generators and normalizes and validates them in fixed-size batches.
+Validated records are appended to a staging file rather than kept in
+memory; only the property table (needed to link rows by address) stays
+resident. A checkpoint records the rows read and the staging file size, so
+a crashed run resumes where it stopped. At the end the staged records are
+sorted by property (in bounded runs spilled to disk) and merged with the
+existing source records one property at a time.
+
+Rows without a property_id (e.g. public-records exports keyed by address)
+are linked to a property by address through an `EntityResolver`.
+"""
+
+import csv
+import heapq
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .entity_resolution import EntityResolver, Match, new_property_id
+from .source_records import SourceRecordStore, NUMERIC_FIELDS, INT_FIELDS
+
+# Export column name -> canonical field name
+FIELD_ALIASES = {
+    "id": "property_id",
+    "prop_id": "property_id",
+    "list_price": "price",
+    "listing_price": "price",
+    "asking_price": "price",
+    "beds": "bedrooms",
+    "bedroom_count": "bedrooms",
+    "baths": "bathrooms",
+    "bathroom_count": "bathrooms",
+    "sqft": "square_feet",
+    "living_area": "square_feet",
+    "living_area_sqft": "square_feet",
+    "yr_built": "year_built",
+    "lot_sqft": "lot_size",
+    "lot_size_sqft": "lot_size",
+    "home_type": "property_type",
+    "type": "property_type",
+    "updated_at": "last_updated",
+    "last_modified": "last_updated",
+    "remarks": "description",
+    "zip_code": "zip",
+    "postal_code": "zip",
+    "lat": "latitude",
+    "lng": "longitude",
+    "lon": "longitude",
+}
+
+# Numeric fields outside the typed columns that are still validated
+EXTRA_NUMERIC_FIELDS = ["assessed_value", "last_sale_price", "tax_amount"]
+
+# Fields describing the property itself rather than one source's view of it
+PROPERTY_FIELDS = ["address", "city", "state", "zip", "latitude", "longitude", "image_url"]
+
+
+@dataclass
+class IngestStats:
+    """Counters for one ingest run, also persisted as the checkpoint"""
+
+    input_path: str
+    rows_read: int = 0
+    rows_upserted: int = 0
+    rows_rejected: int = 0
+    rows_linked: int = 0  # Address-only rows attached to an existing property
+    rows_created: int = 0  # Address-only rows that created a property
+    rows_unresolved: int = 0  # Address-only rows rejected as unmatched/ambiguous/review
+    link_confidence_sum: float = 0.0
+    staged_bytes: int = 0  # Staging file size at the checkpoint
+    errors: List[str] = field(default_factory=list)
+
+    # Keep only the first few rejects; the count tells the rest
+    MAX_ERRORS = 20
+
+    def reject(self, message: str) -> None:
+        self.rows_rejected += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append(message)
+
+    @property
+    def mean_link_confidence(self) -> Optional[float]:
+        return self.link_confidence_sum / self.rows_linked if self.rows_linked else None
+
+
+def detect_format(path: str) -> str:
+    """Infer 'csv' or 'jsonl' from a file extension"""
+    lowered = path.lower()
+    if lowered.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    return "csv"
+
+
+def iter_rows(path: str, fmt: str, skip: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Stream rows from an export file
+
+    Args:
+        path: CSV or JSONL file
+        fmt: 'csv' or 'jsonl'
+        skip: Number of leading data rows to skip (resume)
+
+    Yields:
+        (row number, raw row dict); row numbers are 1-based data rows
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            rows: Iterable[Any] = csv.DictReader(f)
+        else:
+            rows = (line for line in f if line.strip())
+        for number, row in enumerate(rows, start=1):
+            if number <= skip:
+                continue
+            if fmt == "jsonl":
+                try:
+                    row = json.loads(row)
+                except json.JSONDecodeError as e:
+                    row = {"__error__": f"invalid JSON: {e}"}
+            yield number, row
+
+
+def iter_chunks(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Group an iterable into lists of at most `size` items"""
+    chunk: List[Any] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _parse_number(value: Any) -> Optional[float]:
+    """Parse numbers as exported: '$1,250,000', '2.5', '' (missing)"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    text = str(value).strip().replace(",", "").replace("$", "")
+    if not text or text.lower() in ("null", "none", "n/a", "na"):
+        return None
+    return float(text)
+
+
+def normalize_row(row: Dict[str, Any], default_source: Optional[str]) -> Dict[str, Any]:
+    """
+    Map a raw export row onto canonical field names and types
+
+    Public-records exports report `assessed_value` instead of a listing
+    price; it is kept as-is and also used as `price` when no price is
+    present, so conflict resolution can weigh it against listing prices.
+
+    Rows may omit property_id if they carry an address; they are linked
+    to a property during upsert.
+
+    Raises:
+        ValueError: If the row is missing required fields or has bad values
+    """
+    if "__error__" in row:
+        raise ValueError(row["__error__"])
+
+    record: Dict[str, Any] = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        name = key.strip().lower().replace(" ", "_")
+        name = FIELD_ALIASES.get(name, name)
+        if isinstance(value, str):
+            value = value.strip() or None
+        record[name] = value
+
+    if not record.get("property_id") and not record.get("address"):
+        raise ValueError("missing property_id and address")
+    if not record.get("source"):
+        # Also covers a 'source' column left empty on some rows
+        record["source"] = default_source
+    if not record.get("source"):
+        raise ValueError("missing source")
+
+    for name in NUMERIC_FIELDS + EXTRA_NUMERIC_FIELDS + ["latitude", "longitude"]:
+        if name not in record:
+            continue
+        try:
+            number = _parse_number(record[name])
+        except ValueError:
+            raise ValueError(f"{name} is not a number: {record[name]!r}")
+        if number is not None and name in INT_FIELDS:
+            if not float(number).is_integer():
+                raise ValueError(f"{name} is not an integer: {record[name]!r}")
+            number = int(number)
+        if number is not None and number < 0 and name not in ("latitude", "longitude"):
+            raise ValueError(f"{name} is negative: {number}")
+        record[name] = number
+
+    if record.get("price") is None and record.get("assessed_value") is not None:
+        record["price"] = record["assessed_value"]
+
+    return record
+
+
+def normalize_batch(
+    rows: List[Tuple[int, Dict[str, Any]]],
+    default_source: Optional[str],
+    stats: IngestStats
+) -> List[Dict[str, Any]]:
+    """Normalize a chunk of rows, recording rejects in `stats`"""
+    records = []
+    for number, row in rows:
+        try:
+            records.append(normalize_row(row, default_source))
+        except ValueError as e:
+            stats.reject(f"row {number}: {e}")
+    return records
+
+
+def _describe(record: Dict[str, Any]) -> str:
+    return ", ".join(str(record[name]) for name in ("address", "city", "state", "zip") if record.get(name))
+
+
+def link_record(
+    record: Dict[str, Any],
+    properties: Dict[str, Dict[str, Any]],
+    resolver: EntityResolver,
+    stats: IngestStats,
+    create_unmatched: bool = False
+) -> Tuple[Optional[str], Match]:
+    """
+    Resolve the property of a record without property_id
+
+    Returns:
+        (property id, match); the id is None if the record was rejected
+    """
+    match = resolver.resolve(record["address"], record.get("city"), record.get("state"), record.get("zip"))
+    if match.status == "linked":
+        stats.rows_linked += 1
+        stats.link_confidence_sum += match.confidence
+        return match.property_id, match
+
+    address = match.address
+    if match.status == "unmatched" and create_unmatched and address is not None and address.number and address.street:
+        property_id = new_property_id(address)
+        if property_id not in properties:
+            stats.rows_created += 1
+        return property_id, Match("created", property_id, match.confidence, match.candidates, address)
+
+    stats.rows_unresolved += 1
+    if match.status == "unmatched":
+        stats.reject(f"no property matches address {_describe(record)!r}")
+    elif match.status == "ambiguous":
+        stats.reject(f"address {_describe(record)!r} matches several properties (confidence {match.confidence:.2f})")
+    else:
+        stats.reject(
+            f"address {_describe(record)!r} needs review "
+            f"(best match {match.property_id}, confidence {match.confidence:.2f})"
+        )
+    return None, match
+
+
+def apply_property_fields(
+    property_id: str,
+    record: Dict[str, Any],
+    properties: Dict[str, Dict[str, Any]],
+    linked: bool = False,
+    resolver: Optional[EntityResolver] = None
+) -> Dict[str, Any]:
+    """
+    Move a record's property-level fields into the property table
+
+    Returns:
+        The fields that were applied
+    """
+    prop = properties.get(property_id)
+    created = prop is None or "address" not in prop
+    if prop is None:
+        prop = properties[property_id] = {"id": property_id}
+    applied = {}
+    for name in PROPERTY_FIELDS:
+        value = record.pop(name, None)
+        # A linked record's spelling of the address never replaces the property's own
+        if value is not None and not (linked and name in prop):
+            prop[name] = applied[name] = value
+    if created and resolver is not None:
+        resolver.add_property(prop)
+    return applied
+
+
+def stage_records(
+    records: List[Dict[str, Any]],
+    properties: Dict[str, Dict[str, Any]],
+    resolver: Optional[EntityResolver] = None,
+    stats: Optional[IngestStats] = None,
+    create_unmatched: bool = False,
+    on_match: Optional[Callable[[Dict[str, Any], Match], None]] = None
+) -> List[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+    """
+    Assign records to properties and update the property table
+
+    Args:
+        records: Normalized records
+        properties: Property table, updated in place
+        resolver: Links records without property_id by address; such
+            records are rejected without one
+        stats: Receives link counters and rejects of unresolved records
+        create_unmatched: Create a property for addresses matching none
+        on_match: Called with (record, match) for every address-linked record
+
+    Returns:
+        (property id, source record, applied property fields) for each
+        accepted record; the source record is ready for `SourceRecordStore.upsert`
+    """
+    stats = stats if stats is not None else IngestStats(input_path="")
+    staged = []
+    for record in records:
+        property_id = record.pop("property_id", None)
+        linked = property_id is None
+        if linked:
+            if resolver is None:
+                stats.reject(f"no property_id for address {_describe(record)!r}")
+                continue
+            property_id, match = link_record(record, properties, resolver, stats, create_unmatched)
+            if on_match:
+                on_match(record, match)
+            if property_id is None:
+                continue
+        fields = apply_property_fields(property_id, record, properties, linked, resolver)
+        staged.append((property_id, record, fields))
+    return staged
+
+
+def upsert_records(
+    records: List[Dict[str, Any]],
+    properties: Dict[str, Dict[str, Any]],
+    store: SourceRecordStore,
+    resolver: Optional[EntityResolver] = None,
+    stats: Optional[IngestStats] = None,
+    create_unmatched: bool = False,
+    on_match: Optional[Callable[[Dict[str, Any], Match], None]] = None
+) -> int:
+    """
+    Upsert normalized records into the property table and source store
+
+    Arguments as for `stage_records`, plus the store updated in place.
+
+    Returns:
+        Number of records upserted
+    """
+    staged = stage_records(records, properties, resolver, stats, create_unmatched, on_match)
+    for property_id, record, _ in staged:
+        store.upsert(property_id, record)
+    return len(staged)
+
+
+def iter_staged(path: str) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+    """Stream (property id, source record, applied property fields) back from a staging file"""
+    with open(path, "rb") as f:
+        for line in f:
+            property_id, record, fields = json.loads(line)
+            yield property_id, record, fields
+
+
+def _spill_run(path: str, run: List[Tuple[str, int, Dict[str, Any]]]) -> str:
+    run.sort(key=lambda entry: entry[:2])
+    with open(path, "wb") as f:
+        for entry in run:
+            f.write(json.dumps(entry, default=str).encode("utf-8") + b"\n")
+    return path
+
+
+def _iter_run(path: str) -> Iterator[Tuple[str, int, Dict[str, Any]]]:
+    with open(path, "rb") as f:
+        for line in f:
+            property_id, sequence, record = json.loads(line)
+            yield property_id, sequence, record
+
+
+def sort_staged(path: str, run_size: int = 200_000) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream staged (property id, source record) pairs sorted by property id
+
+    Sorted runs of `run_size` records are spilled next to the staging file
+    and merged, so memory is bounded by one run. Records of one property
+    keep their input order, so the last row from a source still wins.
+    """
+    runs: List[str] = []
+    run: List[Tuple[str, int, Dict[str, Any]]] = []
+    try:
+        for sequence, (property_id, record, _) in enumerate(iter_staged(path)):
+            run.append((property_id, sequence, record))
+            if len(run) >= run_size:
+                runs.append(_spill_run(f"{path}.run{len(runs)}", run))
+                run = []
+        if runs:
+            if run:
+                runs.append(_spill_run(f"{path}.run{len(runs)}", run))
+            # Sequence numbers are unique, so records themselves are never compared
+            entries: Iterable[Tuple[str, int, Dict[str, Any]]] = heapq.merge(
+                *(_iter_run(run_path) for run_path in runs)
+            )
+        else:
+            run.sort(key=lambda entry: entry[:2])
+            entries = run
+        for property_id, _, record in entries:
+            yield property_id, record
+    finally:
+        for run_path in runs:
+            if os.path.exists(run_path):
+                os.remove(run_path)
+
+
+class SortedSourceMerge:
+    """
+    Existing source records of each property with the staged ones upserted
+
+    Used as `build_catalog`'s `get_sources`: it walks the sorted staged
+    stream once, so it must be called in ascending property id order, and
+    holds one property's records at a time.
+
+    Args:
+        existing: Source records currently stored for a property id
+        staged: (property id, record) pairs sorted by property id
+    """
+
+    def __init__(
+        self,
+        existing: Callable[[str], Iterable[Mapping[str, Any]]],
+        staged: Iterable[Tuple[str, Dict[str, Any]]]
+    ):
+        self.existing = existing
+        self._staged = iter(staged)
+        self._next = next(self._staged, None)
+
+    def __call__(self, property_id: str) -> List[Dict[str, Any]]:
+        records = [dict(record) for record in self.existing(property_id)]
+        while self._next is not None and self._next[0] <= property_id:
+            staged_id, record = self._next
+            # Lower ids can't occur: every staged id is in the property table
+            if staged_id == property_id:
+                for position, current in enumerate(records):
+                    if current.get("source") == record.get("source"):
+                        records[position] = record
+                        break
+                else:
+                    records.append(record)
+            self._next = next(self._staged, None)
+        return records
+
+
+def _open_staging(path: str, stats: IngestStats, properties: Dict[str, Dict[str, Any]], resolver: EntityResolver):
+    """
+    Open the staging file for appending, restoring a resumed run's state
+
+    Records staged after the checkpoint are dropped (their rows are read
+    again), and the property-level updates of the staged ones are replayed
+    into the property table, which was not persisted.
+    """
+    if stats.rows_read and os.path.exists(path):
+        with open(path, "r+b") as f:
+            f.truncate(stats.staged_bytes)
+        for property_id, _, fields in iter_staged(path):
+            apply_property_fields(property_id, fields, properties, resolver=resolver)
+        return open(path, "ab")
+    return open(path, "wb")
+
+
+def load_checkpoint(path: Optional[str], input_path: str) -> Optional[IngestStats]:
+    """Load a checkpoint for the same input file, if one exists"""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("input_path") != os.path.abspath(input_path):
+        return None
+    return IngestStats(**data)
+
+
+def save_checkpoint(path: Optional[str], stats: IngestStats) -> None:
+    """Atomically write the checkpoint"""
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(asdict(stats), f)
+    os.replace(tmp_path, path)
+
+
+def _checkpoint(staging, checkpoint_path: Optional[str], stats: IngestStats) -> None:
+    """Make staged records durable, then record how far the run got"""
+    staging.flush()
+    os.fsync(staging.fileno())
+    stats.staged_bytes = staging.tell()
+    save_checkpoint(checkpoint_path, stats)
+
+
+def ingest_file(
+    path: str,
+    properties: Dict[str, Dict[str, Any]],
+    merge: Callable[[Iterator[Tuple[str, Dict[str, Any]]]], None],
+    fmt: Optional[str] = None,
+    default_source: Optional[str] = None,
+    chunk_size: int = 10_000,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every: int = 100_000,
+    progress: Optional[Callable[[IngestStats, float], None]] = None,
+    resolver: Optional[EntityResolver] = None,
+    create_unmatched: bool = False,
+    on_match: Optional[Callable[[Dict[str, Any], Match], None]] = None,
+    staging_path: Optional[str] = None,
+    sort_run_size: int = 200_000
+) -> IngestStats:
+    """
+    Stream an export into the store with checkpointing
+
+    Args:
+        path: Export file
+        properties: Property table (id -> property dict), updated in place
+        merge: Called once at the end with the staged (property id, record)
+            pairs sorted by property id (see `sort_staged`); merges them
+            into the source records and writes them, together with
+            `properties`, durably
+        fmt: 'csv' or 'jsonl'; inferred from the extension if omitted
+        default_source: Source name for rows without a 'source' column
+        chunk_size: Rows validated and upserted per batch
+        checkpoint_path: Checkpoint file; enables resume
+        checkpoint_every: Rows between checkpoints
+        progress: Callback receiving (stats, rows per second) after each batch
+        resolver: Links rows without property_id to properties by address;
+            defaults to one indexing `properties` (built on first use)
+        create_unmatched: Create properties for addresses matching none
+            instead of rejecting the rows
+        on_match: Called with (record, match) for every address-linked row
+        staging_path: File holding validated records until the merge
+            (default: next to the checkpoint, or a temporary file)
+        sort_run_size: Staged records sorted in memory at a time before
+            being spilled for the merge
+
+    Returns:
+        Final counters for the run
+    """
+    fmt = fmt or detect_format(path)
+    resolver = resolver or EntityResolver(properties.values())
+    stats = load_checkpoint(checkpoint_path, path) or IngestStats(
+        input_path=os.path.abspath(path)
+    )
+    if staging_path is None:
+        if checkpoint_path:
+            staging_path = f"{checkpoint_path}.staged"
+        else:
+            fd, staging_path = tempfile.mkstemp(suffix=".staged")
+            os.close(fd)
+
+    started = time.perf_counter()
+    resumed_at = stats.rows_read
+    since_checkpoint = 0
+
+    with _open_staging(staging_path, stats, properties, resolver) as staging:
+        for chunk in iter_chunks(iter_rows(path, fmt, skip=stats.rows_read), chunk_size):
+            records = normalize_batch(chunk, default_source, stats)
+            staged = stage_records(records, properties, resolver, stats, create_unmatched, on_match)
+            staging.write(b"".join(
+                json.dumps(entry, default=str).encode("utf-8") + b"\n"
+                for entry in staged
+            ))
+            stats.rows_upserted += len(staged)
+            stats.rows_read += len(chunk)
+            since_checkpoint += len(chunk)
+
+            if since_checkpoint >= checkpoint_every:
+                _checkpoint(staging, checkpoint_path, stats)
+                since_checkpoint = 0
+
+            if progress:
+                elapsed = time.perf_counter() - started
+                progress(stats, (stats.rows_read - resumed_at) / elapsed if elapsed else 0.0)
+        _checkpoint(staging, checkpoint_path, stats)
+
+    # The catalog is rewritten once; a crash during the merge resumes with
+    # every row read and merges the staged records again (upserts are idempotent)
+    merge(sort_staged(staging_path, sort_run_size))
+    for leftover in (checkpoint_path, staging_path):
+        if leftover and os.path.exists(leftover):
+            os.remove(leftover)
+    return stats
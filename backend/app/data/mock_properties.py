@@ -3,7 +3,7 @@ Mock property database
 In a real system, this would be replaced with actual database queries
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 
 # Mock property database with basic info
 PROPERTIES = [
@@ -13,6 +13,8 @@ PROPERTIES = [
         "city": "San Francisco",
         "state": "CA",
         "zip": "94102",
+        "latitude": 37.7793,
+        "longitude": -122.4193,
         "image_url": "https://images.unsplash.com/photo-1545324418-cc1a3fa10c00?w=400&h=300&fit=crop"
     },
     {
@@ -21,6 +23,8 @@ PROPERTIES = [
         "city": "Palo Alto",
         "state": "CA",
         "zip": "94301",
+        "latitude": 37.4443,
+        "longitude": -122.1598,
         "image_url": "https://images.unsplash.com/photo-1568605114967-8130f3a36994?w=400&h=300&fit=crop"
     },
     {
@@ -29,6 +33,8 @@ PROPERTIES = [
         "city": "Oakland",
         "state": "CA",
         "zip": "94607",
+        "latitude": 37.8044,
+        "longitude": -122.289,
         "image_url": "https://images.unsplash.com/photo-1580587771525-78b9dba3b914?w=400&h=300&fit=crop"
     },
     {
@@ -37,6 +43,8 @@ PROPERTIES = [
         "city": "San Jose",
         "state": "CA",
         "zip": "95112",
+        "latitude": 37.3541,
+        "longitude": -121.8863,
         "image_url": "https://images.unsplash.com/photo-1572120360610-d971b9d7767c?w=400&h=300&fit=crop"
     },
     {
@@ -45,6 +53,8 @@ PROPERTIES = [
         "city": "Berkeley",
         "state": "CA",
         "zip": "94704",
+        "latitude": 37.8665,
+        "longitude": -122.258,
         "image_url": "https://images.unsplash.com/photo-1564013799919-ab600027ffc6?w=400&h=300&fit=crop"
     }
 ]
@@ -89,3 +99,13 @@ def get_property_by_id(property_id: str) -> Optional[Dict[str, Any]]:
         if prop["id"] == property_id:
             return prop
     return None
+
+
+def iter_properties() -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over every property in the catalog
+    
+    Returns:
+        Iterator of property dicts
+    """
+    return iter(PROPERTIES)
@@ -5,6 +5,12 @@ Each source has intentional inconsistencies, missing data, and conflicts
 
 from typing import Dict, Any, List, Optional
 import random
+from .source_records import SourceRecord, SourceRecordStore
+
+MOCK_PROPERTY_IDS = ["prop_001", "prop_002", "prop_003", "prop_004", "prop_005"]
+
+# Populated once on first access; records are served as views onto it
+_store: Optional[SourceRecordStore] = None
 
 
 def get_zillow_data(property_id: str) -> Dict[str, Any]:
@@ -232,7 +238,31 @@ def get_public_records_data(property_id: str) -> Dict[str, Any]:
     return data_map.get(property_id, {})
 
 
-def get_property_data_from_sources(property_id: str) -> List[Dict[str, Any]]:
+def get_source_store() -> SourceRecordStore:
+    """
+    Get the process-wide source record store, loading mock sources on first use
+    
+    Returns:
+        Store holding every source record
+    """
+    global _store
+    if _store is None:
+        store = SourceRecordStore()
+        for property_id in MOCK_PROPERTY_IDS:
+            sources = [
+                get_zillow_data(property_id),
+                get_redfin_data(property_id),
+                get_public_records_data(property_id)
+            ]
+            # Filter out empty responses
+            for source in sources:
+                if source:
+                    store.upsert(property_id, source)
+        _store = store
+    return _store
+
+
+def get_property_data_from_sources(property_id: str) -> List[SourceRecord]:
     """
     Fetch property data from all mock sources
     
@@ -242,11 +272,4 @@ def get_property_data_from_sources(property_id: str) -> List[Dict[str, Any]]:
     Returns:
         List of data from different sources
     """
-    sources = [
-        get_zillow_data(property_id),
-        get_redfin_data(property_id),
-        get_public_records_data(property_id)
-    ]
-    
-    # Filter out empty responses
-    return [s for s in sources if s]
+    return get_source_store().get(property_id)
@@ -0,0 +1,433 @@
+"""
+Read-only, memory-mapped columnar property catalog
+
+The catalog is built once into a single file and every API worker maps it
+with mmap. Pages are shared through the OS page cache, so adding workers
+doesn't add copies of the catalog, and opening it costs a header parse
+rather than a full load.
+
+File layout (all integers little-endian):
+
+    magic (8 bytes) | header length (u64) | JSON header | column data...
+
+Numeric columns are float64 arrays with NaN for missing values. String
+columns are an int64 offsets array (n + 1 entries) followed by a UTF-8 blob;
+an empty string means the value is missing. Properties are sorted by id and
+their source records are stored contiguously, indexed by `source_start`.
+Each source record's keys and numeric types are a layout listed in the
+header, referenced per record by the `source.layout` column. Fields without
+a column of their own (e.g. Redfin's `days_on_market`) are kept as a JSON
+object in the `source.extra` string column.
+"""
+
+import json
+import math
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+from .source_records import Layout, SourceRecord, SourceTable, split_record
+
+MAGIC = b"PICAT01\n"
+FORMAT_VERSION = 2
+ALIGNMENT = 8
+
+PROPERTY_STRING_FIELDS = ['id', 'address', 'city', 'state', 'zip', 'image_url']
+PROPERTY_NUMERIC_FIELDS = ['latitude', 'longitude']
+
+SOURCE_STRING_FIELDS = [
+    'source', 'property_type', 'description', 'last_updated', 'last_sale_date'
+]
+SOURCE_NUMERIC_FIELDS = [
+    'price', 'bedrooms', 'bathrooms', 'square_feet', 'year_built', 'lot_size',
+    'assessed_value', 'last_sale_price', 'tax_amount'
+]
+
+# Separates the searchable parts of a property in the search blob
+SEARCH_SEPARATOR = "\x00"
+
+
+def _search_text(prop: Dict[str, Any]) -> str:
+    """Lower-cased searchable text for a property (address, city, zip)"""
+    return SEARCH_SEPARATOR.join([
+        (prop.get('address') or '').lower(),
+        (prop.get('city') or '').lower(),
+        prop.get('zip') or ''
+    ]) + SEARCH_SEPARATOR
+
+
+def _pad(out, position: int) -> int:
+    """Write zero padding up to the next aligned offset"""
+    padding = (-position) % ALIGNMENT
+    if padding:
+        out.write(b"\0" * padding)
+    return position + padding
+
+
+class _SpooledColumn:
+    """One column encoded row by row into temporary files"""
+
+    # Rows buffered before their encoded values are written out
+    BUFFER_ROWS = 8192
+
+    def __init__(self, kind: str, directory: str):
+        self.kind = kind
+        self.length = 0
+        self.data = tempfile.TemporaryFile(dir=directory)
+        self.blob = tempfile.TemporaryFile(dir=directory) if kind == "str" else None
+        self.blob_length = 0
+        self._buffer = array('d' if kind == "d" else 'q')
+        if kind == "str":
+            self._buffer.append(0)
+
+    def append(self, value: Any) -> None:
+        if self.kind == "d":
+            self._buffer.append(math.nan if value is None else float(value))
+        elif self.kind == "q":
+            self._buffer.append(value)
+        else:
+            if value:
+                encoded = str(value).encode('utf-8')
+                self.blob.write(encoded)
+                self.blob_length += len(encoded)
+            self._buffer.append(self.blob_length)
+        self.length += 1
+        if len(self._buffer) >= self.BUFFER_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        self.data.write(self._buffer.tobytes())
+        del self._buffer[:]
+
+    def close(self) -> None:
+        self.data.close()
+        if self.blob is not None:
+            self.blob.close()
+
+
+class _ColumnWriter:
+    """
+    Streams columns to temporary files next to the catalog
+
+    Only the column sizes are needed for the header, so the file is
+    assembled by copying each spooled column after it, and memory use
+    doesn't grow with the number of rows.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.columns: Dict[str, _SpooledColumn] = {}
+
+    def add(self, name: str, kind: str) -> _SpooledColumn:
+        """Start a column: 'd' (float64), 'q' (int64) or 'str'"""
+        column = self.columns[name] = _SpooledColumn(kind, self.directory)
+        return column
+
+    def _regions(self) -> Iterator[Any]:
+        """Files in the order their contents are laid out"""
+        for column in self.columns.values():
+            yield column.data
+            if column.blob is not None:
+                yield column.blob
+
+    def finish(self) -> Dict[str, Dict[str, Any]]:
+        """Flush every column and return the header entries"""
+        specs: Dict[str, Dict[str, Any]] = {}
+        position = 0
+        for name, column in self.columns.items():
+            column.flush()
+            spec = specs[name] = {"kind": column.kind, "offset": position, "length": column.length}
+            position += column.data.tell()
+            position += (-position) % ALIGNMENT
+            if column.blob is not None:
+                spec.update(blob_offset=position, blob_length=column.blob_length)
+                position += column.blob_length
+                position += (-position) % ALIGNMENT
+        return specs
+
+    def copy_to(self, out) -> None:
+        """Append the column data, aligned as `finish` laid it out"""
+        written = 0
+        for region in self._regions():
+            region.seek(0)
+            shutil.copyfileobj(region, out, 1 << 20)
+            written += region.tell()
+            written = _pad(out, written)
+
+    def close(self) -> None:
+        for column in self.columns.values():
+            column.close()
+
+
+def build_catalog(
+    path: str,
+    properties: Iterable[Dict[str, Any]],
+    get_sources: Callable[[str], Iterable[Mapping[str, Any]]]
+) -> int:
+    """
+    Build a catalog file from property and source records
+
+    The file is written next to `path` and atomically renamed into place,
+    so workers that already mapped the previous version keep a consistent
+    view. Source records are streamed into spooled columns, so only the
+    property table is held in memory.
+
+    Args:
+        path: Destination file path
+        properties: Property dicts (must include 'id')
+        get_sources: Callable returning source records for a property id;
+            called once per property, in ascending id order
+
+    Returns:
+        Number of properties written
+    """
+    props = sorted(properties, key=lambda p: p['id'])
+
+    writer = _ColumnWriter(os.path.dirname(os.path.abspath(path)))
+    try:
+        property_strings = {field: writer.add(field, "str") for field in PROPERTY_STRING_FIELDS}
+        property_numeric = {field: writer.add(field, "d") for field in PROPERTY_NUMERIC_FIELDS}
+        search_text = writer.add('search_text', "str")
+        source_start = writer.add('source_start', "q")
+        source_strings = {field: writer.add(f"source.{field}", "str") for field in SOURCE_STRING_FIELDS}
+        source_numeric = {field: writer.add(f"source.{field}", "d") for field in SOURCE_NUMERIC_FIELDS}
+        source_layout = writer.add('source.layout', "q")
+        source_extra = writer.add('source.extra', "str")
+
+        layouts: Dict[Layout, int] = {}
+        source_count = 0
+        source_start.append(0)
+        for prop in props:
+            for field, column in property_strings.items():
+                column.append(prop.get(field))
+            for field, column in property_numeric.items():
+                column.append(prop.get(field))
+            search_text.append(_search_text(prop))
+
+            for record in get_sources(prop['id']):
+                layout, values, extra = split_record(record, SOURCE_NUMERIC_FIELDS, SOURCE_STRING_FIELDS)
+                for field, column in source_strings.items():
+                    column.append(values.get(field))
+                for field, column in source_numeric.items():
+                    column.append(values.get(field))
+                source_layout.append(layouts.setdefault(layout, len(layouts)))
+                source_extra.append(json.dumps(extra) if extra else None)
+                source_count += 1
+            source_start.append(source_count)
+
+        header = json.dumps({
+            "version": FORMAT_VERSION,
+            "properties": len(props),
+            "sources": source_count,
+            "source_layouts": list(layouts),
+            "columns": writer.finish()
+        }).encode('utf-8')
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as out:
+            out.write(MAGIC)
+            out.write(struct.pack('<Q', len(header)))
+            out.write(header)
+            _pad(out, len(MAGIC) + 8 + len(header))
+            writer.copy_to(out)
+            out.flush()
+            os.fsync(out.fileno())
+    finally:
+        writer.close()
+    os.replace(tmp_path, path)
+    return len(props)
+
+
+class _StringColumn:
+    """Zero-copy view over an offsets array and UTF-8 blob"""
+
+    __slots__ = ('offsets', 'blob', 'base')
+
+    def __init__(self, offsets: memoryview, blob: memoryview, base: int):
+        self.offsets = offsets
+        self.blob = blob
+        # Absolute position of the blob within the mapped file
+        self.base = base
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        start = self.offsets[index]
+        end = self.offsets[index + 1]
+        if start == end:
+            return None
+        return str(self.blob[start:end], 'utf-8')
+
+
+class SharedCatalog:
+    """Property catalog served directly from a memory-mapped file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._file_id = self._identify(os.fstat(f.fileno()))
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a property catalog file: {path}")
+        (header_length,) = struct.unpack_from('<Q', self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(self._mmap[header_start:header_start + header_length])
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Catalog {path} has format version {header.get('version')}, expected "
+                f"{FORMAT_VERSION}; rebuild it with `python -m app.cli build-catalog`"
+            )
+        data_start = header_start + header_length
+        data_start += (-data_start) % ALIGNMENT
+
+        self.property_count: int = header["properties"]
+        self.source_count: int = header["sources"]
+
+        buffer = memoryview(self._mmap)
+        self._columns: Dict[str, Any] = {}
+        for name, spec in header["columns"].items():
+            offset = data_start + spec["offset"]
+            if spec["kind"] == "str":
+                offsets = buffer[offset:offset + 8 * (spec["length"] + 1)].cast('q')
+                blob_offset = data_start + spec["blob_offset"]
+                blob = buffer[blob_offset:blob_offset + spec["blob_length"]]
+                self._columns[name] = _StringColumn(offsets, blob, blob_offset)
+            else:
+                self._columns[name] = buffer[offset:offset + 8 * spec["length"]].cast(spec["kind"])
+
+        # Source records are served as views straight onto the mapped columns
+        self._sources = SourceTable(
+            numeric={f: self._columns[f"source.{f}"] for f in SOURCE_NUMERIC_FIELDS},
+            strings={f: self._columns[f"source.{f}"] for f in SOURCE_STRING_FIELDS},
+            extras=_JsonColumn(self._columns['source.extra']),
+            layout_ids=self._columns['source.layout'],
+            layouts=[tuple(tuple(item) for item in layout) for layout in header["source_layouts"]]
+        )
+
+    @staticmethod
+    def _identify(stat: os.stat_result):
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def is_stale(self) -> bool:
+        """Whether the file at `path` was replaced since it was mapped"""
+        try:
+            return self._identify(os.stat(self.path)) != self._file_id
+        except FileNotFoundError:
+            return False
+
+    def _property_at(self, row: int) -> Dict[str, Any]:
+        prop: Dict[str, Any] = {}
+        for field in PROPERTY_STRING_FIELDS:
+            prop[field] = self._columns[field][row] or ("" if field != 'image_url' else None)
+        for field in PROPERTY_NUMERIC_FIELDS:
+            value = self._columns[field][row]
+            prop[field] = None if math.isnan(value) else value
+        return prop
+
+    def _row_for_id(self, property_id: str) -> Optional[int]:
+        ids = self._columns['id']
+        row = bisect_left(_KeyView(ids), property_id)
+        if row < len(ids) and ids[row] == property_id:
+            return row
+        return None
+
+    def search_properties(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Search properties by address, city, or zip code
+
+        Args:
+            query: Search query string
+
+        Returns:
+            List of matching properties
+        """
+        if not query or len(query.strip()) < 2:
+            return [self._property_at(row) for row in range(min(5, self.property_count))]
+
+        needle = query.lower().strip().encode('utf-8')
+        column = self._columns['search_text']
+        offsets = column.offsets
+        start = column.base
+        end = start + len(column.blob)
+
+        # Scan the whole search blob with mmap's bytes search, then map each
+        # hit back to its row and continue from the start of the next row
+        results = []
+        position = self._mmap.find(needle, start, end)
+        while position != -1:
+            row = bisect_right(offsets, position - start) - 1
+            results.append(self._property_at(row))
+            position = self._mmap.find(needle, start + offsets[row + 1], end)
+        return results
+
+    def get_property_by_id(self, property_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get property by ID
+
+        Args:
+            property_id: Property ID
+
+        Returns:
+            Property dict or None if not found
+        """
+        row = self._row_for_id(property_id)
+        return self._property_at(row) if row is not None else None
+
+    def get_property_data_from_sources(self, property_id: str) -> List[SourceRecord]:
+        """
+        Fetch source records stored for a property
+
+        Args:
+            property_id: Property ID
+
+        Returns:
+            List of data from different sources
+        """
+        row = self._row_for_id(property_id)
+        if row is None:
+            return []
+        start = self._columns['source_start']
+        return [SourceRecord(self._sources, i) for i in range(start[row], start[row + 1])]
+
+    def iter_properties(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over every property in the catalog"""
+        for row in range(self.property_count):
+            yield self._property_at(row)
+
+
+class _JsonColumn:
+    """Decodes a string column of JSON objects on access"""
+
+    __slots__ = ('column',)
+
+    def __init__(self, column: _StringColumn):
+        self.column = column
+
+    def __len__(self) -> int:
+        return len(self.column)
+
+    def __getitem__(self, index: int) -> Optional[Dict[str, Any]]:
+        value = self.column[index]
+        return json.loads(value) if value is not None else None
+
+
+class _KeyView:
+    """Sequence adapter so bisect can search a string column"""
+
+    __slots__ = ('column',)
+
+    def __init__(self, column: _StringColumn):
+        self.column = column
+
+    def __len__(self) -> int:
+        return len(self.column)
+
+    def __getitem__(self, index: int) -> str:
+        return self.column[index] or ""
+
@@ -0,0 +1,238 @@
+"""
+Compact columnar storage for source records
+
+Source records used to be free-form dicts, one per (property, source).
+Here they live in a `SourceTable`: numeric fields in typed float64 columns
+(NaN for missing), low-cardinality strings interned, and anything else in a
+per-row extras dict that is usually empty. A `SourceRecord` is a two-slot
+view onto one row that behaves like a read-only mapping, so existing code
+that does `source.get('price')` keeps working; API models are only built
+from it at the response boundary.
+
+Each row also points at a layout: the record's keys in their original
+order, and for numeric ones whether the value was an int or a float. Rows
+from the same source share a handful of layouts, and a record reads back
+as exactly the dict it was stored from.
+"""
+
+import math
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Any, Collection, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Typed columns
+NUMERIC_FIELDS = ['price', 'bedrooms', 'bathrooms', 'square_feet', 'year_built', 'lot_size']
+INT_FIELDS = {'bedrooms', 'year_built'}
+
+# Few distinct values across the catalog - stored once via sys.intern
+INTERNED_FIELDS = ['source', 'property_type']
+
+# Free text, one string per row
+TEXT_FIELDS = ['description', 'last_updated']
+
+# Where a key's value lives: numeric column (read back as int or float),
+# string column, or the row's extras dict
+INT, FLOAT, STRING, EXTRA = 'i', 'f', 's', 'x'
+
+# (key, kind) pairs in the record's key order
+Layout = Tuple[Tuple[str, str], ...]
+
+
+def _decode_number(value: float, kind: str) -> Any:
+    """Convert a stored float back to the type it was stored from"""
+    if math.isnan(value):
+        return None
+    return int(value) if kind == INT else value
+
+
+def split_record(
+    record: Mapping[str, Any],
+    numeric_fields: Collection[str],
+    string_fields: Collection[str]
+) -> Tuple[Layout, Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Decide where each value of a record is stored
+
+    Values that a column can't hold exactly (a string in a numeric field,
+    an empty string) go to the extras instead.
+
+    Args:
+        record: Source record with arbitrary keys
+        numeric_fields: Fields with a float64 column
+        string_fields: Fields with a string column
+
+    Returns:
+        (layout, values for the columns, extras or None)
+    """
+    layout = []
+    values: Dict[str, Any] = {}
+    extras: Dict[str, Any] = {}
+    for key, value in record.items():
+        value_type = type(value)
+        if key in numeric_fields and (value is None or value_type is int or value_type is float):
+            kind = INT if value_type is int else FLOAT
+            values[key] = value
+        elif key in string_fields and (value is None or (value_type is str and value)):
+            kind = STRING
+            values[key] = value
+        else:
+            kind = EXTRA
+            extras[key] = value
+        layout.append((key, kind))
+    return tuple(layout), values, extras or None
+
+
+class SourceTable:
+    """
+    Column store for source records
+
+    Columns are any indexable sequences, so the same record view works over
+    growable in-memory arrays and over read-only memory-mapped columns.
+    """
+
+    def __init__(
+        self,
+        numeric: Optional[Dict[str, Sequence[float]]] = None,
+        strings: Optional[Dict[str, Sequence[Optional[str]]]] = None,
+        extras: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+        layout_ids: Optional[Sequence[int]] = None,
+        layouts: Optional[Sequence[Layout]] = None
+    ):
+        if numeric is None and strings is None:
+            # Empty, appendable table
+            numeric = {field: array('d') for field in NUMERIC_FIELDS}
+            strings = {field: [] for field in INTERNED_FIELDS + TEXT_FIELDS}
+            extras = []
+            layout_ids = array('q')
+        self.numeric = numeric or {}
+        self.strings = strings or {}
+        self.extras = extras
+        self.layout_ids = layout_ids if layout_ids is not None else array('q')
+        # Layout id -> {key: kind}, in the record's key order
+        self.layouts: List[Dict[str, str]] = [dict(layout) for layout in layouts or ()]
+        self._layout_index: Dict[Layout, int] = {
+            tuple(layout.items()): layout_id for layout_id, layout in enumerate(self.layouts)
+        }
+
+    def __len__(self) -> int:
+        return len(self.layout_ids)
+
+    def _layout_id(self, layout: Layout) -> int:
+        layout_id = self._layout_index.get(layout)
+        if layout_id is None:
+            layout_id = self._layout_index[layout] = len(self.layouts)
+            self.layouts.append(dict(layout))
+        return layout_id
+
+    def append(self, record: Mapping[str, Any]) -> int:
+        """
+        Append a record dict
+
+        Args:
+            record: Source record with arbitrary keys
+
+        Returns:
+            Row index of the new record
+        """
+        layout, values, extra = split_record(record, self.numeric, self.strings)
+        for field, column in self.numeric.items():
+            value = values.get(field)
+            column.append(math.nan if value is None else float(value))
+        for field, column in self.strings.items():
+            value = values.get(field)
+            if value is not None and field in INTERNED_FIELDS:
+                value = sys.intern(value)
+            column.append(value)
+        self.extras.append(extra)
+        self.layout_ids.append(self._layout_id(layout))
+        return len(self.layout_ids) - 1
+
+
+class SourceRecord(Mapping):
+    """Read-only mapping view onto one row of a `SourceTable`"""
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: SourceTable, row: int):
+        self._table = table
+        self._row = row
+
+    def _layout(self) -> Dict[str, str]:
+        return self._table.layouts[self._table.layout_ids[self._row]]
+
+    def __getitem__(self, key: str) -> Any:
+        table = self._table
+        kind = table.layouts[table.layout_ids[self._row]].get(key)
+        if kind is None:
+            raise KeyError(key)
+        if kind == STRING:
+            return table.strings[key][self._row]
+        if kind == EXTRA:
+            return table.extras[self._row][key]
+        return _decode_number(table.numeric[key][self._row], kind)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._layout()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._layout())
+
+    def __len__(self) -> int:
+        return len(self._layout())
+
+    def __repr__(self) -> str:
+        return f"SourceRecord({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the row as a plain dict"""
+        return {key: self[key] for key in self}
+
+
+class SourceRecordStore:
+    """Source records for many properties, keyed by (property_id, source)"""
+
+    def __init__(self):
+        self.table = SourceTable()
+        self._rows: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def property_ids(self) -> List[str]:
+        """Ids of every property that has at least one source record"""
+        return list(self._rows)
+
+    def upsert(self, property_id: str, record: Mapping[str, Any]) -> bool:
+        """
+        Insert a record, or replace the one from the same source
+
+        A replaced record gets a new row rather than being overwritten, so
+        views handed out before keep reading the values they started with.
+
+        Args:
+            property_id: Internal property ID
+            record: Source record (must include 'source')
+
+        Returns:
+            True if an existing record was replaced
+        """
+        rows = self._rows.setdefault(property_id, [])
+        source = record.get('source')
+        sources = self.table.strings['source']
+        for position, row in enumerate(rows):
+            if sources[row] == source:
+                rows[position] = self.table.append(record)
+                return True
+        rows.append(self.table.append(record))
+        return False
+
+    def get(self, property_id: str) -> List[SourceRecord]:
+        """Record views for a property, in insertion order"""
+        return [SourceRecord(self.table, row) for row in self._rows.get(property_id, ())]
@@ -0,0 +1,200 @@
+"""
+Grid-based spatial index over property coordinates
+Used to answer nearest-neighbour and radius queries for comparables
+"""
+
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Roughly 5.5 km of latitude per cell - small enough that a ring search
+# touches few cells, large enough that sparse areas don't need many rings
+DEFAULT_CELL_DEGREES = 0.05
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex:
+    """
+    Uniform lat/lon grid mapping cells to the points that fall in them
+
+    Queries only visit cells around the query point, so lookup cost is
+    proportional to the local density rather than the catalog size.
+    """
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._cells: Dict[Tuple[int, int], List[Tuple[str, float, float]]] = {}
+        self._points: Dict[str, Tuple[float, float]] = {}
+        # Optional per-point data, so callers don't need a second lookup
+        self._payloads: Dict[str, Any] = {}
+        # Bounding box of occupied cells (min_row, max_row, min_col, max_col);
+        # only ever grows, which keeps it a valid upper bound after removals
+        self._bounds: Optional[Tuple[int, int, int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (
+            int(math.floor(lat / self.cell_degrees)),
+            int(math.floor(lon / self.cell_degrees))
+        )
+
+    def add(self, key: str, lat: float, lon: float, payload: Any = None) -> None:
+        """Insert (or move) a point, with optional data returned by `payload`"""
+        if key in self._points:
+            self.remove(key)
+        self._points[key] = (lat, lon)
+        if payload is not None:
+            self._payloads[key] = payload
+        cell = self._cell(lat, lon)
+        self._cells.setdefault(cell, []).append((key, lat, lon))
+        if self._bounds is None:
+            self._bounds = (cell[0], cell[0], cell[1], cell[1])
+        else:
+            min_i, max_i, min_j, max_j = self._bounds
+            self._bounds = (
+                min(min_i, cell[0]), max(max_i, cell[0]),
+                min(min_j, cell[1]), max(max_j, cell[1])
+            )
+
+    def remove(self, key: str) -> None:
+        """Remove a point if present"""
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        self._payloads.pop(key, None)
+        cell = self._cell(*point)
+        bucket = [entry for entry in self._cells.get(cell, []) if entry[0] != key]
+        if bucket:
+            self._cells[cell] = bucket
+        else:
+            self._cells.pop(cell, None)
+
+    def location(self, key: str) -> Optional[Tuple[float, float]]:
+        """Coordinates of an indexed point"""
+        return self._points.get(key)
+
+    def payload(self, key: str) -> Any:
+        """Data stored with an indexed point, or None"""
+        return self._payloads.get(key)
+
+    def _ring(self, center: Tuple[int, int], radius: int) -> Iterable[Tuple[int, int]]:
+        """Cells at Chebyshev distance `radius` from `center`"""
+        ci, cj = center
+        if radius == 0:
+            yield center
+            return
+        for dj in range(-radius, radius + 1):
+            yield (ci - radius, cj + dj)
+            yield (ci + radius, cj + dj)
+        for di in range(-radius + 1, radius):
+            yield (ci + di, cj - radius)
+            yield (ci + di, cj + radius)
+
+    def _ring_min_distance_km(self, lat: float, ring: int) -> float:
+        """Lower bound on the distance to any point outside `ring` rings"""
+        if ring <= 0:
+            return 0.0
+        # Longitude degrees shrink with latitude; use the widest case nearby
+        deg = ring * self.cell_degrees
+        km_per_deg_lat = math.pi * EARTH_RADIUS_KM / 180
+        cos_lat = max(0.0, math.cos(math.radians(min(89.0, abs(lat) + deg))))
+        return deg * km_per_deg_lat * min(1.0, cos_lat)
+
+    def _max_ring(self, center: Tuple[int, int]) -> int:
+        """Ring count from `center` that covers every occupied cell"""
+        if self._bounds is None:
+            return 0
+        min_i, max_i, min_j, max_j = self._bounds
+        return max(
+            abs(center[0] - min_i), abs(center[0] - max_i),
+            abs(center[1] - min_j), abs(center[1] - max_j)
+        )
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int,
+        radius_km: Optional[float] = None,
+        exclude: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the k nearest points, optionally restricted to a radius
+
+        Args:
+            lat: Query latitude
+            lon: Query longitude
+            k: Maximum number of results
+            radius_km: Optional search radius in kilometres
+            exclude: Key to skip (typically the subject property)
+
+        Returns:
+            List of (key, distance_km) sorted by distance
+        """
+        if k <= 0 or not self._points:
+            return []
+
+        center = self._cell(lat, lon)
+        # Max-heap of the best k seen so far, keyed on negative distance
+        best: List[Tuple[float, str]] = []
+        max_ring = self._max_ring(center)
+
+        ring = 0
+        while ring <= max_ring:
+            for cell in self._ring(center, ring):
+                for key, plat, plon in self._cells.get(cell, ()):
+                    if key == exclude:
+                        continue
+                    distance = haversine_km(lat, lon, plat, plon)
+                    if radius_km is not None and distance > radius_km:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, key))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, key))
+
+            # Everything beyond the next ring is at least this far away
+            bound = self._ring_min_distance_km(lat, ring)
+            if radius_km is not None and bound > radius_km:
+                break
+            if len(best) == k and bound > -best[0][0]:
+                break
+            ring += 1
+
+        return sorted(((key, -neg) for neg, key in best), key=lambda item: item[1])
+
+    def within(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        exclude: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """All points within `radius_km`, sorted by distance"""
+        return self.nearest(lat, lon, len(self._points), radius_km=radius_km, exclude=exclude)
+
+
+def build_index(
+    points: Iterable[Tuple[str, Optional[float], Optional[float], Any]],
+    cell_degrees: float = DEFAULT_CELL_DEGREES
+) -> GridIndex:
+    """Build a grid index from (key, latitude, longitude, payload) tuples, skipping unlocated points"""
+    index = GridIndex(cell_degrees)
+    for key, lat, lon, payload in points:
+        if lat is None or lon is None:
+            continue
+        index.add(key, lat, lon, payload)
+    return index
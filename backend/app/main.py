@@ -6,15 +6,51 @@ from pathlib import Path
 # Add parent directory to path so we can import from 'app' package
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.config import settings
+from app.api.middleware import ProfilingMiddleware
+from app.api.routes import admin as admin_routes
+from app.api.routes.admin import require_admin
 from app.api.routes import property as property_routes
+from app.services.admission import AdmissionRejected, admission
+from app.services.analysis_cache import analysis_cache
+from app.services.cache_warming import access_tracker, warming_scheduler
+from app.services.comparables_service import prebuild_spatial_index
+from app.services.executor import cpu_executor
+from app.services.metrics import metrics
+from app.services.model_router import model_router
+from app.services.ollama_pool import ollama_pool
+from app.services.profiling import loop_lag_monitor
+from app.services.source_watch import source_watcher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background tasks"""
+    if settings.warm_enabled:
+        warming_scheduler.start()
+    if settings.loop_lag_monitor_enabled:
+        loop_lag_monitor.start()
+    source_watcher.start()
+    prebuild = asyncio.create_task(prebuild_spatial_index()) if settings.spatial_index_prebuild else None
+    yield
+    if prebuild is not None:
+        prebuild.cancel()
+    await warming_scheduler.stop()
+    await loop_lag_monitor.stop()
+    await source_watcher.stop()
+    cpu_executor.shutdown()
+
 
 app = FastAPI(
     title="Property Insights API",
     description="AI-powered real estate information analysis system",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -26,8 +62,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(property_routes.router, prefix="/api/property", tags=["property"])
+app.include_router(admin_routes.router, prefix="/admin", tags=["admin"])
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Turn admission control rejections into 429 with Retry-After"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": exc.reason},
+        headers={"Retry-After": exc.retry_after_header}
+    )
 
 
 @app.get("/")
@@ -46,6 +95,47 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", dependencies=[Depends(require_admin)])
+async def get_metrics():
+    """In-process metrics for this worker (lists Ollama host URLs, so admin only)"""
+    snapshot = metrics.snapshot()
+    counters = snapshot["counters"]
+    hits = counters.get("analysis_cache.hits", 0)
+    misses = counters.get("analysis_cache.misses", 0)
+    requests = hits + misses
+    snapshot["analysis_cache"] = {
+        "entries": len(analysis_cache),
+        "tracked_properties": len(access_tracker),
+        "hit_rate": hits / requests if requests else 0.0,
+        # Share of analyze requests answered instantly thanks to warming
+        "warmed_hit_rate": counters.get("analysis_cache.warmed_hits", 0) / requests if requests else 0.0
+    }
+    snapshot["ollama_hosts"] = ollama_pool.status()
+    snapshot["watch"] = {"watched_properties": source_watcher.watched}
+    # Share of each stage's runs routed to the small model
+    stages = {
+        name.split(".")[1] for name in counters
+        if name.startswith("model_tier.") and name.count(".") == 2
+    }
+    small_share = {}
+    for stage in sorted(stages):
+        small = counters.get(f"model_tier.{stage}.small", 0)
+        total = small + counters.get(f"model_tier.{stage}.large", 0)
+        small_share[stage] = small / total if total else 0.0
+    snapshot["model_tiers"] = {
+        "enabled": model_router.enabled,
+        "small_model": model_router.small_model,
+        "large_model": model_router.large_model,
+        "small_share": small_share
+    }
+    snapshot["admission"] = {
+        "in_flight": admission.in_flight,
+        "estimated_wait_seconds": admission.estimated_wait(),
+        "avg_analysis_seconds": admission.avg_analysis_seconds
+    }
+    return snapshot
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
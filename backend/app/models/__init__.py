@@ -6,6 +6,9 @@ from .property import (
     FieldAnalysis,
     ConflictResolution,
     PropertySummary,
+    ComparableProperty,
+    ComparableStats,
+    ComparablesResult,
     PropertyAnalysis
 )
 
@@ -15,5 +18,8 @@ __all__ = [
     "FieldAnalysis",
     "ConflictResolution",
     "PropertySummary",
+    "ComparableProperty",
+    "ComparableStats",
+    "ComparablesResult",
     "PropertyAnalysis"
 ]
@@ -1,5 +1,6 @@
 """Property data models"""
 
+from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, List, Any
 
@@ -12,6 +13,8 @@ class PropertySearchResult(BaseModel):
     city: str
     state: str
     zip: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     image_url: Optional[str] = None
 
 
@@ -67,6 +70,44 @@ class PropertySummary(BaseModel):
     concerns: List[str] = Field(default_factory=list)
 
 
+class ComparableProperty(BaseModel):
+    """Nearby property with its resolved values"""
+    
+    id: str
+    address: str
+    distance_km: float
+    price: Optional[float] = None
+    bedrooms: Optional[int] = None
+    bathrooms: Optional[float] = None
+    square_feet: Optional[float] = None
+    year_built: Optional[int] = None
+    price_per_sqft: Optional[float] = None
+
+
+class ComparableStats(BaseModel):
+    """Aggregate statistics over a set of comparables"""
+    
+    count: int = 0
+    median_price: Optional[float] = None
+    median_price_per_sqft: Optional[float] = None
+    mean_price_per_sqft: Optional[float] = None
+    min_price_per_sqft: Optional[float] = None
+    max_price_per_sqft: Optional[float] = None
+    median_square_feet: Optional[float] = None
+    median_age_years: Optional[float] = None
+
+
+class ComparablesResult(BaseModel):
+    """Comparables for a subject property"""
+    
+    property_id: str
+    address: str
+    radius_km: Optional[float] = None
+    subject_price_per_sqft: Optional[float] = None
+    comparables: List[ComparableProperty] = Field(default_factory=list)
+    stats: ComparableStats = Field(default_factory=ComparableStats)
+
+
 class PropertyAnalysis(BaseModel):
     """Complete property analysis from multiple sources"""
     
@@ -95,3 +136,59 @@ class PropertyAnalysis(BaseModel):
         ge=0.0,
         le=1.0
     )
+    
+    profile: str = Field(
+        default="full",
+        description="Pipeline profile that produced this analysis (full or fast)"
+    )
+    
+    degraded_stages: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Stages that fell back to a cheaper result, with the reason (deadline, timeout or error)"
+    )
+    
+    difficulty: Optional[float] = Field(
+        default=None,
+        description="How hard the sources were to reconcile (0-1), used to pick each stage's model"
+    )
+    
+    stage_models: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Model chosen for each LLM stage"
+    )
+
+
+class AnalysisVersion(BaseModel):
+    """One stored analysis in a property's history"""
+    
+    version: int = Field(description="Version id (analysis time in microseconds since the epoch)")
+    recorded_at: datetime
+    confidence_score: float
+    source_fingerprint: str = Field(
+        description="Hash of the source data; unchanged when only the pipeline output changed"
+    )
+
+
+class PropertyHistory(BaseModel):
+    """Stored analyses of a property within a time range"""
+    
+    property_id: str
+    versions: List[AnalysisVersion] = Field(default_factory=list)
+
+
+class FieldChange(BaseModel):
+    """A value that differs between two analyses"""
+    
+    path: str = Field(description="Dotted path, e.g. data_sources[Zillow].price")
+    before: Any = None
+    after: Any = None
+
+
+class AnalysisDiff(BaseModel):
+    """Differences between two stored analyses of a property"""
+    
+    property_id: str
+    from_version: AnalysisVersion
+    to_version: AnalysisVersion
+    sources_changed: bool
+    changes: List[FieldChange] = Field(default_factory=list)
@@ -2,5 +2,6 @@
 
 from .llm_service import LLMService
 from .property_service import PropertyService
+from .comparables_service import ComparablesService
 
-__all__ = ["LLMService", "PropertyService"]
+__all__ = ["LLMService", "PropertyService", "ComparablesService"]
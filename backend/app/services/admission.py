@@ -0,0 +1,171 @@
+"""Admission control: per-client rate limits and queue-based load shedding"""
+
+import math
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+from app.config import settings
+from app.services.metrics import metrics
+from app.services.ollama_pool import OllamaPool, ollama_pool
+
+
+class AdmissionRejected(Exception):
+    """A request was turned away; the client should retry after `retry_after` seconds"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_take(self, cost: float) -> float:
+        """
+        Take `cost` tokens if available
+
+        Returns:
+            0 if taken, otherwise seconds until enough tokens will be available
+        """
+        self._refill(time.monotonic())
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (min(cost, self.burst) - self.tokens) / self.rate
+
+    @property
+    def full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.burst
+
+
+class AdmissionController:
+    """
+    Decides whether to accept a request before it reaches the LLM
+
+    Two checks:
+    - Per-client token buckets, where each kind of request has a cost
+      (a search is cheap, an analysis that needs the LLM is expensive)
+    - Load shedding: the expected wait for a new analysis is estimated from
+      the analyses in flight, the number of healthy Ollama hosts and a moving
+      average of analysis duration; above the threshold, new work is refused
+      so the accepted requests keep a predictable latency
+    """
+
+    def __init__(
+        self,
+        pool: OllamaPool,
+        enabled: bool,
+        rate_per_minute: float,
+        burst: float,
+        costs: Dict[str, float],
+        max_queue_wait_seconds: float,
+        parallel_per_host: int,
+        initial_analysis_seconds: float,
+        max_clients: int = 10_000
+    ):
+        self.pool = pool
+        self.enabled = enabled
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.costs = costs
+        self.max_queue_wait_seconds = max_queue_wait_seconds
+        self.parallel_per_host = parallel_per_host
+        self.avg_analysis_seconds = initial_analysis_seconds
+        self.max_clients = max_clients
+        self.in_flight = 0
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def check_rate(self, client_id: str, kind: str) -> None:
+        """
+        Charge a client for one request
+
+        Raises:
+            AdmissionRejected: If the client's bucket is empty
+        """
+        if not self.enabled:
+            return
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            if len(self._buckets) >= self.max_clients:
+                self._prune()
+            bucket = self._buckets[client_id] = TokenBucket(self.rate, self.burst)
+        wait = bucket.try_take(self.costs.get(kind, 1.0))
+        if wait > 0:
+            metrics.increment(f"admission.rate_limited.{kind}")
+            raise AdmissionRejected("Rate limit exceeded", wait)
+
+    def estimated_wait(self) -> float:
+        """Seconds a new analysis would wait for an LLM slot"""
+        capacity = max(1, len(self.pool.healthy_hosts()) * self.parallel_per_host)
+        return self.in_flight / capacity * self.avg_analysis_seconds
+
+    def check_queue(self) -> None:
+        """
+        Refuse new LLM work when the backlog is too long
+
+        Raises:
+            AdmissionRejected: If the estimated wait exceeds the threshold
+        """
+        if not self.enabled:
+            return
+        wait = self.estimated_wait()
+        metrics.set_gauge("admission.estimated_wait_seconds", wait)
+        if wait > self.max_queue_wait_seconds:
+            metrics.increment("admission.shed")
+            raise AdmissionRejected(
+                f"Server busy (estimated wait {wait:.0f}s)",
+                wait - self.max_queue_wait_seconds
+            )
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Count an admitted analysis while it runs and learn its duration"""
+        self.in_flight += 1
+        metrics.set_gauge("admission.in_flight", self.in_flight)
+        started = time.monotonic()
+        completed = False
+        try:
+            yield
+            completed = True
+        finally:
+            self.in_flight -= 1
+            metrics.set_gauge("admission.in_flight", self.in_flight)
+            if completed:
+                # Exponential moving average; failures and cancellations are
+                # not representative of a normal analysis
+                elapsed = time.monotonic() - started
+                self.avg_analysis_seconds = 0.8 * self.avg_analysis_seconds + 0.2 * elapsed
+
+    def _prune(self) -> None:
+        """Drop buckets that have refilled; they behave like new ones"""
+        self._buckets = {cid: b for cid, b in self._buckets.items() if not b.full}
+
+
+admission = AdmissionController(
+    pool=ollama_pool,
+    enabled=settings.admission_enabled,
+    rate_per_minute=settings.rate_limit_per_minute,
+    burst=settings.rate_limit_burst,
+    costs=settings.rate_limit_costs,
+    max_queue_wait_seconds=settings.admission_max_queue_wait_seconds,
+    parallel_per_host=settings.admission_parallel_per_host,
+    initial_analysis_seconds=settings.admission_initial_analysis_seconds
+)
@@ -0,0 +1,183 @@
+"""Cache of completed property analyses with single-flight computation"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+from app.config import settings
+from app.models.property import PropertyAnalysis
+from app.services.metrics import metrics
+
+
+def cache_key(property_id: str, profile: str = "full") -> str:
+    """Cache key for an analysis; the full profile uses the bare property id"""
+    return property_id if profile == "full" else f"{property_id}:{profile}"
+
+
+@dataclass
+class _Job:
+    """An in-flight computation and the callers waiting on it"""
+
+    task: Optional["asyncio.Task[PropertyAnalysis]"] = None
+    waiters: int = 0
+    # Cancel the computation once nobody is waiting for it anymore
+    cancel_if_abandoned: bool = False
+    # Invalidated while running: answers its waiters but isn't cached
+    detached: bool = False
+
+
+@dataclass
+class CacheEntry:
+    """A cached analysis and where it came from"""
+
+    analysis: PropertyAnalysis
+    computed_at: float
+    # True if produced by background work rather than a user request
+    warmed: bool = False
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.computed_at
+
+
+class AnalysisCache:
+    """
+    Completed analyses keyed by property (and pipeline options)
+
+    Concurrent requests for the same key share one computation instead of
+    each running the full LLM pipeline.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, CacheEntry] = {}
+        self._inflight: Dict[str, _Job] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Entry for a key if it exists and is not stale"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.age > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        return entry
+
+    def put(self, key: str, analysis: PropertyAnalysis, warmed: bool = False) -> None:
+        """Store an analysis, evicting the oldest entry when full"""
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            oldest = min(self._entries, key=lambda k: self._entries[k].computed_at)
+            del self._entries[oldest]
+        self._entries[key] = CacheEntry(analysis, time.monotonic(), warmed)
+
+    def invalidate(self, key: str) -> None:
+        """
+        Drop a cached analysis, and detach any computation in flight for it
+
+        A detached computation still answers the callers already waiting on
+        it, but its result isn't cached and later callers start a new one,
+        so nothing computed from the invalidated inputs is served again.
+        """
+        self._entries.pop(key, None)
+        job = self._inflight.pop(key, None)
+        if job is not None:
+            job.detached = True
+
+    def is_inflight(self, key: str) -> bool:
+        """Whether an analysis for this key is currently being computed"""
+        return key in self._inflight
+
+    def waiters(self, key: str) -> int:
+        """Callers currently awaiting the in-flight computation for this key"""
+        job = self._inflight.get(key)
+        return job.waiters if job is not None else 0
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[PropertyAnalysis]],
+        warmed: bool = False,
+        cancel_if_abandoned: bool = False,
+        refresh: bool = False
+    ) -> PropertyAnalysis:
+        """
+        Return a fresh cached analysis or compute (once) and cache it
+
+        Args:
+            key: Cache key
+            compute: Coroutine factory running the pipeline
+            warmed: Mark the result as produced by background work
+            cancel_if_abandoned: Cancel the computation when every waiter has
+                been cancelled (speculative work, or a request whose client
+                disconnected); ignored once a caller that needs the result joins
+            refresh: Compute even if a fresh entry exists; that entry keeps
+                being served until the new analysis replaces it
+
+        Returns:
+            The analysis
+        """
+        entry = None if refresh else self.get_entry(key)
+        if entry is not None:
+            metrics.increment("analysis_cache.hits")
+            if entry.warmed:
+                metrics.increment("analysis_cache.warmed_hits")
+            return entry.analysis
+
+        job = self._inflight.get(key)
+        if job is None:
+            if not warmed:
+                metrics.increment("analysis_cache.misses")
+            job = _Job(cancel_if_abandoned=cancel_if_abandoned)
+            job.task = asyncio.ensure_future(self._compute(key, compute, warmed, job))
+            self._inflight[key] = job
+            job.task.add_done_callback(lambda _task, job=job: self._finished(key, job))
+        else:
+            metrics.increment("analysis_cache.shared")
+            # A real waiter joined; the work is no longer purely speculative
+            if not cancel_if_abandoned:
+                job.cancel_if_abandoned = False
+
+        job.waiters += 1
+        try:
+            # Shield so one caller going away doesn't cancel the shared work
+            return await asyncio.shield(job.task)
+        except asyncio.CancelledError:
+            if job.waiters == 1 and job.cancel_if_abandoned and not job.task.done():
+                job.task.cancel()
+                metrics.increment("analysis_cache.abandoned")
+            raise
+        finally:
+            job.waiters -= 1
+
+    async def _compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[PropertyAnalysis]],
+        warmed: bool,
+        job: _Job
+    ) -> PropertyAnalysis:
+        analysis = await compute()
+        if job.detached:
+            metrics.increment("analysis_cache.detached_not_cached")
+        elif analysis.degraded_stages:
+            # Shared with current waiters, but not kept for later requests
+            # that may have a more generous deadline
+            metrics.increment("analysis_cache.degraded_not_cached")
+        else:
+            self.put(key, analysis, warmed=warmed)
+        return analysis
+
+    def _finished(self, key: str, job: _Job) -> None:
+        # Runs even if the task was cancelled before it started
+        if self._inflight.get(key) is job:
+            del self._inflight[key]
+
+
+analysis_cache = AnalysisCache(
+    ttl_seconds=settings.analysis_cache_ttl_seconds,
+    max_entries=settings.analysis_cache_max_entries
+)
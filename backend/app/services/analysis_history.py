@@ -0,0 +1,529 @@
+"""
+Append-only history of property analyses
+
+Two files live in the history directory:
+
+    analyses.log    magic | record...
+    analyses.idx    magic | count (u64) | log end (u64) | entry...
+
+Each log record is a fixed header (body length, CRC-32, timestamp in
+microseconds, confidence, source fingerprint, property id length) followed
+by the property id and the zlib-compressed JSON of the analysis. The log is
+the source of truth and is only ever appended to.
+
+The index holds fixed-width entries (property key, timestamp, record offset
+and length, confidence, source fingerprint) sorted by (property key,
+timestamp), and is memory-mapped, so finding a property's history is a
+binary search and a time range is a contiguous slice. Records appended
+since the index was last written are kept in a small in-memory tail
+(rebuilt from the log on startup) and merged into a new index file once
+the tail grows past a threshold. Range queries are answered from the index
+alone; only fetching an analysis reads and decompresses its log record.
+
+Writers in different processes serialize on a lock file, and every reader
+catches up with records appended by other processes before answering.
+"""
+
+import hashlib
+import heapq
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from bisect import insort
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.config import settings
+from app.models.property import PropertyAnalysis
+from app.services.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LOG_MAGIC = b"PIHLOG1\n"
+INDEX_MAGIC = b"PIHIDX1\n"
+
+# body length, crc32, timestamp (us), confidence, source fingerprint, property id length
+RECORD_HEADER = struct.Struct("<IIqfQH")
+# property key, timestamp (us), record offset, record length, confidence, source fingerprint
+INDEX_ENTRY = struct.Struct("<QqQIfQ")
+# entry count, log bytes covered by the index
+INDEX_HEADER = struct.Struct("<QQ")
+INDEX_DATA_START = len(INDEX_MAGIC) + INDEX_HEADER.size
+
+# Lists of objects diffed element-wise by these identifying keys
+DIFF_LIST_KEYS = ("field_name", "source")
+
+
+def property_key(property_id: str) -> int:
+    """Fixed-width index key for a property id"""
+    return int.from_bytes(hashlib.blake2b(property_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def source_fingerprint(analysis: PropertyAnalysis) -> int:
+    """
+    Hash of the source data an analysis was computed from
+
+    Two analyses with the same fingerprint saw identical source records, so
+    any difference between them comes from the pipeline, not the listing.
+    """
+    sources = [source.model_dump(mode="json") for source in analysis.data_sources]
+    encoded = json.dumps(sources, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "little")
+
+
+@dataclass(frozen=True, order=True)
+class HistoryEntry:
+    """Index entry for one stored analysis (ordered by key, then time)"""
+
+    key: int
+    timestamp_us: int
+    offset: int
+    length: int
+    confidence: float
+    fingerprint: int
+
+    def pack(self) -> bytes:
+        return INDEX_ENTRY.pack(
+            self.key, self.timestamp_us, self.offset, self.length, self.confidence, self.fingerprint
+        )
+
+
+class AnalysisHistory:
+    """Append-only analysis log with a memory-mapped (property, time) index"""
+
+    def __init__(self, directory: str, compact_threshold: int, fsync: bool = False):
+        self.directory = directory
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self.log_path = os.path.join(directory, "analyses.log")
+        self.index_path = os.path.join(directory, "analyses.idx")
+        self.lock_path = os.path.join(directory, "analyses.lock")
+        self._lock = threading.RLock()
+        self._opened = False
+        self._index: Optional[mmap.mmap] = None
+        self._index_count = 0
+        self._index_stat: Optional[Tuple[int, int]] = None
+        # Log bytes covered by the index file plus the tail
+        self._log_end = len(LOG_MAGIC)
+        # Appended since the index was written: key -> entries in time order
+        self._tail: Dict[int, List[HistoryEntry]] = {}
+        self._tail_size = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._index_count + self._tail_size
+
+    # Files and locking
+
+    def _open(self) -> None:
+        if self._opened:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            # Exclusive create: exactly one process writes the magic
+            fd = os.open(self.log_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, "wb") as f:
+                f.write(LOG_MAGIC)
+        self._opened = True
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Exclusive lock shared by writers in all processes"""
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self) -> int:
+        """
+        Pick up index files and log records written by other processes
+
+        Returns:
+            Offset of the first byte after the last complete log record
+        """
+        self._open()
+        self._reload_index()
+        return self._scan_log()
+
+    def _reload_index(self) -> None:
+        try:
+            st = os.stat(self.index_path)
+        except FileNotFoundError:
+            return
+        stat_key = (st.st_ino, st.st_mtime_ns)
+        if stat_key == self._index_stat:
+            return
+        with open(self.index_path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapped[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            mapped.close()
+            raise ValueError(f"Not an analysis history index: {self.index_path}")
+        count, log_end = INDEX_HEADER.unpack_from(mapped, len(INDEX_MAGIC))
+        # The previous mapping is left to the garbage collector: a scan may still be reading it
+        self._index = mapped
+        self._index_count = count
+        self._index_stat = stat_key
+        # Entries now in the index file no longer belong in the tail
+        for key in list(self._tail):
+            kept = [entry for entry in self._tail[key] if entry.offset >= log_end]
+            if kept:
+                self._tail[key] = kept
+            else:
+                del self._tail[key]
+        self._tail_size = sum(len(entries) for entries in self._tail.values())
+        self._log_end = max(self._log_end, log_end)
+
+    def _scan_log(self) -> int:
+        """Index log records past the known end into the tail"""
+        size = os.path.getsize(self.log_path)
+        if size <= self._log_end:
+            return self._log_end
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_end)
+            data = f.read(size - self._log_end)
+        position = 0
+        while position + RECORD_HEADER.size <= len(data):
+            length, crc, timestamp_us, confidence, fingerprint, id_length = (
+                RECORD_HEADER.unpack_from(data, position)
+            )
+            start = position + RECORD_HEADER.size
+            end = start + id_length + length
+            # A partial record is still being written (or was torn by a crash)
+            if end > len(data) or zlib.crc32(data[start:end]) != crc:
+                break
+            property_id = data[start:start + id_length].decode("utf-8")
+            self._add_to_tail(HistoryEntry(
+                property_key(property_id), timestamp_us, self._log_end + position,
+                end - position, confidence, fingerprint
+            ))
+            position = end
+        self._log_end += position
+        return self._log_end
+
+    def _add_to_tail(self, entry: HistoryEntry) -> None:
+        insort(self._tail.setdefault(entry.key, []), entry)
+        self._tail_size += 1
+
+    # Index lookups
+
+    def _index_entry(self, position: int) -> HistoryEntry:
+        return HistoryEntry(*INDEX_ENTRY.unpack_from(self._index, INDEX_DATA_START + position * INDEX_ENTRY.size))
+
+    def _index_sort_key(self, position: int) -> Tuple[int, int]:
+        return struct.unpack_from("<Qq", self._index, INDEX_DATA_START + position * INDEX_ENTRY.size)
+
+    def _lower_bound(self, key: int, timestamp_us: int) -> int:
+        """First index position at or after (key, timestamp)"""
+        low, high = 0, self._index_count
+        target = (key, timestamp_us)
+        while low < high:
+            middle = (low + high) // 2
+            if self._index_sort_key(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _entries(self, key: int, since_us: int, until_us: int) -> List[HistoryEntry]:
+        """Entries for a key with since <= timestamp <= until, oldest first"""
+        entries = []
+        if self._index is not None:
+            position = self._lower_bound(key, since_us)
+            while position < self._index_count:
+                entry_key, timestamp_us = self._index_sort_key(position)
+                if entry_key != key or timestamp_us > until_us:
+                    break
+                entries.append(self._index_entry(position))
+                position += 1
+        tail = [e for e in self._tail.get(key, []) if since_us <= e.timestamp_us <= until_us]
+        if tail:
+            entries = sorted(entries + tail)
+        return entries
+
+    def _latest_entry(self, key: int) -> Optional[HistoryEntry]:
+        tail = self._tail.get(key)
+        if tail:
+            return tail[-1]
+        if self._index is None:
+            return None
+        position = self._lower_bound(key, 2 ** 63 - 1) - 1
+        if position >= 0 and self._index_sort_key(position)[0] == key:
+            return self._index_entry(position)
+        return None
+
+    def _read(self, entry: HistoryEntry, property_id: Optional[str] = None, fd: Optional[int] = None) -> PropertyAnalysis:
+        """Load the analysis stored in a log record"""
+        if fd is None:
+            with open(self.log_path, "rb") as f:
+                record = os.pread(f.fileno(), entry.length, entry.offset)
+        else:
+            record = os.pread(fd, entry.length, entry.offset)
+        _, crc, _, _, _, id_length = RECORD_HEADER.unpack_from(record)
+        payload = record[RECORD_HEADER.size:]
+        if zlib.crc32(payload) != crc or (
+            property_id is not None and payload[:id_length].decode("utf-8") != property_id
+        ):
+            raise ValueError(f"Corrupt history record at offset {entry.offset}")
+        return PropertyAnalysis.model_validate_json(zlib.decompress(payload[id_length:]))
+
+    # Public API
+
+    def append(self, analysis: PropertyAnalysis, timestamp: Optional[float] = None) -> HistoryEntry:
+        """
+        Append an analysis to the log
+
+        Args:
+            analysis: Completed analysis
+            timestamp: Unix time of the analysis (defaults to now); bumped by a
+                microsecond if needed so versions of a property are unique
+
+        Returns:
+            The new index entry
+        """
+        started = time.perf_counter()
+        property_id = analysis.property_id.encode("utf-8")
+        body = zlib.compress(analysis.model_dump_json().encode("utf-8"))
+        fingerprint = source_fingerprint(analysis)
+        key = property_key(analysis.property_id)
+        timestamp_us = int((timestamp if timestamp is not None else time.time()) * 1_000_000)
+
+        with self._lock:
+            self._open()
+        with self._lock, self._file_lock():
+            valid_end = self._refresh()
+            if valid_end < os.path.getsize(self.log_path):
+                # Drop a record torn by a crashed writer so the log stays scannable
+                logger.warning("Truncating torn analysis history record at offset %d", valid_end)
+                os.truncate(self.log_path, valid_end)
+            latest = self._latest_entry(key)
+            if latest is not None and timestamp_us <= latest.timestamp_us:
+                timestamp_us = latest.timestamp_us + 1
+            header = RECORD_HEADER.pack(
+                len(body), zlib.crc32(property_id + body), timestamp_us,
+                analysis.confidence_score, fingerprint, len(property_id)
+            )
+            record = header + property_id + body
+            with open(self.log_path, "ab") as f:
+                f.write(record)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            entry = HistoryEntry(
+                key, timestamp_us, self._log_end, len(record), analysis.confidence_score, fingerprint
+            )
+            self._add_to_tail(entry)
+            self._log_end += len(record)
+            if self._tail_size >= self.compact_threshold:
+                self._compact()
+
+        metrics.increment("history.appends")
+        metrics.increment("history.bytes_written", len(record))
+        metrics.observe("history.append.seconds", time.perf_counter() - started)
+        return entry
+
+    def _compact(self) -> None:
+        """Merge the tail into a new index file (caller holds both locks)"""
+        started = time.perf_counter()
+        tail = sorted(entry for entries in self._tail.values() for entry in entries)
+        count = self._index_count + len(tail)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "wb") as out:
+            out.write(INDEX_MAGIC)
+            out.write(INDEX_HEADER.pack(count, self._log_end))
+            # Copy runs of existing entries between the (few) tail insertion points
+            copied = 0
+            for entry in tail:
+                position = self._lower_bound(entry.key, entry.timestamp_us) if self._index is not None else 0
+                if position > copied:
+                    out.write(self._index[
+                        INDEX_DATA_START + copied * INDEX_ENTRY.size:INDEX_DATA_START + position * INDEX_ENTRY.size
+                    ])
+                    copied = position
+                out.write(entry.pack())
+            if self._index_count > copied:
+                out.write(self._index[
+                    INDEX_DATA_START + copied * INDEX_ENTRY.size:INDEX_DATA_START + self._index_count * INDEX_ENTRY.size
+                ])
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, self.index_path)
+        self._reload_index()
+        metrics.increment("history.compactions")
+        metrics.observe("history.compaction.seconds", time.perf_counter() - started)
+
+    def compact(self) -> None:
+        """Merge recent appends into the index file now"""
+        with self._lock:
+            self._open()
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self._tail_size:
+                self._compact()
+
+    def entries(
+        self,
+        property_id: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[HistoryEntry]:
+        """
+        Index entries for a property within a time range
+
+        Args:
+            property_id: Property ID
+            since: Earliest Unix time (inclusive)
+            until: Latest Unix time (inclusive)
+            limit: Keep only the most recent entries
+
+        Returns:
+            Entries oldest first
+        """
+        since_us = int(since * 1_000_000) if since is not None else -2 ** 63
+        until_us = int(until * 1_000_000) if until is not None else 2 ** 63 - 1
+        with self._lock:
+            self._refresh()
+            entries = self._entries(property_key(property_id), since_us, until_us)
+        return entries[-limit:] if limit else entries
+
+    def latest(self, property_id: str) -> Optional[Tuple[HistoryEntry, PropertyAnalysis]]:
+        """Most recent stored analysis of a property"""
+        with self._lock:
+            self._refresh()
+            entry = self._latest_entry(property_key(property_id))
+        if entry is None:
+            return None
+        return entry, self._read(entry, property_id)
+
+    def get(self, property_id: str, version: int) -> Optional[Tuple[HistoryEntry, PropertyAnalysis]]:
+        """Stored analysis of a property by version (timestamp in microseconds)"""
+        with self._lock:
+            self._refresh()
+            matches = self._entries(property_key(property_id), version, version)
+        if not matches:
+            return None
+        return matches[0], self._read(matches[0], property_id)
+
+    def previous(self, property_id: str, version: int) -> Optional[HistoryEntry]:
+        """Entry immediately before a version"""
+        with self._lock:
+            self._refresh()
+            earlier = self._entries(property_key(property_id), -2 ** 63, version - 1)
+        return earlier[-1] if earlier else None
+
+    def scan(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        latest_only: bool = False
+    ) -> Iterator[Tuple[HistoryEntry, PropertyAnalysis]]:
+        """
+        Stored analyses of every property, grouped by property, oldest first
+
+        Reads a snapshot taken when iteration starts; appends made while
+        iterating are not included.
+
+        Args:
+            since: Earliest Unix time (inclusive)
+            until: Latest Unix time (inclusive)
+            latest_only: Yield only the most recent analysis in the range per property
+        """
+        since_us = int(since * 1_000_000) if since is not None else -2 ** 63
+        until_us = int(until * 1_000_000) if until is not None else 2 ** 63 - 1
+        with self._lock:
+            self._refresh()
+            index, count = self._index, self._index_count
+            tail = sorted(entry for entries in self._tail.values() for entry in entries)
+
+        def index_entries() -> Iterator[HistoryEntry]:
+            if index is None:
+                return
+            view = memoryview(index)[INDEX_DATA_START:INDEX_DATA_START + count * INDEX_ENTRY.size]
+            for fields in INDEX_ENTRY.iter_unpack(view):
+                yield HistoryEntry(*fields)
+
+        def in_range() -> Iterator[HistoryEntry]:
+            for entry in heapq.merge(index_entries(), tail):
+                if since_us <= entry.timestamp_us <= until_us:
+                    yield entry
+
+        def latest_per_key(entries: Iterator[HistoryEntry]) -> Iterator[HistoryEntry]:
+            previous = None
+            for entry in entries:
+                if previous is not None and previous.key != entry.key:
+                    yield previous
+                previous = entry
+            if previous is not None:
+                yield previous
+
+        selected = latest_per_key(in_range()) if latest_only else in_range()
+        with open(self.log_path, "rb") as f:
+            for entry in selected:
+                yield entry, self._read(entry, fd=f.fileno())
+
+    def close(self) -> None:
+        """Drop the index mapping (reopened on next use)"""
+        with self._lock:
+            self._index = None
+            self._index_count = 0
+            self._index_stat = None
+
+
+def _flatten(value: Any, path: str, out: Dict[str, Any]) -> None:
+    """Flatten nested values into path -> leaf value"""
+    if isinstance(value, dict):
+        for name, item in value.items():
+            _flatten(item, f"{path}.{name}" if path else name, out)
+        return
+    if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+        for list_key in DIFF_LIST_KEYS:
+            if all(list_key in item for item in value):
+                # Match elements by identity (e.g. the Zillow source) rather than position
+                for item in value:
+                    _flatten(item, f"{path}[{item[list_key]}]", out)
+                return
+    out[path] = value
+
+
+def diff_analyses(before: PropertyAnalysis, after: PropertyAnalysis) -> List[Dict[str, Any]]:
+    """
+    Fields that differ between two analyses
+
+    Returns:
+        One {"path", "before", "after"} dict per changed leaf, sorted by path;
+        values missing on one side are None
+    """
+    old: Dict[str, Any] = {}
+    new: Dict[str, Any] = {}
+    _flatten(before.model_dump(mode="json"), "", old)
+    _flatten(after.model_dump(mode="json"), "", new)
+    return [
+        {"path": path, "before": old.get(path), "after": new.get(path)}
+        for path in sorted(old.keys() | new.keys())
+        if old.get(path) != new.get(path)
+    ]
+
+
+analysis_history = AnalysisHistory(
+    directory=settings.history_dir,
+    compact_threshold=settings.history_compact_threshold,
+    fsync=settings.history_fsync
+)
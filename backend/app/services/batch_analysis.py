@@ -0,0 +1,295 @@
+"""
+Offline bulk analysis of the catalog
+
+Runs `PropertyService` directly (no HTTP) over many properties. The
+deterministic part of each analysis - loading source records, basic
+conflict detection and comparables - is done in chunks on the heavy
+executor (a process pool by default), and the LLM stages run with bounded
+async concurrency. Prepared properties pass through a bounded queue, so
+preparation stays only a little ahead of the LLM stages.
+
+Results are appended to a JSONL file and/or the analysis history as they
+complete; degraded ones too, with their `degraded_stages`. A checkpoint
+lists every finished property with the output file size after its line
+was written; a resumed run skips finished properties and truncates the
+output to the last checkpointed size, dropping any line torn by the
+interruption.
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from app.config import settings
+from app.models.property import ComparablesResult, ConflictResolution
+from app.services.deadline import Deadline
+from app.services.executor import CpuExecutor
+from app.services.metrics import metrics
+from app.services.prefetch import PreparedProperty
+
+
+def prepare_properties(property_ids: List[str]) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    """
+    Deterministic stages for a chunk of properties (runs in a worker process)
+
+    Returns:
+        (property id, picklable prepared data or None if it has no sources)
+    """
+    from app.data import get_property_data_from_sources
+    from app.services.comparables_service import ComparablesService
+    from app.services.property_service import PropertyService
+
+    service = PropertyService()
+    comparables_service = ComparablesService()
+    prepared = []
+    for property_id in property_ids:
+        sources = [dict(record) for record in get_property_data_from_sources(property_id)]
+        if not sources:
+            prepared.append((property_id, None))
+            continue
+        try:
+            comparables = comparables_service.get_comparables(property_id)
+        except Exception:
+            comparables = None
+        conflict_resolution = service.prepare_property(sources).conflict_resolution
+        prepared.append((property_id, {
+            "sources": sources,
+            "conflict_resolution": conflict_resolution.model_dump(),
+            "comparables": comparables.model_dump() if comparables is not None else None,
+        }))
+    return prepared
+
+
+def _to_prepared(data: Dict[str, Any]) -> PreparedProperty:
+    comparables = data["comparables"]
+    return PreparedProperty(
+        sources=data["sources"],
+        conflict_resolution=ConflictResolution.model_validate(data["conflict_resolution"]),
+        prepared_at=time.monotonic(),
+        comparables=ComparablesResult.model_validate(comparables) if comparables is not None else None
+    )
+
+
+def _chunks(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    chunk: List[str] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+@dataclass
+class BatchStats:
+    """Counters for one bulk analysis run"""
+
+    total: int = 0
+    skipped: int = 0  # Finished in an earlier, interrupted run
+    completed: int = 0
+    degraded: int = 0
+    failed: int = 0
+    prepared: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+    errors: List[str] = field(default_factory=list)
+
+    # Keep only the first few failures; the count tells the rest
+    MAX_ERRORS = 20
+
+    def fail(self, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append(message)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def rate(self) -> float:
+        """Analyses completed per second in this run"""
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        remaining = self.total - self.skipped - self.completed - self.failed
+        return remaining / self.rate if self.rate else None
+
+
+class Checkpoint:
+    """
+    Append-only list of finished properties
+
+    Each line is "<property_id> <output size>"; the output size is the
+    JSONL file size once the property's line was flushed (0 without one).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def load(self) -> Tuple[Set[str], int]:
+        """Finished property ids and the output size to truncate to"""
+        done: Set[str] = set()
+        size = 0
+        if not os.path.exists(self.path):
+            return done, size
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 2 or not line.endswith("\n"):
+                    break  # Torn last line
+                done.add(parts[0])
+                size = max(size, int(parts[1]))
+        return done, size
+
+    def record(self, property_id: str, output_size: int) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(f"{property_id} {output_size}\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self) -> None:
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class BatchAnalyzer:
+    """
+    Analyzes many properties with process-parallel preparation and bounded LLM concurrency
+
+    Args:
+        output_path: JSONL file receiving one analysis per line; None to
+            only record analyses in the history
+        checkpoint_path: Checkpoint file; enables resume
+        profile: Pipeline profile
+        concurrency: Analyses with LLM stages in flight
+        workers: Processes preparing properties
+        chunk_size: Properties prepared per worker job
+        deadline_seconds: Time budget per analysis; stages that would
+            overrun it are degraded as in the API
+        progress: Callback receiving the stats about once a second
+    """
+
+    def __init__(
+        self,
+        output_path: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        profile: str = "full",
+        concurrency: int = 4,
+        workers: int = 2,
+        chunk_size: int = 64,
+        deadline_seconds: float = 300.0,
+        progress: Optional[Callable[[BatchStats], None]] = None
+    ):
+        self.output_path = output_path
+        self.checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+        self.profile = profile
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.deadline_seconds = deadline_seconds
+        self.progress = progress
+        self.executor = CpuExecutor(workers=0, heavy_kind=settings.heavy_executor, heavy_workers=workers)
+        self.stats = BatchStats()
+        self._output = None
+
+    def _open_output(self, resume_size: int) -> None:
+        if not self.output_path:
+            return
+        resuming = self.checkpoint is not None and os.path.exists(self.checkpoint.path)
+        self._output = open(self.output_path, "r+b" if resuming and os.path.exists(self.output_path) else "wb")
+        # Drop lines written after the last checkpoint entry
+        self._output.truncate(resume_size if resuming else 0)
+        self._output.seek(0, os.SEEK_END)
+
+    def _write(self, property_id: str, line: Optional[bytes]) -> None:
+        size = 0
+        if self._output is not None and line is not None:
+            self._output.write(line)
+            self._output.flush()
+            size = self._output.tell()
+        if self.checkpoint is not None:
+            self.checkpoint.record(property_id, size)
+
+    async def run(self, property_ids: List[str]) -> BatchStats:
+        """Analyze properties, skipping those finished by an interrupted run"""
+        from app.services.property_service import PropertyService
+
+        done, resume_size = self.checkpoint.load() if self.checkpoint else (set(), 0)
+        pending = [property_id for property_id in property_ids if property_id not in done]
+        self.stats = stats = BatchStats(total=len(property_ids), skipped=len(property_ids) - len(pending))
+        self._open_output(resume_size)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        chunks = _chunks(pending, self.chunk_size)
+
+        async def prepare() -> None:
+            for chunk in chunks:
+                for property_id, data in await self.executor.run_heavy(prepare_properties, chunk):
+                    stats.prepared += 1
+                    await queue.put((property_id, data))
+
+        async def analyze() -> None:
+            while True:
+                property_id, data = await queue.get()
+                try:
+                    if data is None:
+                        stats.fail(f"{property_id}: no data available")
+                        continue
+                    started = time.perf_counter()
+                    try:
+                        analysis = await PropertyService().analyze_property(
+                            property_id, self.profile, Deadline(self.deadline_seconds), prepared=_to_prepared(data)
+                        )
+                    except Exception as e:
+                        stats.fail(f"{property_id}: {e}")
+                        metrics.increment("batch.failed")
+                        continue
+                    metrics.observe("batch.analysis.seconds", time.perf_counter() - started)
+                    line = analysis.model_dump_json().encode("utf-8") + b"\n" if self._output else None
+                    self._write(property_id, line)
+                    stats.completed += 1
+                    stats.degraded += bool(analysis.degraded_stages)
+                    metrics.increment("batch.completed")
+                finally:
+                    queue.task_done()
+
+        async def report() -> None:
+            while True:
+                await asyncio.sleep(1.0)
+                self.progress(stats)
+
+        preparers = [asyncio.create_task(prepare()) for _ in range(max(1, self.executor.heavy_workers))]
+        analyzers = [asyncio.create_task(analyze()) for _ in range(self.concurrency)]
+        reporter = asyncio.create_task(report()) if self.progress else None
+        try:
+            await asyncio.gather(*preparers)
+            await queue.join()
+        finally:
+            for task in [*analyzers, reporter]:
+                if task is not None:
+                    task.cancel()
+            for task in preparers:
+                task.cancel()
+            await asyncio.gather(*analyzers, *preparers, *([reporter] if reporter else []), return_exceptions=True)
+            self.executor.shutdown()
+            if self._output is not None:
+                self._output.close()
+            if self.checkpoint is not None:
+                self.checkpoint.close()
+
+        if self.checkpoint is not None and not stats.failed:
+            # Finished cleanly: the next run starts over
+            self.checkpoint.remove()
+        if self.progress:
+            self.progress(stats)
+        return stats
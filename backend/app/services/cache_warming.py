@@ -0,0 +1,197 @@
+"""Access-frequency tracking and background pre-analysis of popular properties"""
+
+import asyncio
+import heapq
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.analysis_cache import AnalysisCache, analysis_cache
+from app.services.llm_service import LLMService
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AccessTracker:
+    """
+    Exponentially decayed access counts per property
+
+    A property's score halves every `half_life_seconds` without access, so
+    the hottest set follows current traffic rather than all-time totals.
+    """
+
+    def __init__(self, half_life_seconds: float, max_tracked: int = 100_000):
+        self.decay_rate = math.log(2) / half_life_seconds
+        self.max_tracked = max_tracked
+        self._scores: Dict[str, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _decayed(self, score: float, at: float, now: float) -> float:
+        return score * math.exp(-self.decay_rate * (now - at))
+
+    def record(self, property_id: str, weight: float = 1.0) -> None:
+        """Count one access"""
+        now = time.monotonic()
+        score, at = self._scores.get(property_id, (0.0, now))
+        self._scores[property_id] = (self._decayed(score, at, now) + weight, now)
+        if len(self._scores) > self.max_tracked:
+            self._prune(now)
+
+    def score(self, property_id: str) -> float:
+        """Current decayed score"""
+        entry = self._scores.get(property_id)
+        if entry is None:
+            return 0.0
+        return self._decayed(entry[0], entry[1], time.monotonic())
+
+    def hottest(self, n: int) -> List[Tuple[str, float]]:
+        """Top-n properties by current score"""
+        now = time.monotonic()
+        return heapq.nlargest(
+            n,
+            ((pid, self._decayed(score, at, now)) for pid, (score, at) in self._scores.items()),
+            key=lambda item: item[1]
+        )
+
+    def _prune(self, now: float) -> None:
+        """Keep only the better-scoring half of tracked properties"""
+        keep = heapq.nlargest(
+            self.max_tracked // 2,
+            self._scores.items(),
+            key=lambda item: self._decayed(item[1][0], item[1][1], now)
+        )
+        self._scores = dict(keep)
+
+
+class WarmingPreempted(Exception):
+    """Other LLM requests started while a warming analysis was between stages"""
+
+
+class WarmingScheduler:
+    """
+    Periodically pre-computes analyses for the hottest properties
+
+    Only runs while no other LLM request is in flight, so user traffic
+    always has priority over warming: the check is repeated before every
+    LLM stage, and a warming analysis that finds the model busy is dropped.
+    A refreshed entry stays cached and served until its replacement is
+    complete.
+    """
+
+    def __init__(
+        self,
+        tracker: AccessTracker,
+        cache: AnalysisCache,
+        budget: int,
+        interval_seconds: float,
+        refresh_after_seconds: float,
+        min_score: float
+    ):
+        self.tracker = tracker
+        self.cache = cache
+        self.budget = budget
+        self.interval_seconds = interval_seconds
+        self.refresh_after_seconds = refresh_after_seconds
+        self.min_score = min_score
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the background loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def candidates(self) -> List[str]:
+        """Hot properties whose cached analysis is missing or due for refresh"""
+        due = []
+        for property_id, score in self.tracker.hottest(self.budget):
+            if score < self.min_score:
+                break
+            entry = self.cache.get_entry(property_id)
+            if entry is not None and entry.age < self.refresh_after_seconds:
+                continue
+            if self.cache.is_inflight(property_id):
+                continue
+            due.append(property_id)
+        return due
+
+    async def warm_once(self) -> int:
+        """
+        Run one warming pass
+
+        Returns:
+            Number of analyses computed
+        """
+        from app.services.property_service import PropertyService
+
+        warmed = 0
+        for property_id in self.candidates():
+            if self._busy(property_id):
+                metrics.increment("warming.skipped_busy")
+                break
+            try:
+                await self.cache.get_or_compute(
+                    property_id,
+                    lambda pid=property_id: PropertyService().analyze_property(
+                        pid, before_stage=lambda _stage: self._yield_if_busy(pid)
+                    ),
+                    warmed=True,
+                    refresh=True
+                )
+                warmed += 1
+                metrics.increment("warming.computed")
+            except WarmingPreempted:
+                metrics.increment("warming.preempted")
+                break
+            except Exception as e:
+                metrics.increment("warming.failed")
+                logger.warning("Warming %s failed: %s", property_id, e)
+        return warmed
+
+    def _busy(self, property_id: str) -> bool:
+        """
+        Whether other LLM work is in flight
+
+        Stages of one analysis run one after another, so between stages every
+        active request belongs to someone else. Once a user request shares
+        the computation (besides the warmer itself), it is no longer only
+        warming and is finished regardless.
+        """
+        return LLMService.active_requests > 0 and self.cache.waiters(property_id) <= 1
+
+    def _yield_if_busy(self, property_id: str) -> None:
+        if self._busy(property_id):
+            raise WarmingPreempted(property_id)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.warm_once()
+            except Exception as e:
+                logger.warning("Warming pass failed: %s", e)
+
+
+access_tracker = AccessTracker(half_life_seconds=settings.access_half_life_seconds)
+
+warming_scheduler = WarmingScheduler(
+    tracker=access_tracker,
+    cache=analysis_cache,
+    budget=settings.warm_budget,
+    interval_seconds=settings.warm_interval_seconds,
+    refresh_after_seconds=settings.warm_refresh_after_seconds,
+    min_score=settings.warm_min_score
+)
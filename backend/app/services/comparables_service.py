@@ -0,0 +1,198 @@
+"""Nearby comparable properties and their market statistics"""
+
+import logging
+import statistics
+from datetime import date
+from typing import Dict, Any, List, Mapping, Optional
+from app.models.property import ComparableProperty, ComparableStats, ComparablesResult
+from app.data import get_property_by_id, get_property_data_from_sources, iter_properties
+from app.data.spatial_index import GridIndex, build_index
+from app.services.executor import cpu_executor
+
+logger = logging.getLogger(__name__)
+
+# Numeric fields resolved deterministically for comparables
+RESOLVED_FIELDS = ['price', 'bedrooms', 'bathrooms', 'square_feet', 'year_built', 'lot_size']
+
+# Shared across requests: the index and resolved values only change when
+# the catalog does, so rebuilding them per request would dominate latency
+_index: Optional[GridIndex] = None
+_resolved_cache: Dict[str, Dict[str, Optional[float]]] = {}
+
+
+def resolve_numeric_fields(sources: List[Mapping[str, Any]]) -> Dict[str, Optional[float]]:
+    """
+    Resolve numeric fields across sources without the LLM
+
+    Uses the median of the reported values, which is robust to a single
+    outlying source (e.g. a stale listing price).
+
+    Args:
+        sources: Raw source records for one property
+
+    Returns:
+        Mapping of field name to resolved value (None if no source reports it)
+    """
+    resolved = {}
+    for field in RESOLVED_FIELDS:
+        values = [
+            float(source[field]) for source in sources
+            if source.get(field) is not None
+        ]
+        resolved[field] = statistics.median(values) if values else None
+    return resolved
+
+
+def build_spatial_index() -> GridIndex:
+    """Build a spatial index over the whole catalog, with each property's address"""
+    return build_index(
+        (prop['id'], prop.get('latitude'), prop.get('longitude'), prop['address'])
+        for prop in iter_properties()
+    )
+
+
+def get_spatial_index() -> GridIndex:
+    """Lazily build the process-wide spatial index"""
+    global _index
+    if _index is None:
+        _index = build_spatial_index()
+    return _index
+
+
+async def prebuild_spatial_index() -> None:
+    """Build the index on the heavy executor so no request pays for it"""
+    global _index
+    try:
+        index = await cpu_executor.run_heavy(build_spatial_index)
+    except Exception as e:
+        # Requests will build it lazily instead
+        logger.warning("Prebuilding the spatial index failed: %s", e)
+        return
+    if _index is None:
+        _index = index
+
+
+def get_resolved_values(property_id: str) -> Dict[str, Optional[float]]:
+    """Resolved numeric values for a property, memoized"""
+    resolved = _resolved_cache.get(property_id)
+    if resolved is None:
+        resolved = resolve_numeric_fields(get_property_data_from_sources(property_id))
+        _resolved_cache[property_id] = resolved
+    return resolved
+
+
+def invalidate_comparables_cache(property_ids: Optional[List[str]] = None) -> None:
+    """
+    Drop cached index and resolved values after catalog changes
+
+    Args:
+        property_ids: Properties whose sources changed; None clears everything
+    """
+    global _index
+    if property_ids is None:
+        _index = None
+        _resolved_cache.clear()
+        return
+    for property_id in property_ids:
+        _resolved_cache.pop(property_id, None)
+    _index = None
+
+
+def _price_per_sqft(values: Dict[str, Optional[float]]) -> Optional[float]:
+    price = values.get('price')
+    square_feet = values.get('square_feet')
+    if price and square_feet:
+        return price / square_feet
+    return None
+
+
+def compute_comparable_stats(comparables: List[ComparableProperty]) -> ComparableStats:
+    """
+    Aggregate price-per-sqft, size and age statistics
+
+    Each statistic is computed over a single column gathered from the
+    comparables, skipping missing values.
+    """
+    current_year = date.today().year
+
+    prices = [c.price for c in comparables if c.price is not None]
+    ppsf = [c.price_per_sqft for c in comparables if c.price_per_sqft is not None]
+    sizes = [c.square_feet for c in comparables if c.square_feet is not None]
+    ages = [current_year - c.year_built for c in comparables if c.year_built is not None]
+
+    return ComparableStats(
+        count=len(comparables),
+        median_price=statistics.median(prices) if prices else None,
+        median_price_per_sqft=statistics.median(ppsf) if ppsf else None,
+        mean_price_per_sqft=statistics.fmean(ppsf) if ppsf else None,
+        min_price_per_sqft=min(ppsf) if ppsf else None,
+        max_price_per_sqft=max(ppsf) if ppsf else None,
+        median_square_feet=statistics.median(sizes) if sizes else None,
+        median_age_years=statistics.median(ages) if ages else None
+    )
+
+
+class ComparablesService:
+    """Service for finding comparable properties near a subject property"""
+
+    def get_comparables(
+        self,
+        property_id: str,
+        k: int = 5,
+        radius_km: Optional[float] = None
+    ) -> Optional[ComparablesResult]:
+        """
+        Find nearby comparables and summarize them
+
+        Args:
+            property_id: Subject property ID
+            k: Maximum number of comparables
+            radius_km: Optional search radius in kilometres
+
+        Returns:
+            Comparables with statistics, or None if the property is unknown
+        """
+        property_info = get_property_by_id(property_id)
+        if not property_info:
+            return None
+
+        result = ComparablesResult(
+            property_id=property_id,
+            address=property_info['address'],
+            radius_km=radius_km,
+            subject_price_per_sqft=_price_per_sqft(get_resolved_values(property_id))
+        )
+
+        lat = property_info.get('latitude')
+        lon = property_info.get('longitude')
+        if lat is None or lon is None:
+            return result
+
+        index = get_spatial_index()
+        neighbours = index.nearest(
+            lat, lon, k, radius_km=radius_km, exclude=property_id
+        )
+
+        comparables = []
+        for neighbour_id, distance in neighbours:
+            # Addresses come from the index: a catalog lookup per neighbour
+            # would make each request scale with the catalog size
+            address = index.payload(neighbour_id)
+            values = get_resolved_values(neighbour_id)
+            bedrooms = values.get('bedrooms')
+            year_built = values.get('year_built')
+            comparables.append(ComparableProperty(
+                id=neighbour_id,
+                address=address,
+                distance_km=round(distance, 3),
+                price=values.get('price'),
+                bedrooms=round(bedrooms) if bedrooms is not None else None,
+                bathrooms=values.get('bathrooms'),
+                square_feet=values.get('square_feet'),
+                year_built=round(year_built) if year_built is not None else None,
+                price_per_sqft=_price_per_sqft(values)
+            ))
+
+        result.comparables = comparables
+        result.stats = compute_comparable_stats(comparables)
+        return result
@@ -0,0 +1,44 @@
+"""Per-request deadlines split across pipeline stages"""
+
+import time
+from typing import Dict, List, Optional
+from app.config import settings
+
+
+class Deadline:
+    """
+    Wall-clock budget for one analysis
+
+    Each stage gets a share of the time still remaining, proportional to its
+    weight among the stages not yet run, so time saved by a fast stage rolls
+    forward to the later ones.
+    """
+
+    def __init__(self, seconds: float, weights: Optional[Dict[str, float]] = None):
+        self.seconds = seconds
+        self.weights = weights if weights is not None else settings.analysis_stage_weights
+        self.started_at = time.monotonic()
+
+    def remaining(self) -> float:
+        """Seconds left, never negative"""
+        return max(0.0, self.seconds - (time.monotonic() - self.started_at))
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allot(self, stage: str, pending_stages: List[str]) -> float:
+        """
+        Time budget for `stage`
+
+        Args:
+            stage: Stage about to run
+            pending_stages: That stage and every stage still to run after it
+
+        Returns:
+            Seconds the stage may take
+        """
+        total = sum(self.weights.get(s, 1.0) for s in pending_stages)
+        if total <= 0:
+            return self.remaining()
+        return self.remaining() * self.weights.get(stage, 1.0) / total
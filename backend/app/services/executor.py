@@ -0,0 +1,99 @@
+"""Worker pools for CPU-bound work called from async handlers"""
+
+import asyncio
+import functools
+import multiprocessing
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+from app.config import settings
+from app.services.metrics import metrics
+
+T = TypeVar("T")
+
+HEAVY_EXECUTORS = ("process", "thread")
+
+
+class CpuExecutor:
+    """
+    Runs synchronous CPU-bound steps without blocking the event loop
+
+    `run` uses a thread pool: it accepts any callable and arguments
+    (including memory-mapped source records), and while the GIL still
+    serializes Python code, the loop gets to run between switch intervals
+    instead of stalling for the whole step. `run_heavy` is for larger jobs
+    whose inputs and results pickle cheaply (index builds, bulk analytics);
+    with the process pool they run truly in parallel.
+    """
+
+    def __init__(self, workers: int, heavy_kind: str, heavy_workers: int):
+        if heavy_kind not in HEAVY_EXECUTORS:
+            raise ValueError(
+                f"Unknown heavy executor: {heavy_kind} (expected one of {', '.join(HEAVY_EXECUTORS)})"
+            )
+        self.workers = workers
+        self.heavy_kind = heavy_kind
+        self.heavy_workers = heavy_workers
+        # Created on first use so importing the app doesn't start threads or processes
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._heavy: Optional[Executor] = None
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cpu")
+        return self._threads
+
+    def _heavy_pool(self) -> Executor:
+        if self._heavy is None:
+            if self.heavy_kind == "process":
+                # spawn: forking a process with running threads is unsafe
+                self._heavy = ProcessPoolExecutor(
+                    max_workers=self.heavy_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._heavy = ThreadPoolExecutor(max_workers=self.heavy_workers, thread_name_prefix="heavy")
+        return self._heavy
+
+    async def _submit(self, pool: Executor, name: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+        finally:
+            metrics.observe(f"executor.{name}.seconds", time.perf_counter() - started)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `fn` on the thread pool, or inline when the pool is disabled"""
+        if self.workers <= 0:
+            return fn(*args, **kwargs)
+        return await self._submit(self._thread_pool(), "cpu", fn, *args, **kwargs)
+
+    async def run_heavy(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a large job on the heavy pool
+
+        With the process pool, `fn` must be a module-level function and its
+        arguments and result must be picklable.
+        """
+        return await self._submit(self._heavy_pool(), "heavy", fn, *args, **kwargs)
+
+    def shutdown(self) -> None:
+        """Stop the pools (waits for running jobs)"""
+        for pool in (self._threads, self._heavy):
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+        self._threads = None
+        self._heavy = None
+
+
+cpu_executor = CpuExecutor(
+    workers=settings.cpu_executor_workers,
+    heavy_kind=settings.heavy_executor,
+    heavy_workers=settings.heavy_executor_workers
+)
+
+
+async def offload(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a CPU-bound step off the event loop"""
+    return await cpu_executor.run(fn, *args, **kwargs)
@@ -0,0 +1,281 @@
+"""
+Columnar export of analyses to Arrow IPC streams and Parquet files
+
+Each analysis becomes one row. Resolved values, per-field confidence and
+conflict flags are flattened into typed columns (`resolved_price`,
+`price_confidence`, `price_conflicts`, ...), so datasets can be filtered
+and aggregated without parsing JSON. Rows are buffered into record batches
+of `batch_size` and written as soon as a batch is full, so memory stays
+bounded however many analyses are exported.
+
+pyarrow is an optional dependency, imported on first use.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from app.models.property import PropertyAnalysis
+from app.services.analysis_history import HistoryEntry
+from app.services.metrics import metrics
+
+EXPORT_FORMATS = ("arrow", "parquet")
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Resolved fields and their column types
+RESOLVED_FIELDS = {
+    "price": "float64",
+    "bedrooms": "int64",
+    "bathrooms": "float64",
+    "square_feet": "float64",
+    "year_built": "int64",
+    "lot_size": "float64",
+    "property_type": "string",
+}
+
+
+class ExportUnavailable(RuntimeError):
+    """pyarrow is not installed"""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401  (registers pyarrow.parquet)
+    except ImportError as e:
+        raise ExportUnavailable("Exports require pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def build_schema(include_text: bool = False):
+    """Arrow schema of exported rows"""
+    pa = _pyarrow()
+    types = {"float64": pa.float64(), "int64": pa.int64(), "string": pa.string()}
+    strings = pa.list_(pa.string())
+    fields = [
+        pa.field("property_id", pa.string(), nullable=False),
+        pa.field("address", pa.string()),
+        pa.field("version", pa.int64()),
+        pa.field("recorded_at", pa.timestamp("us", tz="UTC")),
+        pa.field("profile", pa.string()),
+        pa.field("confidence_score", pa.float64()),
+        pa.field("overall_confidence", pa.float64()),
+        pa.field("source_count", pa.int32()),
+        pa.field("sources", strings),
+        pa.field("conflict_count", pa.int32()),
+        pa.field("missing_fields", strings),
+        pa.field("degraded_stages", strings),
+        pa.field("source_fingerprint", pa.string()),
+        pa.field("difficulty", pa.float64()),
+        pa.field("stage_models", strings),
+    ]
+    for name, kind in RESOLVED_FIELDS.items():
+        fields += [
+            pa.field(f"resolved_{name}", types[kind]),
+            pa.field(f"{name}_recommended", types[kind]),
+            pa.field(f"{name}_confidence", pa.float64()),
+            pa.field(f"{name}_conflicts", pa.bool_()),
+        ]
+    fields += [
+        pa.field("condition", pa.string()),
+        pa.field("key_features", strings),
+        pa.field("highlights", strings),
+        pa.field("concerns", strings),
+    ]
+    if include_text:
+        fields += [pa.field("analysis", pa.string()), pa.field("insights", strings)]
+    return pa.schema(fields)
+
+
+def _coerce(value: Any, kind: str) -> Any:
+    """
+    Convert an LLM-recommended value to the column type, or None
+
+    Non-integral values for integer columns (2.5 bedrooms) are dropped
+    rather than truncated, so an exported value is always one that was
+    actually recommended.
+    """
+    if value is None:
+        return None
+    if kind == "string":
+        return str(value)
+    try:
+        if isinstance(value, str):
+            value = float(value.replace(",", "").replace("$", "").strip())
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if number != number:  # NaN
+        return None
+    if kind == "int64":
+        return int(number) if number.is_integer() else None
+    return number
+
+
+def flatten_analysis(
+    analysis: PropertyAnalysis,
+    entry: Optional[HistoryEntry] = None,
+    include_text: bool = False
+) -> Dict[str, Any]:
+    """
+    One export row for an analysis
+
+    Args:
+        analysis: The analysis
+        entry: Its history entry when exported from stored history (gives
+            version, timestamp and source fingerprint); None for fresh results
+        include_text: Also export the analysis text and insights
+    """
+    resolution = analysis.conflict_resolution
+    summary = analysis.property_summary
+    by_field = {fa.field_name: fa for fa in resolution.field_analyses}
+    if entry is not None:
+        recorded_at = datetime.fromtimestamp(entry.timestamp_us / 1_000_000, tz=timezone.utc)
+    else:
+        recorded_at = datetime.now(timezone.utc)
+    row: Dict[str, Any] = {
+        "property_id": analysis.property_id,
+        "address": analysis.address,
+        "version": entry.timestamp_us if entry is not None else None,
+        "recorded_at": recorded_at,
+        "profile": analysis.profile,
+        "confidence_score": analysis.confidence_score,
+        "overall_confidence": resolution.overall_confidence,
+        "source_count": len(analysis.data_sources),
+        "sources": [source.source for source in analysis.data_sources],
+        "conflict_count": sum(1 for fa in resolution.field_analyses if fa.conflicts),
+        "missing_fields": list(resolution.missing_fields),
+        "degraded_stages": sorted(analysis.degraded_stages),
+        "source_fingerprint": f"{entry.fingerprint:016x}" if entry is not None else None,
+        "difficulty": analysis.difficulty,
+        "stage_models": [f"{stage}={model}" for stage, model in sorted(analysis.stage_models.items())],
+        "condition": summary.condition,
+        "key_features": list(summary.key_features),
+        "highlights": list(summary.highlights),
+        "concerns": list(summary.concerns),
+    }
+    for name, kind in RESOLVED_FIELDS.items():
+        fa = by_field.get(name)
+        row[f"resolved_{name}"] = _coerce(getattr(summary, name), kind)
+        row[f"{name}_recommended"] = _coerce(fa.recommended_value, kind) if fa else None
+        row[f"{name}_confidence"] = fa.confidence if fa else None
+        row[f"{name}_conflicts"] = fa.conflicts if fa else None
+    if include_text:
+        row["analysis"] = analysis.analysis
+        row["insights"] = list(analysis.insights)
+    return row
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the caller"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ExportWriter:
+    """
+    Buffers rows into record batches and writes them to a sink
+
+    Args:
+        fmt: "arrow" (IPC stream) or "parquet" (one row group per batch)
+        sink: File path or writable file object; None to collect output
+            for streaming, retrieved with `drain`
+        batch_size: Rows per record batch
+        include_text: Also export the analysis text and insights
+    """
+
+    def __init__(self, fmt: str, sink: Any = None, batch_size: int = 10_000, include_text: bool = False):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})")
+        pa = _pyarrow()
+        self._pa = pa
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.include_text = include_text
+        self.schema = build_schema(include_text)
+        self.rows = 0
+        self._columns: Dict[str, List[Any]] = {name: [] for name in self.schema.names}
+        self._buffered = 0
+        self._chunks = _ChunkSink() if sink is None else None
+        target = self._chunks if sink is None else sink
+        if fmt == "arrow":
+            self._writer = pa.ipc.new_stream(target, self.schema)
+        else:
+            self._writer = pa.parquet.ParquetWriter(target, self.schema, compression="zstd")
+
+    def add(self, analysis: PropertyAnalysis, entry: Optional[HistoryEntry] = None) -> None:
+        """Append one analysis, writing a batch once enough rows are buffered"""
+        row = flatten_analysis(analysis, entry, self.include_text)
+        for name, column in self._columns.items():
+            column.append(row[name])
+        self._buffered += 1
+        if self._buffered >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered rows as a record batch"""
+        if not self._buffered:
+            return
+        started = time.perf_counter()
+        batch = self._pa.RecordBatch.from_pydict(self._columns, schema=self.schema)
+        if self.fmt == "arrow":
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write_batch(batch, row_group_size=self.batch_size)
+        self.rows += self._buffered
+        metrics.increment("export.rows", self._buffered)
+        metrics.observe("export.batch.seconds", time.perf_counter() - started)
+        self._columns = {name: [] for name in self.schema.names}
+        self._buffered = 0
+
+    def close(self) -> None:
+        """Write remaining rows and the stream end or Parquet footer"""
+        self.flush()
+        self._writer.close()
+
+    def drain(self) -> bytes:
+        """Bytes written since the last drain (streaming mode only)"""
+        return self._chunks.drain() if self._chunks is not None else b""
+
+
+def stream_export(
+    analyses: Iterable[Tuple[PropertyAnalysis, Optional[HistoryEntry]]],
+    fmt: str,
+    batch_size: int,
+    include_text: bool = False
+) -> Iterator[bytes]:
+    """Encode analyses and yield the output one batch at a time"""
+    writer = ExportWriter(fmt, batch_size=batch_size, include_text=include_text)
+    for analysis, entry in analyses:
+        writer.add(analysis, entry)
+        chunk = writer.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    yield writer.drain()
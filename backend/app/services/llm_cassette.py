@@ -0,0 +1,122 @@
+"""Record/replay of Ollama generations for offline profiling and regression runs"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+from app.services.executor import offload
+
+# Timing fields returned by Ollama's /api/generate (nanoseconds / token counts)
+TIMING_FIELDS = [
+    "total_duration",
+    "load_duration",
+    "prompt_eval_count",
+    "prompt_eval_duration",
+    "eval_count",
+    "eval_duration",
+]
+
+MODES = ("off", "record", "replay")
+
+# Prompt text derived from today's date (comparables' ages grow every
+# January); masked in cassette keys so recordings keep matching
+DATE_DERIVED_PATTERNS = [
+    re.compile(r"(Median Age: )\d+( years)"),
+]
+
+
+def _mask_date_derived(value: Any) -> Any:
+    if isinstance(value, str):
+        for pattern in DATE_DERIVED_PATTERNS:
+            value = pattern.sub(r"\1<n>\2", value)
+    return value
+
+
+class CassetteStore:
+    """
+    Stores one JSON cassette per distinct generation request
+
+    Cassettes are keyed by a hash of the full request payload (model,
+    prompt, system prompt and options), so replay is deterministic as long
+    as the pipeline builds the same prompts. Values derived from the
+    current date are masked in the key, so recordings survive a new year.
+    """
+
+    def __init__(self, mode: str, directory: str, replay_timing: str = "original"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode} (expected one of {', '.join(MODES)})")
+        self.mode = mode
+        self.directory = directory
+        # 'original' sleeps for the recorded duration, 'none' replays instantly
+        self.replay_timing = replay_timing
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def key(payload: Dict[str, Any]) -> str:
+        """Stable hash of a generation request"""
+        relevant = {k: _mask_date_derived(v) for k, v in payload.items() if k != "stream"}
+        encoded = json.dumps(relevant, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def record(self, payload: Dict[str, Any], result: Dict[str, Any], wall_seconds: float) -> None:
+        """Write a cassette for a completed generation (blocking; see `save`)"""
+        os.makedirs(self.directory, exist_ok=True)
+        key = self.key(payload)
+        cassette = {
+            "request": {k: v for k, v in payload.items() if k != "stream"},
+            "response": result.get("response", ""),
+            "timing": {name: result[name] for name in TIMING_FIELDS if name in result},
+            "wall_seconds": wall_seconds,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        tmp_path = f"{self._path(key)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cassette, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self._path(key))
+
+    async def save(self, payload: Dict[str, Any], result: Dict[str, Any], wall_seconds: float) -> None:
+        """Write a cassette without blocking the event loop"""
+        await offload(self.record, payload, result, wall_seconds)
+
+    def load(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Cassette for a request, or None if it was never recorded"""
+        path = self._path(self.key(payload))
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    async def replay(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Serve a recorded generation
+
+        Returns:
+            Response dict shaped like Ollama's, including timing fields
+
+        Raises:
+            LookupError: If no cassette matches the request
+        """
+        cassette = await offload(self.load, payload)
+        if cassette is None:
+            raise LookupError(
+                f"No cassette recorded for this request in {self.directory} "
+                f"(key {self.key(payload)[:12]})"
+            )
+        if self.replay_timing == "original":
+            total_ns = cassette["timing"].get("total_duration")
+            delay = total_ns / 1e9 if total_ns else cassette.get("wall_seconds", 0.0)
+            await asyncio.sleep(delay)
+        return {"response": cassette["response"], **cassette["timing"]}
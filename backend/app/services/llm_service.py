@@ -1,25 +1,64 @@
 """Ollama LLM integration service"""
 
+import asyncio
 import httpx
 import json
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, List
 from app.config import settings
+from app.services.llm_cassette import CassetteStore
+from app.services.executor import offload
+from app.services.metrics import metrics
+from app.services.ollama_pool import NoHealthyHost, OllamaPool, ollama_pool
+
+# Structured responses at least this long are parsed off the event loop
+OFFLOAD_PARSE_CHARS = 32_768
+
+
+def parse_structured_response(response: str) -> Dict[str, Any]:
+    """Extract the JSON object from a model response"""
+    try:
+        # Try to extract JSON from response
+        # Sometimes LLM adds extra text before/after JSON
+        start = response.find('{')
+        end = response.rfind('}') + 1
+        if start != -1 and end > start:
+            json_str = response[start:end]
+            return json.loads(json_str)
+        else:
+            return json.loads(response)
+    except json.JSONDecodeError:
+        # If parsing fails, return raw response in a dict
+        return {"raw_response": response}
 
 
 class LLMService:
     """Service for interacting with Ollama LLM"""
     
-    def __init__(self):
-        self.base_url = settings.ollama_host
+    # Generations in flight across all instances in this process; background
+    # work uses it to only run when the model is otherwise idle
+    active_requests = 0
+    
+    def __init__(self, affinity_key: Optional[str] = None, pool: Optional[OllamaPool] = None):
+        self.pool = pool or ollama_pool
+        # Generations sharing a key prefer the same host (e.g. one analysis)
+        self.affinity_key = affinity_key
         self.model = settings.ollama_model
         self.timeout = 120.0  # 2 minutes timeout for generation
+        self.cassettes = CassetteStore(
+            settings.llm_cassette_mode,
+            settings.llm_cassette_dir,
+            settings.llm_replay_timing
+        )
     
     async def generate(
         self, 
         prompt: str, 
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        num_ctx: Optional[int] = None,
+        model: Optional[str] = None
     ) -> str:
         """
         Generate text using Ollama
@@ -29,36 +68,51 @@ class LLMService:
             system_prompt: Optional system prompt
             temperature: Sampling temperature (0.0 to 1.0)
             max_tokens: Maximum tokens to generate
+            num_ctx: Context window to allocate (model default if omitted)
+            model: Model to use instead of the configured one
             
         Returns:
             Generated text response
         """
+        payload = {
+            "model": model or self.model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {
+                "temperature": temperature,
+            }
+        }
+        
+        if system_prompt:
+            payload["system"] = system_prompt
+        
+        if max_tokens:
+            payload["options"]["num_predict"] = max_tokens
+        
+        if num_ctx:
+            payload["options"]["num_ctx"] = num_ctx
+        
+        metrics.increment("llm.generations")
+        
+        if self.cassettes.replaying:
+            LLMService.active_requests += 1
+            try:
+                result = await self.cassettes.replay(payload)
+            except asyncio.CancelledError:
+                metrics.increment("llm.cancelled")
+                raise
+            except LookupError as e:
+                raise Exception(f"LLM replay failed: {str(e)}")
+            finally:
+                LLMService.active_requests -= 1
+            return result.get("response", "")
+        
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                payload = {
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature,
-                    }
-                }
-                
-                if system_prompt:
-                    payload["system"] = system_prompt
-                
-                if max_tokens:
-                    payload["options"]["num_predict"] = max_tokens
-                
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json=payload
-                )
-                response.raise_for_status()
-                
-                result = response.json()
-                return result.get("response", "")
+            result = await self._post_generate(payload)
+            return result.get("response", "")
                 
+        except NoHealthyHost as e:
+            raise Exception(f"LLM request failed: {str(e)}")
         except httpx.TimeoutException:
             raise Exception(f"LLM request timed out after {self.timeout} seconds")
         except httpx.HTTPError as e:
@@ -66,11 +120,80 @@ class LLMService:
         except Exception as e:
             raise Exception(f"Unexpected error in LLM service: {str(e)}")
     
+    async def _post_generate(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send one generation to a pool host
+        
+        Connection failures are retried once per remaining host, since
+        nothing was generated yet; other errors are raised as-is.
+        """
+        tried: List[Any] = []
+        while True:
+            try:
+                async with self.pool.lease(self.affinity_key, exclude=tried) as host:
+                    tried.append(host)
+                    async with httpx.AsyncClient(timeout=self.timeout) as client:
+                        started = time.perf_counter()
+                        LLMService.active_requests += 1
+                        try:
+                            response = await client.post(
+                                f"{host.url}/api/generate",
+                                json=payload
+                            )
+                        except asyncio.CancelledError:
+                            # Leaving the client context closes the connection,
+                            # which makes Ollama stop generating
+                            metrics.increment("llm.cancelled")
+                            raise
+                        finally:
+                            LLMService.active_requests -= 1
+                        response.raise_for_status()
+                        
+                        result = response.json()
+                        if self.cassettes.recording:
+                            await self.cassettes.save(payload, result, time.perf_counter() - started)
+                        return result
+            except httpx.ConnectError:
+                if not any(host not in tried for host in self.pool.healthy_hosts()):
+                    raise
+                metrics.increment("llm.retried_on_other_host")
+    
+    async def embed(self, text: str) -> List[float]:
+        """
+        Embed text with Ollama's embeddings endpoint
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector
+        """
+        if self.cassettes.replaying:
+            raise Exception("Embeddings are not available when replaying cassettes")
+        
+        payload = {"model": settings.ollama_embedding_model, "prompt": text}
+        metrics.increment("llm.embeddings")
+        try:
+            async with self.pool.lease(self.affinity_key) as host:
+                async with httpx.AsyncClient(timeout=30.0) as client:
+                    response = await client.post(f"{host.url}/api/embeddings", json=payload)
+                    response.raise_for_status()
+                    embedding = response.json().get("embedding")
+        except NoHealthyHost as e:
+            raise Exception(f"Embedding request failed: {str(e)}")
+        except httpx.HTTPError as e:
+            raise Exception(f"Embedding request failed: {str(e)}")
+        if not embedding:
+            raise Exception("Embedding request returned no vector")
+        return embedding
+    
     async def generate_structured(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
-        temperature: float = 0.3
+        temperature: float = 0.3,
+        num_ctx: Optional[int] = None,
+        model: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate structured JSON response
@@ -79,6 +202,8 @@ class LLMService:
             prompt: The user prompt
             system_prompt: Optional system prompt
             temperature: Lower temperature for more consistent structured output
+            num_ctx: Context window to allocate (model default if omitted)
+            model: Model to use instead of the configured one
             
         Returns:
             Parsed JSON response
@@ -86,22 +211,15 @@ class LLMService:
         response = await self.generate(
             prompt=prompt,
             system_prompt=system_prompt,
-            temperature=temperature
+            temperature=temperature,
+            num_ctx=num_ctx,
+            model=model
         )
         
-        try:
-            # Try to extract JSON from response
-            # Sometimes LLM adds extra text before/after JSON
-            start = response.find('{')
-            end = response.rfind('}') + 1
-            if start != -1 and end > start:
-                json_str = response[start:end]
-                return json.loads(json_str)
-            else:
-                return json.loads(response)
-        except json.JSONDecodeError:
-            # If parsing fails, return raw response in a dict
-            return {"raw_response": response}
+        # Small responses parse faster than a thread hop
+        if len(response) >= OFFLOAD_PARSE_CHARS:
+            return await offload(parse_structured_response, response)
+        return parse_structured_response(response)
     
     async def check_connection(self) -> bool:
         """
@@ -110,9 +228,7 @@ class LLMService:
         Returns:
             True if connection is successful
         """
-        try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{self.base_url}/api/tags")
-                return response.status_code == 200
-        except Exception:
-            return False
+        if self.cassettes.replaying:
+            return True
+        
+        return await self.pool.check_connection()
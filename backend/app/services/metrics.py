@@ -0,0 +1,70 @@
+"""In-process metrics registry"""
+
+import threading
+from typing import Dict, Any
+
+
+class Metrics:
+    """
+    Counters and simple distributions for one worker process
+
+    Everything is kept in memory and exposed via the /metrics endpoint;
+    values reset when the worker restarts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._observations: Dict[str, Dict[str, float]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add to a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a point-in-time value"""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record one observation (e.g. a duration) into count/sum/min/max"""
+        with self._lock:
+            stats = self._observations.get(name)
+            if stats is None:
+                self._observations[name] = {
+                    "count": 1, "sum": value, "min": value, "max": value
+                }
+                return
+            stats["count"] += 1
+            stats["sum"] += value
+            stats["min"] = min(stats["min"], value)
+            stats["max"] = max(stats["max"], value)
+
+    def counter(self, name: str) -> float:
+        """Current value of a counter"""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of all metrics, with averages for observations"""
+        with self._lock:
+            observations = {}
+            for name, stats in self._observations.items():
+                observations[name] = dict(stats, avg=stats["sum"] / stats["count"])
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "observations": observations
+            }
+
+    def reset(self) -> None:
+        """Clear everything"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._observations.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,142 @@
+"""
+Difficulty-based model tiering for the LLM stages
+
+Most listings have sources that agree, or disagree on one field by a few
+percent; those go to a smaller, faster model. A property's difficulty is
+scored from its source records before any LLM call - how many key fields
+conflict, how far apart the conflicting values are, and how many are
+missing - and each stage picks the small or the large model by comparing
+the score with its threshold.
+"""
+
+import statistics
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+from app.config import settings
+
+# Fields whose agreement decides how hard a property is
+DIFFICULTY_FIELDS = ["price", "bedrooms", "bathrooms", "square_feet", "year_built", "property_type"]
+
+# Spreads measured in absolute units rather than relative to the value
+# (a 20-year disagreement on year_built is large, 1% of 2000 is not)
+ABSOLUTE_SPREAD_SCALES = {"year_built": 20.0, "bedrooms": 2.0, "bathrooms": 2.0}
+
+# Relative spread at which a conflict counts as maximally severe
+SPREAD_SATURATION = 0.25
+
+# Score weights (sum to 1)
+DIFFICULTY_WEIGHTS = {"conflicts": 0.4, "spread": 0.4, "missing": 0.2}
+
+
+@dataclass(frozen=True)
+class Difficulty:
+    """How hard a property's sources are to reconcile"""
+
+    score: float  # 0 (sources agree) to 1
+    conflicting_fields: List[str]
+    missing_fields: List[str]
+    max_spread: float  # Largest normalized spread of a conflicting numeric field (0-1)
+
+
+def _spread(field: str, values: List[Any]) -> Optional[float]:
+    """Normalized disagreement between a field's numeric values (0-1), None if not numeric"""
+    numbers = []
+    for value in values:
+        try:
+            numbers.append(float(value))
+        except (TypeError, ValueError):
+            # Categorical (e.g. "Condo" vs "Condominium"): counted as a conflict only
+            return None
+    low, high = min(numbers), max(numbers)
+    if field in ABSOLUTE_SPREAD_SCALES:
+        return min(1.0, (high - low) / ABSOLUTE_SPREAD_SCALES[field])
+    center = abs(statistics.median(numbers))
+    if not center:
+        return 1.0
+    return min(1.0, (high - low) / center / SPREAD_SATURATION)
+
+
+def score_difficulty(sources: List[Mapping[str, Any]]) -> Difficulty:
+    """
+    Score how hard a property's sources are to reconcile
+
+    Args:
+        sources: Source records for one property
+
+    Returns:
+        The difficulty and the fields it was derived from
+    """
+    conflicting, missing = [], []
+    max_spread = 0.0
+    for field in DIFFICULTY_FIELDS:
+        values = [source.get(field) for source in sources if source.get(field) not in (None, "")]
+        if not values:
+            missing.append(field)
+            continue
+        distinct = set(str(value).strip().lower() for value in values)
+        if len(distinct) > 1:
+            conflicting.append(field)
+            spread = _spread(field, values)
+            if spread is not None:
+                max_spread = max(max_spread, spread)
+
+    score = (
+        DIFFICULTY_WEIGHTS["conflicts"] * len(conflicting) / len(DIFFICULTY_FIELDS)
+        + DIFFICULTY_WEIGHTS["spread"] * max_spread
+        + DIFFICULTY_WEIGHTS["missing"] * len(missing) / len(DIFFICULTY_FIELDS)
+    )
+    return Difficulty(round(score, 4), conflicting, missing, round(max_spread, 4))
+
+
+class ModelRouter:
+    """
+    Picks the model for each LLM stage from a property's difficulty
+
+    Args:
+        enabled: When False every stage uses the large model
+        large_model: Model for hard properties (the default model)
+        small_model: Model for easy properties
+        threshold: Properties scoring below this use the small model
+        stage_thresholds: Per-stage threshold overrides, e.g. {"insights": 0.6};
+            0 sends a stage to the large model always
+        stage_small_models: Per-stage small model overrides
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        large_model: str,
+        small_model: str,
+        threshold: float,
+        stage_thresholds: Optional[Dict[str, float]] = None,
+        stage_small_models: Optional[Dict[str, str]] = None
+    ):
+        self.enabled = enabled
+        self.large_model = large_model
+        self.small_model = small_model
+        self.threshold = threshold
+        self.stage_thresholds = stage_thresholds or {}
+        self.stage_small_models = stage_small_models or {}
+
+    def tier(self, stage: str, difficulty: Difficulty) -> str:
+        """'small' or 'large' for a stage"""
+        if not self.enabled:
+            return "large"
+        threshold = self.stage_thresholds.get(stage, self.threshold)
+        return "small" if difficulty.score < threshold else "large"
+
+    def model(self, stage: str, tier: str) -> str:
+        """Model name of a stage's tier"""
+        if tier == "small":
+            return self.stage_small_models.get(stage, self.small_model)
+        return self.large_model
+
+
+model_router = ModelRouter(
+    enabled=settings.llm_tiering_enabled,
+    large_model=settings.ollama_model,
+    small_model=settings.ollama_small_model,
+    threshold=settings.llm_tier_threshold,
+    stage_thresholds=settings.llm_tier_stage_thresholds,
+    stage_small_models=settings.llm_tier_stage_small_models
+)
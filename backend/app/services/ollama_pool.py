@@ -0,0 +1,227 @@
+"""Pool of Ollama hosts with least-outstanding routing and health tracking"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+import httpx
+from app.config import settings
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on remembered analysis -> host assignments
+MAX_AFFINITY_KEYS = 10_000
+
+
+class OllamaHost:
+    """One Ollama backend and its routing state"""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.reprobe_at = 0.0
+        self.probing = False
+
+    def __repr__(self) -> str:
+        state = "up" if self.healthy else "ejected"
+        return f"OllamaHost({self.url!r}, {state}, outstanding={self.outstanding})"
+
+
+class NoHealthyHost(Exception):
+    """Every host in the pool is ejected"""
+
+
+class OllamaPool:
+    """
+    Routes generations to the healthy host with the fewest requests in flight
+
+    A host that fails `eject_after_failures` times in a row is taken out of
+    rotation and probed again after `reprobe_seconds` (doubling on each
+    consecutive ejection, up to `max_reprobe_seconds`). With affinity, all
+    requests sharing a key go to the same host while it is healthy and not
+    much busier than the least-loaded one, so Ollama can reuse its context.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        eject_after_failures: int = 2,
+        reprobe_seconds: float = 10.0,
+        max_reprobe_seconds: float = 300.0,
+        affinity: bool = True,
+        affinity_max_imbalance: int = 2
+    ):
+        if not urls:
+            raise ValueError("OllamaPool needs at least one host")
+        self.hosts = [OllamaHost(url) for url in urls]
+        self.eject_after_failures = eject_after_failures
+        self.reprobe_seconds = reprobe_seconds
+        self.max_reprobe_seconds = max_reprobe_seconds
+        self.affinity = affinity
+        self.affinity_max_imbalance = affinity_max_imbalance
+        self._affinity: "OrderedDict[str, OllamaHost]" = OrderedDict()
+
+    def healthy_hosts(self) -> List[OllamaHost]:
+        return [host for host in self.hosts if host.healthy]
+
+    def choose(self, affinity_key: Optional[str] = None, exclude: Optional[List[OllamaHost]] = None) -> OllamaHost:
+        """
+        Pick a host for one request
+
+        Args:
+            affinity_key: Requests with the same key prefer the same host
+            exclude: Hosts already tried for this request
+
+        Raises:
+            NoHealthyHost: If no healthy host is left to try
+        """
+        self._schedule_reprobes()
+        candidates = [host for host in self.healthy_hosts() if not exclude or host not in exclude]
+        if not candidates:
+            raise NoHealthyHost(
+                f"No healthy Ollama host available ({', '.join(host.url for host in self.hosts)})"
+            )
+        least = min(candidates, key=lambda host: host.outstanding)
+
+        if not (self.affinity and affinity_key):
+            return least
+
+        pinned = self._affinity.get(affinity_key)
+        if (
+            pinned is not None
+            and pinned in candidates
+            and pinned.outstanding <= least.outstanding + self.affinity_max_imbalance
+        ):
+            self._affinity.move_to_end(affinity_key)
+            metrics.increment("ollama_pool.affinity_hits")
+            return pinned
+
+        self._affinity[affinity_key] = least
+        self._affinity.move_to_end(affinity_key)
+        if len(self._affinity) > MAX_AFFINITY_KEYS:
+            self._affinity.popitem(last=False)
+        return least
+
+    @asynccontextmanager
+    async def lease(self, affinity_key: Optional[str] = None, exclude: Optional[List[OllamaHost]] = None) -> AsyncIterator[OllamaHost]:
+        """
+        Hold a host for the duration of one request
+
+        Transport errors and 5xx responses count as host failures;
+        cancellation does not, and neither does a generation that is merely
+        slow: read/write/pool timeouts are counted separately (a host that
+        stopped answering fails the health probe instead). Connect timeouts
+        still count.
+        """
+        host = self.choose(affinity_key, exclude)
+        host.outstanding += 1
+        metrics.increment(f"ollama_pool.requests.{host.url}")
+        try:
+            yield host
+        except httpx.TimeoutException as e:
+            if isinstance(e, httpx.ConnectTimeout):
+                self.record_failure(host, e)
+            else:
+                metrics.increment(f"ollama_pool.timeouts.{host.url}")
+            raise
+        except (httpx.TransportError, httpx.HTTPStatusError) as e:
+            if not isinstance(e, httpx.HTTPStatusError) or e.response.status_code >= 500:
+                self.record_failure(host, e)
+            raise
+        else:
+            self.record_success(host)
+        finally:
+            host.outstanding -= 1
+
+    def record_success(self, host: OllamaHost) -> None:
+        host.consecutive_failures = 0
+
+    def record_failure(self, host: OllamaHost, error: Exception) -> None:
+        host.consecutive_failures += 1
+        metrics.increment(f"ollama_pool.failures.{host.url}")
+        if host.healthy and host.consecutive_failures >= self.eject_after_failures:
+            self._eject(host, error)
+
+    def _eject(self, host: OllamaHost, error: Exception) -> None:
+        host.healthy = False
+        delay = min(self.reprobe_seconds * 2 ** host.ejections, self.max_reprobe_seconds)
+        host.ejections += 1
+        host.reprobe_at = time.monotonic() + delay
+        metrics.increment("ollama_pool.ejected")
+        logger.warning("Ejected Ollama host %s for %.0fs: %s", host.url, delay, error)
+
+    def _readmit(self, host: OllamaHost) -> None:
+        host.healthy = True
+        host.consecutive_failures = 0
+        host.ejections = 0
+        metrics.increment("ollama_pool.readmitted")
+        logger.info("Readmitted Ollama host %s", host.url)
+
+    def _schedule_reprobes(self) -> None:
+        """Probe ejected hosts whose back-off has elapsed, in the background"""
+        now = time.monotonic()
+        for host in self.hosts:
+            if not host.healthy and not host.probing and now >= host.reprobe_at:
+                host.probing = True
+                asyncio.ensure_future(self._reprobe(host))
+
+    async def _reprobe(self, host: OllamaHost) -> None:
+        try:
+            if await self.probe(host):
+                self._readmit(host)
+            else:
+                self._eject(host, Exception("health probe failed"))
+        finally:
+            host.probing = False
+
+    async def probe(self, host: OllamaHost) -> bool:
+        """Whether a host answers its health endpoint"""
+        try:
+            async with httpx.AsyncClient(timeout=5.0) as client:
+                response = await client.get(f"{host.url}/api/tags")
+                return response.status_code == 200
+        except Exception:
+            return False
+
+    async def check_connection(self) -> bool:
+        """
+        Probe every host, readmitting or ejecting as needed
+
+        Returns:
+            True if at least one host is reachable
+        """
+        results = await asyncio.gather(*(self.probe(host) for host in self.hosts))
+        for host, ok in zip(self.hosts, results):
+            if ok and not host.healthy:
+                self._readmit(host)
+            elif not ok and host.healthy:
+                self._eject(host, Exception("health probe failed"))
+        return any(results)
+
+    def status(self) -> List[Dict[str, object]]:
+        """Per-host routing state for /metrics"""
+        return [
+            {
+                "url": host.url,
+                "healthy": host.healthy,
+                "outstanding": host.outstanding,
+                "consecutive_failures": host.consecutive_failures,
+                "reprobe_in_seconds": max(0.0, host.reprobe_at - time.monotonic()) if not host.healthy else 0.0,
+            }
+            for host in self.hosts
+        ]
+
+
+ollama_pool = OllamaPool(
+    urls=settings.ollama_hosts or [settings.ollama_host],
+    eject_after_failures=settings.ollama_eject_after_failures,
+    reprobe_seconds=settings.ollama_reprobe_seconds,
+    affinity=settings.ollama_affinity,
+    affinity_max_imbalance=settings.ollama_affinity_max_imbalance
+)
@@ -0,0 +1,172 @@
+"""Speculative prefetch of analyses for the top search results"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Any, Optional
+from app.config import settings
+from app.models.property import ComparablesResult, ConflictResolution
+from app.services.analysis_cache import AnalysisCache, analysis_cache
+from app.services.executor import offload
+from app.services.llm_service import LLMService
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on prepared (source-only) prefetches kept in memory
+MAX_PREPARED = 1000
+
+
+@dataclass
+class PreparedProperty:
+    """Source data and deterministic conflict detection fetched ahead of time"""
+
+    sources: List[Mapping[str, Any]]
+    conflict_resolution: ConflictResolution  # Used when the resolve stage runs out of time
+    prepared_at: float
+    comparables: Optional[ComparablesResult] = None  # None: not computed yet
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.prepared_at
+
+
+class Prefetcher:
+    """
+    Starts low-priority work for search results a client is likely to open
+
+    Each client has at most one set of prefetches; a new search or opening
+    one of the results cancels the rest. The LLM stages are only prefetched
+    when the backend is quiet and a bounded number at a time.
+    """
+
+    def __init__(
+        self,
+        cache: AnalysisCache,
+        top_n: int,
+        prefetch_llm: bool,
+        llm_concurrency: int,
+        llm_max_active: int,
+        prepared_ttl_seconds: float
+    ):
+        self.cache = cache
+        self.top_n = top_n
+        self.prefetch_llm = prefetch_llm
+        self.llm_concurrency = llm_concurrency
+        self.llm_max_active = llm_max_active
+        self.prepared_ttl_seconds = prepared_ttl_seconds
+        # Created on first use so it binds to the running event loop
+        self._llm_slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, Dict[str, asyncio.Task]] = {}
+        self._prepared: Dict[str, PreparedProperty] = {}
+
+    def schedule(self, client_id: str, property_ids: List[str]) -> None:
+        """
+        Replace a client's prefetches with the top results of a new search
+
+        Args:
+            client_id: Identifies the requesting client
+            property_ids: Search results, best first
+        """
+        self.cancel(client_id)
+        tasks = {}
+        for property_id in property_ids[:self.top_n]:
+            if self.cache.get_entry(property_id) is not None:
+                continue
+            tasks[property_id] = asyncio.create_task(self._prefetch(property_id))
+            metrics.increment("prefetch.scheduled")
+        if tasks:
+            self._tasks[client_id] = tasks
+            for property_id, task in tasks.items():
+                task.add_done_callback(
+                    lambda _task, c=client_id, p=property_id: self._forget(c, p)
+                )
+
+    def on_selected(self, client_id: str, property_id: str) -> None:
+        """A client opened a property: cancel prefetches for everything else"""
+        tasks = self._tasks.get(client_id, {})
+        for other_id, task in list(tasks.items()):
+            if other_id != property_id and not task.done():
+                task.cancel()
+                metrics.increment("prefetch.cancelled")
+
+    def cancel(self, client_id: str) -> None:
+        """Cancel all prefetches for a client"""
+        for task in self._tasks.pop(client_id, {}).values():
+            if not task.done():
+                task.cancel()
+                metrics.increment("prefetch.cancelled")
+
+    def invalidate(self, property_ids: Optional[List[str]] = None) -> None:
+        """Drop prepared sources after catalog changes (all of them by default)"""
+        if property_ids is None:
+            self._prepared.clear()
+            return
+        for property_id in property_ids:
+            self._prepared.pop(property_id, None)
+
+    def get_prepared(self, property_id: str) -> Optional[PreparedProperty]:
+        """Prefetched sources for a property, if still fresh"""
+        prepared = self._prepared.get(property_id)
+        if prepared is None or prepared.age > self.prepared_ttl_seconds:
+            self._prepared.pop(property_id, None)
+            return None
+        return prepared
+
+    def _forget(self, client_id: str, property_id: str) -> None:
+        tasks = self._tasks.get(client_id)
+        if tasks is not None:
+            tasks.pop(property_id, None)
+            if not tasks:
+                self._tasks.pop(client_id, None)
+
+    async def _prefetch(self, property_id: str) -> None:
+        from app.data import get_property_data_from_sources
+        from app.services.property_service import PropertyService
+
+        try:
+            # Deterministic stage: cheap, always done
+            if self.get_prepared(property_id) is None:
+                sources = await offload(get_property_data_from_sources, property_id)
+                if not sources:
+                    return
+                prepared = await offload(PropertyService().prepare_property, sources)
+                if len(self._prepared) >= MAX_PREPARED:
+                    # Dicts keep insertion order, so this drops the oldest
+                    self._prepared.pop(next(iter(self._prepared)))
+                self._prepared[property_id] = prepared
+                metrics.increment("prefetch.prepared")
+
+            if not self.prefetch_llm:
+                return
+
+            # LLM stages: only with spare backend capacity
+            if self._llm_slots is None:
+                self._llm_slots = asyncio.Semaphore(self.llm_concurrency)
+            async with self._llm_slots:
+                if LLMService.active_requests >= self.llm_max_active:
+                    metrics.increment("prefetch.skipped_busy")
+                    return
+                await self.cache.get_or_compute(
+                    property_id,
+                    lambda: PropertyService().analyze_property(property_id),
+                    warmed=True,
+                    cancel_if_abandoned=True
+                )
+                metrics.increment("prefetch.analyzed")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            metrics.increment("prefetch.failed")
+            logger.warning("Prefetch of %s failed: %s", property_id, e)
+
+
+prefetcher = Prefetcher(
+    cache=analysis_cache,
+    top_n=settings.prefetch_top_n,
+    prefetch_llm=settings.prefetch_llm,
+    llm_concurrency=settings.prefetch_llm_concurrency,
+    llm_max_active=settings.prefetch_llm_max_active,
+    prepared_ttl_seconds=settings.prefetch_prepared_ttl_seconds
+)
@@ -0,0 +1,262 @@
+"""Sampling profiler for single requests and event-loop lag monitoring"""
+
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+from app.config import settings
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _collapse(frame, max_depth: int = 128) -> str:
+    """Frame chain as a collapsed stack (root first, ';'-separated)"""
+    parts = []
+    while frame is not None and len(parts) < max_depth:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class StackSampler:
+    """
+    Samples one thread's stack at a fixed interval from a helper thread
+
+    The result is a count per collapsed stack, the input format of
+    flamegraph.pl and speedscope. Sampling the event-loop thread shows
+    where CPU time goes; time spent waiting (e.g. on Ollama) shows up as
+    the loop's selector frames.
+    """
+
+    def __init__(self, thread_id: int, interval_seconds: float):
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            self.counts[_collapse(frame)] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        """Collapsed stacks, one '<stack> <count>' line each"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+class RequestProfiler:
+    """
+    Writes sampling profiles of individual requests to a directory
+
+    Only one profile runs at a time; requests that ask for a profile while
+    another is running are served without one. Because the event loop is
+    shared, concurrent requests appear in the same profile.
+    """
+
+    def __init__(self, directory: str, interval_seconds: float, max_files: int):
+        self.directory = directory
+        self.interval_seconds = interval_seconds
+        self.max_files = max_files
+        self._active = False
+
+    def start(self, thread_id: Optional[int] = None) -> Optional[StackSampler]:
+        """Start sampling, or return None if a profile is already running"""
+        if self._active:
+            metrics.increment("profiling.skipped_busy")
+            return None
+        self._active = True
+        sampler = StackSampler(thread_id or threading.get_ident(), self.interval_seconds)
+        sampler.start()
+        return sampler
+
+    def finish(self, sampler: StackSampler, label: str, elapsed_seconds: float) -> str:
+        """
+        Stop sampling and write the profile
+
+        Returns:
+            File name of the profile within the directory
+        """
+        sampler.stop()
+        self._active = False
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_")[:80]
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{slug}-{elapsed_seconds * 1000:.0f}ms.folded"
+        with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+            f.write(sampler.folded())
+        metrics.increment("profiling.profiles_written")
+        self._prune()
+        return name
+
+    def list_profiles(self) -> List[Dict[str, object]]:
+        """Profiles on disk, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".folded"):
+                path = os.path.join(self.directory, name)
+                entries.append({"name": name, "bytes": os.path.getsize(path), "modified": os.path.getmtime(path)})
+        return sorted(entries, key=lambda e: e["modified"], reverse=True)
+
+    def path_for(self, name: str) -> Optional[str]:
+        """Absolute path of a profile, or None for unknown or unsafe names"""
+        if os.path.basename(name) != name or not name.endswith(".folded"):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def _prune(self) -> None:
+        for entry in self.list_profiles()[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, str(entry["name"])))
+            except OSError:
+                pass
+
+
+@dataclass
+class LoopStall:
+    """One period during which the event loop did not run callbacks"""
+
+    started_at: float  # Unix time
+    duration_seconds: float
+    stack: List[str] = field(default_factory=list)
+
+
+class LoopLagMonitor:
+    """
+    Detects event-loop blocking and records the code that was running
+
+    A coroutine on the loop stamps a heartbeat every `interval_seconds`. A
+    watchdog thread checks the heartbeat; when it is older than
+    `threshold_seconds`, the loop thread's current stack is captured (that
+    is the code blocking the loop) and the stall is recorded when the loop
+    catches up.
+    """
+
+    def __init__(self, interval_seconds: float, threshold_seconds: float, max_stalls: int = 100):
+        self.interval_seconds = interval_seconds
+        self.threshold_seconds = threshold_seconds
+        self.stalls: Deque[LoopStall] = deque(maxlen=max_stalls)
+        self.max_lag_seconds = 0.0
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        self._pending_stack: Optional[List[str]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        """Start the heartbeat and watchdog (call from the event loop)"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._beat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+
+    async def _beat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._heartbeat = now
+            metrics.observe("event_loop.lag_seconds", lag)
+            self.max_lag_seconds = max(self.max_lag_seconds, lag)
+            if lag >= self.threshold_seconds:
+                metrics.increment("event_loop.stalls")
+                self.stalls.append(LoopStall(
+                    started_at=time.time() - lag,
+                    duration_seconds=lag,
+                    stack=self._pending_stack or []
+                ))
+            self._pending_stack = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            if self._pending_stack is not None:
+                continue
+            if time.monotonic() - self._heartbeat < self.threshold_seconds + self.interval_seconds:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._pending_stack = traceback.format_stack(frame)
+                logger.warning(
+                    "Event loop blocked for over %.0f ms in:\n%s",
+                    self.threshold_seconds * 1000,
+                    "".join(self._pending_stack[-5:])
+                )
+
+    def summary(self) -> Dict[str, object]:
+        """Lag statistics and recent stalls, newest first"""
+        return {
+            "running": self.running,
+            "threshold_ms": self.threshold_seconds * 1000,
+            "max_lag_ms": self.max_lag_seconds * 1000,
+            "stalls": [
+                {
+                    "started_at": stall.started_at,
+                    "duration_ms": stall.duration_seconds * 1000,
+                    "stack": stall.stack,
+                }
+                for stall in reversed(self.stalls)
+            ],
+        }
+
+
+request_profiler = RequestProfiler(
+    directory=settings.profiling_dir,
+    interval_seconds=settings.profiling_interval_ms / 1000,
+    max_files=settings.profiling_max_files
+)
+
+loop_lag_monitor = LoopLagMonitor(
+    interval_seconds=settings.loop_lag_interval_ms / 1000,
+    threshold_seconds=settings.loop_lag_threshold_ms / 1000
+)
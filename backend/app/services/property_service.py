@@ -1,24 +1,87 @@
 """Property analysis service with multi-source data integration"""
 
-from typing import Dict, Any, List, Tuple
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Any, List, Mapping, Tuple, Optional, TypeVar
+from app.config import settings
 from app.models.property import (
     PropertyAnalysis,
     DataSourceInfo,
     FieldAnalysis,
     ConflictResolution,
-    PropertySummary
+    PropertySummary,
+    ComparablesResult
 )
 from app.services.llm_service import LLMService
+from app.services.analysis_history import analysis_history
+from app.services.comparables_service import ComparablesService
+from app.services.deadline import Deadline
+from app.services.executor import offload
+from app.services.metrics import metrics
+from app.services.model_router import Difficulty, model_router, score_difficulty
+from app.services.prefetch import PreparedProperty, prefetcher
+from app.services.semantic_cache import summary_cache
+from app.services.token_budget import BudgetSection, estimate_tokens, token_budget, truncate_to_tokens
 from app.data import get_property_data_from_sources, get_property_by_id
 
+# Pipeline profiles accepted by analyze_property
+PIPELINE_PROFILES = ("full", "fast")
+
+# LLM stages run by each profile, in order
+PROFILE_STAGES = {
+    "full": ["resolve", "summary", "analysis", "insights"],
+    "fast": ["resolve", "fast"],
+}
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
 
 class PropertyService:
     """Service for analyzing property information from multiple sources"""
     
     def __init__(self):
         self.llm_service = LLMService()
+        # Stage -> reason for stages that fell back to a cheaper result
+        self.degraded_stages: Dict[str, str] = {}
+        # Stage -> model tier and model routed to by the property's difficulty
+        self.stage_tiers: Dict[str, str] = {}
+        self.stage_models: Dict[str, str] = {}
+        self.difficulty: Optional[Difficulty] = None
+        # Called with each LLM stage's name before it runs
+        self.before_stage: Optional[Callable[[str], None]] = None
+    
+    def _mark_degraded(self, stage: str, reason: str) -> None:
+        """Record that a stage used its fallback instead of the LLM"""
+        self.degraded_stages[stage] = reason
+        metrics.increment(f"pipeline.degraded.{stage}.{reason}")
+    
+    def _route_models(self, sources: List[Mapping[str, Any]], stages: List[str]) -> None:
+        """Pick the small or large model for each LLM stage from the sources' difficulty"""
+        self.difficulty = score_difficulty(sources)
+        metrics.observe("model_tier.difficulty", self.difficulty.score)
+        for stage in stages:
+            tier = model_router.tier(stage, self.difficulty)
+            self.stage_tiers[stage] = tier
+            self.stage_models[stage] = model_router.model(stage, tier)
+            metrics.increment(f"model_tier.{stage}.{tier}")
+    
+    def _recommended_values(self, conflict_resolution: ConflictResolution) -> Dict[str, Any]:
+        """Recommended value per resolved field"""
+        recommended_data = {}
+        for fa in conflict_resolution.field_analyses:
+            if fa.recommended_value is not None:
+                recommended_data[fa.field_name] = fa.recommended_value
+        return recommended_data
+    
+    def _to_source_info(self, source: Mapping[str, Any]) -> DataSourceInfo:
+        """Build the API model for a source record, materializing it once"""
+        values = dict(source)
+        return DataSourceInfo(**values, raw_data=values)
     
-    def _extract_field_values(self, sources: List[Dict[str, Any]], field: str) -> List[Tuple[str, Any]]:
+    def _extract_field_values(self, sources: List[Mapping[str, Any]], field: str) -> List[Tuple[str, Any]]:
         """Extract all values for a field from different sources"""
         values = []
         for source in sources:
@@ -26,8 +89,18 @@ class PropertyService:
                 values.append((source['source'], source[field]))
         return values
     
-    def _format_sources_for_llm(self, sources: List[Dict[str, Any]]) -> str:
-        """Format multiple data sources for LLM prompt"""
+    def _format_sources_for_llm(
+        self,
+        sources: List[Mapping[str, Any]],
+        description_tokens: Optional[int] = None
+    ) -> str:
+        """
+        Format multiple data sources for LLM prompt
+        
+        Args:
+            sources: Source records
+            description_tokens: Per-source cap on description length (None = no cap, 0 = omit)
+        """
         formatted = []
         
         for source in sources:
@@ -66,8 +139,11 @@ class PropertyService:
             if source.get('property_type'):
                 source_text.append(f"  Property Type: {source['property_type']}")
             
-            if source.get('description'):
-                source_text.append(f"  Description: {source['description']}")
+            if source.get('description') and description_tokens != 0:
+                description = source['description']
+                if description_tokens is not None:
+                    description = truncate_to_tokens(description, description_tokens)
+                source_text.append(f"  Description: {description}")
             
             if source.get('last_updated'):
                 source_text.append(f"  Last Updated: {source['last_updated']}")
@@ -76,16 +152,59 @@ class PropertyService:
         
         return '\n\n'.join(formatted)
     
+    def _fit_descriptions(
+        self,
+        stage: str,
+        build_prompt: Callable[[str, Dict[str, str]], str],
+        sources: List[Mapping[str, Any]],
+        extra_sections: Optional[List[BudgetSection]] = None
+    ):
+        """
+        Fit a stage prompt into its token budget, trimming descriptions first
+        
+        Args:
+            stage: Pipeline stage name
+            build_prompt: Callable(sources_text, fitted_sections) -> prompt
+            sources: Source records
+            extra_sections: Further trimmable sections, after descriptions
+            
+        Returns:
+            (prompt, budget decision)
+        """
+        extra_sections = extra_sections or []
+        descriptions = [s['description'] for s in sources if s.get('description')]
+        
+        # Everything except the trimmable parts
+        fixed = build_prompt(
+            self._format_sources_for_llm(sources, description_tokens=0),
+            {section.name: "" for section in extra_sections}
+        )
+        fitted, decision = token_budget.fit(
+            stage,
+            fixed,
+            [BudgetSection("descriptions", "\n".join(descriptions))] + extra_sections
+        )
+        
+        description_tokens = None
+        if "descriptions" in decision.trimmed:
+            # Share what's left of the description budget evenly across sources
+            description_tokens = estimate_tokens(fitted["descriptions"]) // max(1, len(descriptions))
+        
+        prompt = build_prompt(
+            self._format_sources_for_llm(sources, description_tokens=description_tokens),
+            fitted
+        )
+        return prompt, decision
+    
     async def _resolve_conflicts_with_llm(
         self, 
-        sources: List[Dict[str, Any]],
+        sources: List[Mapping[str, Any]],
         address: str
     ) -> ConflictResolution:
         """Use LLM to analyze conflicts and recommend values"""
         
-        sources_text = self._format_sources_for_llm(sources)
-        
-        prompt = f"""You are analyzing property data from multiple sources for: {address}
+        def build_prompt(sources_text: str, sections: Dict[str, str]) -> str:
+            return f"""You are analyzing property data from multiple sources for: {address}
 
 The data has inconsistencies, conflicts, and missing information. Your task is to:
 1. Identify all conflicts (where sources disagree)
@@ -115,10 +234,14 @@ Provide a JSON response with this structure:
 
 Analyze ALL key fields: price, bedrooms, bathrooms, square_feet, year_built, lot_size, property_type."""
 
+        prompt, budget = await offload(self._fit_descriptions, "resolve", build_prompt, sources)
+        
         try:
             result = await self.llm_service.generate_structured(
                 prompt=prompt,
-                temperature=0.3
+                temperature=0.3,
+                num_ctx=budget.num_ctx,
+                model=self.stage_models.get("resolve")
             )
             
             # Parse field analyses
@@ -142,9 +265,40 @@ Analyze ALL key fields: price, bedrooms, bathrooms, square_feet, year_built, lot
             
         except Exception as e:
             # Fallback: basic conflict detection
+            self._mark_degraded("resolve", "error")
             return self._basic_conflict_resolution(sources)
     
-    def _basic_conflict_resolution(self, sources: List[Dict[str, Any]]) -> ConflictResolution:
+    def prepare_property(
+        self,
+        sources: List[Mapping[str, Any]],
+        comparables: Optional[ComparablesResult] = None
+    ) -> PreparedProperty:
+        """
+        Deterministic part of an analysis, done ahead of the LLM stages
+        
+        Used by prefetching, bulk runs and the source watcher. CPU-bound, so
+        callers on the event loop should run it through `offload`.
+        
+        Args:
+            sources: Source records for the property
+            comparables: Comparables, if already computed
+            
+        Returns:
+            The sources with the conflict detection that stands in for the
+            resolve stage when it runs out of time
+        """
+        return PreparedProperty(
+            sources=sources,
+            conflict_resolution=self._basic_conflict_resolution(sources, reason="deadline reached"),
+            prepared_at=time.monotonic(),
+            comparables=comparables
+        )
+    
+    def _basic_conflict_resolution(
+        self,
+        sources: List[Mapping[str, Any]],
+        reason: str = "LLM analysis failed"
+    ) -> ConflictResolution:
         """Fallback conflict resolution without LLM"""
         
         field_analyses = []
@@ -177,31 +331,132 @@ Analyze ALL key fields: price, bedrooms, bathrooms, square_feet, year_built, lot
             field_analyses=field_analyses,
             overall_confidence=0.6,
             missing_fields=missing_fields,
-            conflict_summary="Basic conflict detection applied (LLM analysis failed)"
+            conflict_summary=f"Basic conflict detection applied ({reason})"
+        )
+    
+    def _data_concerns(self, conflict_resolution: ConflictResolution) -> List[str]:
+        """Concerns that follow from conflicting and missing fields"""
+        concerns = [
+            f"Sources disagree on {fa.field_name.replace('_', ' ')}"
+            for fa in conflict_resolution.field_analyses if fa.conflicts
+        ]
+        concerns += [f"Missing {field.replace('_', ' ')}" for field in conflict_resolution.missing_fields]
+        return concerns
+    
+    def _descriptive_text(self, sources: List[Mapping[str, Any]]) -> str:
+        """Text the descriptive summary outputs depend on, for similarity lookups"""
+        descriptions = sorted({s['description'] for s in sources if s.get('description')})
+        if not descriptions:
+            return ""
+        property_types = sorted({s['property_type'] for s in sources if s.get('property_type')})
+        return f"Type: {', '.join(property_types)}\n" + "\n".join(descriptions)
+    
+    def _template_summary(
+        self,
+        conflict_resolution: ConflictResolution,
+        sources: List[Mapping[str, Any]]
+    ) -> PropertySummary:
+        """Summary built from resolved values alone, without the LLM"""
+        
+        recommended_data = self._recommended_values(conflict_resolution)
+        
+        key_features = []
+        if recommended_data.get('bedrooms') and recommended_data.get('bathrooms'):
+            key_features.append(
+                f"{recommended_data['bedrooms']} bed / {recommended_data['bathrooms']} bath"
+            )
+        if recommended_data.get('square_feet'):
+            key_features.append(f"{recommended_data['square_feet']:,.0f} sq ft")
+        if recommended_data.get('year_built'):
+            key_features.append(f"Built {recommended_data['year_built']}")
+        
+        concerns = self._data_concerns(conflict_resolution)
+        concerns.append("Unable to generate detailed summary")
+        
+        return PropertySummary(
+            price=recommended_data.get('price'),
+            bedrooms=recommended_data.get('bedrooms'),
+            bathrooms=recommended_data.get('bathrooms'),
+            square_feet=recommended_data.get('square_feet'),
+            year_built=recommended_data.get('year_built'),
+            lot_size=recommended_data.get('lot_size'),
+            property_type=sources[0].get('property_type') if sources else None,
+            key_features=key_features,
+            concerns=concerns
         )
     
+    def _template_analysis(
+        self,
+        property_summary: PropertySummary,
+        conflict_resolution: ConflictResolution,
+        comparables: Optional[ComparablesResult] = None
+    ) -> str:
+        """Short data-quality assessment built without the LLM"""
+        
+        parts = [f"Data confidence is {conflict_resolution.overall_confidence:.0%} across the available sources."]
+        
+        conflicts = [fa.field_name.replace('_', ' ') for fa in conflict_resolution.field_analyses if fa.conflicts]
+        if conflicts:
+            parts.append(f"Sources disagree on {', '.join(conflicts)}.")
+        else:
+            parts.append("Sources agree on the key fields.")
+        if conflict_resolution.missing_fields:
+            parts.append(f"Missing: {', '.join(conflict_resolution.missing_fields)}.")
+        
+        if comparables and comparables.stats.count:
+            subject = comparables.subject_price_per_sqft
+            median = comparables.stats.median_price_per_sqft
+            if subject and median:
+                difference = subject / median - 1
+                parts.append(
+                    f"At ${subject:,.0f}/sq ft it is priced {abs(difference):.0%} "
+                    f"{'above' if difference >= 0 else 'below'} the median of "
+                    f"{comparables.stats.count} nearby comparables."
+                )
+        
+        parts.append("A detailed written analysis was not generated for this request.")
+        return " ".join(parts)
+    
     async def _generate_unified_summary(
         self,
         conflict_resolution: ConflictResolution,
-        sources: List[Dict[str, Any]],
+        sources: List[Mapping[str, Any]],
         address: str
     ) -> PropertySummary:
         """Generate unified property summary with LLM"""
         
         # Extract recommended values
-        recommended_data = {}
-        for fa in conflict_resolution.field_analyses:
-            if fa.recommended_value is not None:
-                recommended_data[fa.field_name] = fa.recommended_value
-        
-        # Combine all descriptions
-        descriptions = [s.get('description', '') for s in sources if s.get('description')]
-        combined_description = ' | '.join(descriptions)
+        recommended_data = self._recommended_values(conflict_resolution)
         
-        sources_text = self._format_sources_for_llm(sources)
-        conflicts_text = conflict_resolution.conflict_summary
+        # Listings with near-identical descriptions (syndicated copy, relisted
+        # units) reuse descriptive outputs; numbers always come from this property
+        embedding = None
+        if settings.semantic_cache_enabled:
+            descriptive_text = self._descriptive_text(sources)
+            if descriptive_text:
+                try:
+                    embedding = await self.llm_service.embed(descriptive_text)
+                except Exception:
+                    metrics.increment("semantic_cache.summary.embed_failed")
+            if embedding is not None:
+                cached = await offload(summary_cache.lookup, embedding)
+                if cached is not None:
+                    return PropertySummary(
+                        price=recommended_data.get('price'),
+                        bedrooms=recommended_data.get('bedrooms'),
+                        bathrooms=recommended_data.get('bathrooms'),
+                        square_feet=recommended_data.get('square_feet'),
+                        year_built=recommended_data.get('year_built'),
+                        lot_size=recommended_data.get('lot_size'),
+                        property_type=cached['property_type'],
+                        key_features=cached['key_features'],
+                        condition=cached['condition'],
+                        highlights=cached['highlights'],
+                        concerns=self._data_concerns(conflict_resolution)
+                    )
         
-        prompt = f"""Based on the analyzed property data for {address}, create a unified summary.
+        def build_prompt(sources_text: str, sections: Dict[str, str]) -> str:
+            return f"""Based on the analyzed property data for {address}, create a unified summary.
 
 RESOLVED DATA:
 {recommended_data}
@@ -210,7 +465,7 @@ ORIGINAL SOURCES:
 {sources_text}
 
 CONFLICTS IDENTIFIED:
-{conflicts_text}
+{sections["conflicts"]}
 
 Provide a JSON response:
 {{
@@ -223,12 +478,31 @@ Provide a JSON response:
 
 Be critical about data quality. Flag conflicts and missing information as concerns."""
 
+        prompt, budget = await offload(
+            self._fit_descriptions,
+            "summary",
+            build_prompt,
+            sources,
+            [BudgetSection("conflicts", conflict_resolution.conflict_summary, min_tokens=60)]
+        )
+        
         try:
             result = await self.llm_service.generate_structured(
                 prompt=prompt,
-                temperature=0.4
+                temperature=0.4,
+                num_ctx=budget.num_ctx,
+                model=self.stage_models.get("summary")
             )
             
+            if embedding is not None and 'key_features' in result:
+                # Hashing into the LSH buckets and the cache lock stay off the loop
+                await offload(summary_cache.add, embedding, {
+                    'property_type': result.get('property_type'),
+                    'key_features': result.get('key_features', []),
+                    'condition': result.get('condition'),
+                    'highlights': result.get('highlights', [])
+                })
+            
             return PropertySummary(
                 price=recommended_data.get('price'),
                 bedrooms=recommended_data.get('bedrooms'),
@@ -245,22 +519,15 @@ Be critical about data quality. Flag conflicts and missing information as concer
             
         except Exception:
             # Fallback summary
-            return PropertySummary(
-                price=recommended_data.get('price'),
-                bedrooms=recommended_data.get('bedrooms'),
-                bathrooms=recommended_data.get('bathrooms'),
-                square_feet=recommended_data.get('square_feet'),
-                year_built=recommended_data.get('year_built'),
-                property_type=sources[0].get('property_type') if sources else None,
-                key_features=[],
-                concerns=["Unable to generate detailed summary"]
-            )
+            self._mark_degraded("summary", "error")
+            return self._template_summary(conflict_resolution, sources)
     
     async def _generate_comprehensive_analysis(
         self,
         property_summary: PropertySummary,
         conflict_resolution: ConflictResolution,
-        address: str
+        address: str,
+        comparables: Optional[ComparablesResult] = None
     ) -> str:
         """Generate comprehensive analysis including data quality assessment"""
         
@@ -292,7 +559,7 @@ DATA QUALITY:
 - Conflicts Found: {len([fa for fa in conflict_resolution.field_analyses if fa.conflicts])}
 - Missing Fields: {', '.join(conflict_resolution.missing_fields) if conflict_resolution.missing_fields else 'None'}
 - Conflict Summary: {conflict_resolution.conflict_summary}
-
+{self._format_comparables_for_llm(comparables)}
 Your analysis should:
 1. Assess the reliability of the available data
 2. Evaluate the property based on confirmed information
@@ -302,15 +569,40 @@ Your analysis should:
 
 Write 3-4 clear paragraphs."""
 
+        _, budget = token_budget.fit("analysis", system_prompt + prompt, [])
+        
         try:
             analysis = await self.llm_service.generate(
                 prompt=prompt,
                 system_prompt=system_prompt,
-                temperature=0.7
+                temperature=0.7,
+                num_ctx=budget.num_ctx,
+                model=self.stage_models.get("analysis")
             )
             return analysis
-        except Exception as e:
-            return f"Error generating analysis: {str(e)}"
+        except Exception:
+            self._mark_degraded("analysis", "error")
+            return self._template_analysis(property_summary, conflict_resolution, comparables)
+    
+    def _format_comparables_for_llm(self, comparables: Optional[ComparablesResult]) -> str:
+        """Format comparables statistics as a compact prompt section"""
+        if not comparables or not comparables.stats.count:
+            return ""
+        
+        stats = comparables.stats
+        
+        def money(value: Optional[float]) -> str:
+            return f"${value:,.0f}" if value is not None else "[UNKNOWN]"
+        
+        lines = ["", f"NEARBY COMPARABLES ({stats.count} properties):"]
+        lines.append(f"- Median Price/SqFt: {money(stats.median_price_per_sqft)} "
+                     f"(range {money(stats.min_price_per_sqft)} - {money(stats.max_price_per_sqft)})")
+        lines.append(f"- This Property Price/SqFt: {money(comparables.subject_price_per_sqft)}")
+        if stats.median_square_feet is not None:
+            lines.append(f"- Median Size: {stats.median_square_feet:,.0f} sqft")
+        if stats.median_age_years is not None:
+            lines.append(f"- Median Age: {stats.median_age_years:.0f} years")
+        return '\n'.join(lines) + '\n'
     
     async def _generate_insights(
         self,
@@ -320,7 +612,8 @@ Write 3-4 clear paragraphs."""
     ) -> List[str]:
         """Generate key actionable insights"""
         
-        prompt = f"""Based on this property analysis, provide 4-6 key actionable insights.
+        def build_prompt(analysis_text: str) -> str:
+            return f"""Based on this property analysis, provide 4-6 key actionable insights.
 
 PROPERTY SUMMARY:
 Price: {property_summary.price}
@@ -328,7 +621,7 @@ Type: {property_summary.property_type}
 Confidence: {conflict_resolution.overall_confidence:.0%}
 
 ANALYSIS:
-{analysis}
+{analysis_text}
 
 Provide ONLY a JSON array of insights:
 ["insight 1", "insight 2", "insight 3", ...]
@@ -339,10 +632,21 @@ Focus on:
 - Property evaluation recommendations  
 - Risk factors to investigate"""
 
+        # The full analysis is the bulk of this prompt; keep its opening if trimmed
+        fitted, budget = token_budget.fit(
+            "insights",
+            build_prompt(""),
+            [BudgetSection("analysis", analysis, min_tokens=150)],
+            output_tokens=400
+        )
+        prompt = build_prompt(fitted["analysis"])
+        
         try:
             result = await self.llm_service.generate(
                 prompt=prompt,
-                temperature=0.5
+                temperature=0.5,
+                num_ctx=budget.num_ctx,
+                model=self.stage_models.get("insights")
             )
             
             # Parse JSON array
@@ -359,22 +663,184 @@ Focus on:
             return [line.lstrip('•-*123456789. ') for line in lines if line][:6]
             
         except Exception:
+            self._mark_degraded("insights", "error")
             return [
                 "Verify conflicting data points with additional sources",
                 "Obtain missing critical information before making decisions",
                 "Schedule professional property inspection"
             ]
     
-    async def analyze_property(self, property_id: str) -> PropertyAnalysis:
+    async def _generate_fast_report(
+        self,
+        conflict_resolution: ConflictResolution,
+        sources: List[Mapping[str, Any]],
+        address: str,
+        comparables: Optional[ComparablesResult] = None
+    ) -> Tuple[PropertySummary, str, List[str]]:
+        """
+        Generate summary, a short analysis and insights in one structured call
+        
+        Used by the fast profile in place of the summary, analysis and
+        insights stages.
+        
+        Returns:
+            (property summary, analysis text, insights)
+        """
+        
+        recommended_data = self._recommended_values(conflict_resolution)
+        
+        comparables_text = self._format_comparables_for_llm(comparables)
+        
+        def build_prompt(sources_text: str, sections: Dict[str, str]) -> str:
+            return f"""Screen this property for {address} using the analyzed data below.
+
+RESOLVED DATA:
+{recommended_data}
+
+ORIGINAL SOURCES:
+{sources_text}
+
+DATA QUALITY:
+- Overall Confidence: {conflict_resolution.overall_confidence:.0%}
+- Missing Fields: {', '.join(conflict_resolution.missing_fields) if conflict_resolution.missing_fields else 'None'}
+- Conflicts: {sections["conflicts"]}
+{comparables_text}
+Provide a JSON response:
+{{
+    "key_features": ["list of main confirmed features"],
+    "property_type": "final property type",
+    "condition": "estimated condition based on descriptions and age",
+    "highlights": ["strengths and positive aspects"],
+    "concerns": ["data quality issues, conflicts, missing info, property concerns"],
+    "analysis": "one short paragraph on data reliability and the property overall",
+    "insights": ["3-5 actionable next steps"]
+}}
+
+Be critical about data quality. Keep every field brief."""
+
+        prompt, budget = await offload(
+            self._fit_descriptions,
+            "fast",
+            build_prompt,
+            sources,
+            [BudgetSection("conflicts", conflict_resolution.conflict_summary, min_tokens=60)]
+        )
+        
+        try:
+            result = await self.llm_service.generate_structured(
+                prompt=prompt,
+                temperature=0.4,
+                num_ctx=budget.num_ctx,
+                model=self.stage_models.get("fast")
+            )
+            
+            summary = PropertySummary(
+                price=recommended_data.get('price'),
+                bedrooms=recommended_data.get('bedrooms'),
+                bathrooms=recommended_data.get('bathrooms'),
+                square_feet=recommended_data.get('square_feet'),
+                year_built=recommended_data.get('year_built'),
+                lot_size=recommended_data.get('lot_size'),
+                property_type=result.get('property_type'),
+                key_features=result.get('key_features', []),
+                condition=result.get('condition'),
+                highlights=result.get('highlights', []),
+                concerns=result.get('concerns', [])
+            )
+            insights = result.get('insights', [])
+            return (
+                summary,
+                str(result.get('analysis', '')),
+                [str(i) for i in insights] if isinstance(insights, list) else []
+            )
+            
+        except Exception:
+            self._mark_degraded("fast", "error")
+            return self._degraded_fast_report(conflict_resolution, sources, comparables)
+    
+    def _degraded_fast_report(
+        self,
+        conflict_resolution: ConflictResolution,
+        sources: List[Mapping[str, Any]],
+        comparables: Optional[ComparablesResult] = None
+    ) -> Tuple[PropertySummary, str, List[str]]:
+        """Templated summary and analysis with no insights"""
+        summary = self._template_summary(conflict_resolution, sources)
+        return summary, self._template_analysis(summary, conflict_resolution, comparables), []
+    
+    async def _run_stage(
+        self,
+        stage: str,
+        deadline: Deadline,
+        pending_stages: List[str],
+        run: Callable[[], Awaitable[T]],
+        degrade: Callable[[], T]
+    ) -> T:
+        """
+        Run an LLM stage within its share of the deadline, or degrade it
+        
+        Args:
+            stage: Stage name
+            deadline: Request deadline
+            pending_stages: This stage and the ones after it
+            run: Coroutine factory for the LLM stage
+            degrade: Cheap deterministic replacement
+            
+        Returns:
+            The stage result
+        """
+        if self.before_stage:
+            self.before_stage(stage)
+        timeout = deadline.allot(stage, pending_stages)
+        if timeout < settings.analysis_stage_min_seconds:
+            self._mark_degraded(stage, "deadline")
+            return degrade()
+        
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(run(), timeout)
+        except asyncio.TimeoutError:
+            self._mark_degraded(stage, "timeout")
+            return degrade()
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe(f"pipeline.{stage}.seconds", elapsed)
+            if stage in self.stage_tiers:
+                metrics.observe(f"pipeline.{stage}.{self.stage_tiers[stage]}.seconds", elapsed)
+    
+    async def analyze_property(
+        self,
+        property_id: str,
+        profile: str = "full",
+        deadline: Optional[Deadline] = None,
+        prepared: Optional[PreparedProperty] = None,
+        before_stage: Optional[Callable[[str], None]] = None
+    ) -> PropertyAnalysis:
         """
         Analyze property from multiple data sources
         
         Args:
             property_id: Property ID
+            profile: Pipeline profile - "full" runs four LLM stages, "fast"
+                fuses summary, analysis and insights into a single call
+            deadline: Time budget for the whole analysis (default from settings);
+                stages that would overrun it are degraded to templated results
+            prepared: Sources (and comparables) already fetched, e.g. by a
+                bulk run; defaults to a recent prefetch, if any
+            before_stage: Called with each LLM stage's name before it runs;
+                may raise to abandon the analysis (e.g. background work
+                yielding to user traffic)
             
         Returns:
             Complete property analysis with conflict resolution
         """
+        if profile not in PIPELINE_PROFILES:
+            raise ValueError(f"Unknown pipeline profile: {profile}")
+        deadline = deadline or Deadline(settings.analysis_deadline_seconds)
+        stages = PROFILE_STAGES[profile]
+        self.before_stage = before_stage
+        # Keep every stage of this analysis on one Ollama host
+        self.llm_service.affinity_key = property_id
         
         # Check LLM connection
         is_connected = await self.llm_service.check_connection()
@@ -390,38 +856,106 @@ Focus on:
         
         address = property_info['address']
         
-        # Fetch data from multiple sources
-        raw_sources = get_property_data_from_sources(property_id)
+        # Fetch data from multiple sources, reusing a recent prefetch
+        prepared = prepared or prefetcher.get_prepared(property_id)
+        raw_sources = prepared.sources if prepared else await offload(get_property_data_from_sources, property_id)
         if not raw_sources:
             raise Exception(f"No data available for property: {property_id}")
         
-        # Convert to DataSourceInfo models
-        data_sources = [
-            DataSourceInfo(**source, raw_data=source)
-            for source in raw_sources
-        ]
+        # Easy properties go to the small model
+        self._route_models(raw_sources, stages)
         
         # Resolve conflicts using LLM
-        conflict_resolution = await self._resolve_conflicts_with_llm(raw_sources, address)
-        
-        # Generate unified summary
-        property_summary = await self._generate_unified_summary(
-            conflict_resolution, raw_sources, address
+        conflict_resolution = await self._run_stage(
+            "resolve", deadline, stages,
+            lambda: self._resolve_conflicts_with_llm(raw_sources, address),
+            # A prefetch or bulk run already did the deterministic detection
+            lambda: prepared.conflict_resolution if prepared
+            else self._basic_conflict_resolution(raw_sources, reason="deadline reached")
         )
         
-        # Generate comprehensive analysis
-        analysis = await self._generate_comprehensive_analysis(
-            property_summary, conflict_resolution, address
-        )
+        # Market context from nearby comparables (no LLM involved)
+        if prepared and prepared.comparables is not None:
+            comparables = prepared.comparables
+        else:
+            try:
+                comparables = await offload(ComparablesService().get_comparables, property_id)
+            except Exception:
+                comparables = None
+        
+        if profile == "fast":
+            # Summary, short analysis and insights in one generation
+            property_summary, analysis, insights = await self._run_stage(
+                "fast", deadline, stages[1:],
+                lambda: self._generate_fast_report(conflict_resolution, raw_sources, address, comparables),
+                lambda: self._degraded_fast_report(conflict_resolution, raw_sources, comparables)
+            )
+        else:
+            # Generate unified summary
+            property_summary = await self._run_stage(
+                "summary", deadline, stages[1:],
+                lambda: self._generate_unified_summary(conflict_resolution, raw_sources, address),
+                lambda: self._template_summary(conflict_resolution, raw_sources)
+            )
+            
+            # Generate comprehensive analysis
+            analysis = await self._run_stage(
+                "analysis", deadline, stages[2:],
+                lambda: self._generate_comprehensive_analysis(
+                    property_summary, conflict_resolution, address, comparables
+                ),
+                lambda: self._template_analysis(property_summary, conflict_resolution, comparables)
+            )
+            
+            # Generate insights (skipped when out of time)
+            insights = await self._run_stage(
+                "insights", deadline, stages[3:],
+                lambda: self._generate_insights(property_summary, conflict_resolution, analysis),
+                lambda: []
+            )
         
-        # Generate insights
-        insights = await self._generate_insights(
-            property_summary, conflict_resolution, analysis
+        # Validating the full response model is the largest CPU step left
+        result = await offload(
+            self._build_analysis,
+            property_id, address, raw_sources, conflict_resolution,
+            property_summary, analysis, insights, profile
         )
+        for stage, tier in self.stage_tiers.items():
+            if stage not in self.degraded_stages:
+                # Confidence by tier, to compare the small model's quality with the large one's
+                metrics.observe(f"model_tier.{stage}.{tier}.confidence", result.confidence_score)
+        await self._record_history(result)
+        return result
+    
+    async def _record_history(self, analysis: PropertyAnalysis) -> None:
+        """Append a completed analysis to the history log (never fails the request)"""
+        if not settings.history_enabled:
+            return
+        try:
+            await offload(analysis_history.append, analysis)
+        except Exception:
+            metrics.increment("history.append_failed")
+            logger.warning("Failed to record analysis history for %s", analysis.property_id, exc_info=True)
+    
+    def _build_analysis(
+        self,
+        property_id: str,
+        address: str,
+        raw_sources: List[Mapping[str, Any]],
+        conflict_resolution: ConflictResolution,
+        property_summary: PropertySummary,
+        analysis: str,
+        insights: List[str],
+        profile: str
+    ) -> PropertyAnalysis:
+        """Assemble the response model"""
         
         # Calculate confidence score
         confidence_score = conflict_resolution.overall_confidence
         
+        # Convert compact source records to API models only for the response
+        data_sources = [self._to_source_info(source) for source in raw_sources]
+        
         return PropertyAnalysis(
             property_id=property_id,
             address=address,
@@ -430,5 +964,9 @@ Focus on:
             property_summary=property_summary,
             analysis=analysis,
             insights=insights,
-            confidence_score=confidence_score
+            confidence_score=confidence_score,
+            profile=profile,
+            degraded_stages=self.degraded_stages,
+            difficulty=self.difficulty.score if self.difficulty else None,
+            stage_models=self.stage_models
         )
@@ -0,0 +1,161 @@
+"""Embedding-similarity cache for descriptive LLM outputs"""
+
+import math
+import random
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.config import settings
+from app.services.metrics import metrics
+
+# Below this many entries a linear scan beats hashing. Hashing a query costs
+# bits * tables dot products and each table's bucket holds about 1/2**bits
+# of the entries, so with the defaults LSH wins from roughly 64 entries on
+# (a 2000-entry scan of 768-d vectors takes ~100 ms of pure Python)
+BRUTE_FORCE_MAX = 64
+
+
+def normalize(vector: Sequence[float]) -> array:
+    """Unit-length copy of a vector (cosine similarity becomes a dot product)"""
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return array('f', (x / norm for x in vector))
+
+
+def dot(a: array, b: array) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+class VectorIndex:
+    """
+    In-process nearest-neighbour index over unit vectors
+
+    Uses random-hyperplane LSH: each of `tables` hash tables buckets vectors
+    by the signs of their projections onto `bits` random hyperplanes, and
+    only vectors sharing a bucket with the query are compared exactly. With
+    the defaults, a neighbour at cosine similarity 0.95 is found with
+    roughly 99% probability. Oldest entries are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int, bits: int = 8, tables: int = 8, seed: int = 0):
+        self.max_entries = max_entries
+        self.bits = bits
+        self.tables = tables
+        self.seed = seed
+        self.dim: Optional[int] = None
+        self._planes: List[List[array]] = []
+        self._entries: "OrderedDict[int, Tuple[array, Any, Tuple[int, ...]]]" = OrderedDict()
+        self._buckets: List[Dict[int, set]] = [{} for _ in range(tables)]
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _init_planes(self, dim: int) -> None:
+        rng = random.Random(self.seed)
+        self.dim = dim
+        self._planes = [
+            [array('f', (rng.gauss(0, 1) for _ in range(dim))) for _ in range(self.bits)]
+            for _ in range(self.tables)
+        ]
+
+    def _signatures(self, vector: array) -> Tuple[int, ...]:
+        signatures = []
+        for planes in self._planes:
+            signature = 0
+            for plane in planes:
+                signature = (signature << 1) | (dot(plane, vector) >= 0)
+            signatures.append(signature)
+        return tuple(signatures)
+
+    def add(self, vector: Sequence[float], payload: Any) -> None:
+        """Index a vector with its payload"""
+        if self.dim is None:
+            self._init_planes(len(vector))
+        if len(vector) != self.dim:
+            raise ValueError(f"Expected a {self.dim}-dimensional vector, got {len(vector)}")
+        unit = normalize(vector)
+        signatures = self._signatures(unit)
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (unit, payload, signatures)
+        for table, signature in zip(self._buckets, signatures):
+            table.setdefault(signature, set()).add(entry_id)
+        if len(self._entries) > self.max_entries:
+            self._evict()
+
+    def _evict(self) -> None:
+        entry_id, (_, _, signatures) = self._entries.popitem(last=False)
+        for table, signature in zip(self._buckets, signatures):
+            bucket = table.get(signature)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del table[signature]
+
+    def nearest(self, vector: Sequence[float]) -> Optional[Tuple[float, Any]]:
+        """
+        Most similar indexed vector
+
+        Returns:
+            (cosine similarity, payload), or None if nothing is comparable
+        """
+        if self.dim is None or len(vector) != self.dim or not self._entries:
+            return None
+        unit = normalize(vector)
+        if len(self._entries) <= BRUTE_FORCE_MAX:
+            candidates = self._entries.keys()
+        else:
+            candidates = set()
+            for table, signature in zip(self._buckets, self._signatures(unit)):
+                candidates |= table.get(signature, set())
+        best: Optional[Tuple[float, Any]] = None
+        for entry_id in candidates:
+            stored, payload, _ = self._entries[entry_id]
+            score = dot(unit, stored)
+            if best is None or score > best[0]:
+                best = (score, payload)
+        return best
+
+
+class SemanticCache:
+    """
+    Reuses outputs generated for semantically near-identical inputs
+
+    Only outputs that describe the input text (not values computed from it)
+    should be stored; callers recompute everything else.
+    """
+
+    def __init__(self, name: str, threshold: float, max_entries: int):
+        self.name = name
+        self.threshold = threshold
+        self.index = VectorIndex(max_entries=max_entries)
+        # Lookups run on executor threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def lookup(self, embedding: Sequence[float]) -> Optional[Dict[str, Any]]:
+        """Cached outputs for the closest input above the threshold"""
+        with self._lock:
+            match = self.index.nearest(embedding)
+        if match is not None:
+            metrics.observe(f"semantic_cache.{self.name}.best_similarity", match[0])
+        if match is None or match[0] < self.threshold:
+            metrics.increment(f"semantic_cache.{self.name}.misses")
+            return None
+        metrics.increment(f"semantic_cache.{self.name}.hits")
+        return match[1]
+
+    def add(self, embedding: Sequence[float], outputs: Dict[str, Any]) -> None:
+        """Remember outputs for an input"""
+        with self._lock:
+            self.index.add(embedding, outputs)
+
+
+summary_cache = SemanticCache(
+    name="summary",
+    threshold=settings.semantic_cache_threshold,
+    max_entries=settings.semantic_cache_max_entries
+)
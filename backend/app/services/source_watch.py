@@ -0,0 +1,257 @@
+"""Push re-analyses to subscribed clients when a property's source data changes"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Optional, Set
+from app.config import settings
+from app.models.property import PropertyAnalysis
+from app.services.analysis_cache import AnalysisCache, analysis_cache, cache_key
+from app.services.analysis_history import analysis_history, diff_analyses
+from app.services.comparables_service import invalidate_comparables_cache
+from app.services.executor import offload
+from app.services.metrics import metrics
+from app.services.prefetch import prefetcher
+from app.services.property_service import PIPELINE_PROFILES, PropertyService
+from app.data import get_property_data_from_sources, reload_catalog
+
+logger = logging.getLogger(__name__)
+
+WATCH_MODES = ("diff", "full")
+
+
+def fingerprint_sources(records: Iterable[Mapping[str, Any]]) -> str:
+    """Hash of a property's source records (order-independent)"""
+    encoded = sorted(json.dumps(dict(record), sort_keys=True, default=str) for record in records)
+    return hashlib.blake2b("\n".join(encoded).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _current_fingerprint(property_id: str) -> str:
+    return fingerprint_sources(get_property_data_from_sources(property_id))
+
+
+class Subscriber:
+    """
+    Outgoing messages for one WebSocket connection
+
+    Updates are coalesced per property: if a client falls behind, it gets
+    only the newest analysis of each property, sent in full because the
+    diff it would have applied to was never delivered.
+    """
+
+    def __init__(self, mode: str):
+        if mode not in WATCH_MODES:
+            raise ValueError(f"Unknown watch mode: {mode}")
+        self.mode = mode
+        self.property_ids: Set[str] = set()
+        self._control: Deque[Dict[str, Any]] = deque()
+        self._updates: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ready = asyncio.Event()
+
+    def send(self, message: Dict[str, Any]) -> None:
+        """Queue a control message (acknowledgements, errors)"""
+        self._control.append(message)
+        self._ready.set()
+
+    def offer(self, property_id: str, analysis: PropertyAnalysis, changes: Optional[List[Dict[str, Any]]]) -> None:
+        """Queue an analysis update, replacing an undelivered one for the same property"""
+        if property_id in self._updates:
+            metrics.increment("watch.coalesced")
+            changes = None
+        message: Dict[str, Any] = {"type": "analysis", "property_id": property_id}
+        if self.mode == "diff" and changes is not None:
+            message["changes"] = changes
+        else:
+            message["analysis"] = analysis.model_dump(mode="json")
+        self._updates[property_id] = message
+        self._ready.set()
+
+    async def next(self) -> Dict[str, Any]:
+        """Wait for the next message to send"""
+        while not self._control and not self._updates:
+            self._ready.clear()
+            await self._ready.wait()
+        if self._control:
+            return self._control.popleft()
+        return self._updates.popitem(last=False)[1]
+
+
+class SourceWatcher:
+    """
+    Detects source changes for watched properties and re-analyzes them once
+
+    Only properties with at least one subscriber are checked. A check
+    fingerprints the property's source records (no LLM call); it runs for
+    every watched property when the catalog file is replaced (e.g. by
+    `app.cli ingest`), and for specific properties passed to `notify`. A
+    changed property is re-analyzed once through the analysis cache, so
+    every subscriber and any concurrent `/analyze` request share the same
+    pipeline run, and the result is pushed as a full analysis or as the
+    fields that changed since the previous one.
+    """
+
+    def __init__(self, cache: AnalysisCache, interval_seconds: float, max_concurrent: int):
+        self.cache = cache
+        self.interval_seconds = interval_seconds
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._pending: Set[str] = set()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def watched(self) -> int:
+        return len(self._subscribers)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = [task for task in [self._task, *self._running.values()] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._running.clear()
+
+    async def subscribe(self, subscriber: Subscriber, property_ids: List[str]) -> List[str]:
+        """
+        Watch properties for a subscriber
+
+        Returns:
+            Property ids now being watched by this subscriber
+        """
+        for property_id in property_ids:
+            if property_id in subscriber.property_ids:
+                continue
+            if property_id not in self._subscribers:
+                # Baseline to compare later checks against
+                self._fingerprints[property_id] = await offload(_current_fingerprint, property_id)
+                self._subscribers[property_id] = set()
+            self._subscribers[property_id].add(subscriber)
+            subscriber.property_ids.add(property_id)
+        metrics.set_gauge("watch.properties", len(self._subscribers))
+        return sorted(subscriber.property_ids)
+
+    def unsubscribe(self, subscriber: Subscriber, property_ids: Optional[Iterable[str]] = None) -> None:
+        """Stop watching properties (all of them by default) for a subscriber"""
+        for property_id in list(property_ids if property_ids is not None else subscriber.property_ids):
+            subscriber.property_ids.discard(property_id)
+            watchers = self._subscribers.get(property_id)
+            if watchers is None:
+                continue
+            watchers.discard(subscriber)
+            if not watchers:
+                del self._subscribers[property_id]
+                self._fingerprints.pop(property_id, None)
+        metrics.set_gauge("watch.properties", len(self._subscribers))
+
+    def notify(self, property_ids: Optional[Iterable[str]] = None) -> None:
+        """Check these properties (default: every watched one) for source changes now"""
+        if property_ids is None:
+            self._pending.update(self._subscribers)
+        else:
+            self._pending.update(pid for pid in property_ids if pid in self._subscribers)
+        self._wake.set()
+
+    async def latest_known(self, property_id: str) -> Optional[PropertyAnalysis]:
+        """Cached or stored analysis of a property, without running the pipeline"""
+        entry = self.cache.get_entry(cache_key(property_id))
+        if entry is not None:
+            return entry.analysis
+        if not settings.history_enabled:
+            return None
+        try:
+            stored = await offload(analysis_history.latest, property_id)
+        except Exception:
+            logger.warning("Failed to read analysis history for %s", property_id, exc_info=True)
+            return None
+        return stored[1] if stored is not None else None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                if await offload(reload_catalog):
+                    metrics.increment("watch.catalog_reloads")
+                    # Derived state still refers to the old catalog
+                    prefetcher.invalidate()
+                    invalidate_comparables_cache()
+                    self._pending.update(self._subscribers)
+                await self._check_pending()
+            except Exception:
+                logger.exception("Source change check failed")
+
+    async def _check_pending(self) -> None:
+        pending, self._pending = self._pending, set()
+        for property_id in pending:
+            if property_id not in self._subscribers:
+                continue
+            if property_id in self._running:
+                # Check again once the running re-analysis has finished
+                self._pending.add(property_id)
+                continue
+            fingerprint = await offload(_current_fingerprint, property_id)
+            metrics.increment("watch.checks")
+            if fingerprint == self._fingerprints.get(property_id):
+                continue
+            metrics.increment("watch.changes")
+            task = asyncio.create_task(self._reanalyze(property_id, fingerprint))
+            self._running[property_id] = task
+            task.add_done_callback(lambda _task, pid=property_id: self._finished(pid))
+
+    def _finished(self, property_id: str) -> None:
+        self._running.pop(property_id, None)
+        if property_id in self._pending:
+            self._wake.set()
+
+    async def _analyze_fresh(self, property_id: str) -> PropertyAnalysis:
+        """Analyze from freshly fetched sources, never from a prefetch made before the change"""
+        service = PropertyService()
+        sources = await offload(get_property_data_from_sources, property_id)
+        prepared = await offload(service.prepare_property, sources)
+        return await service.analyze_property(property_id, prepared=prepared)
+
+    async def _reanalyze(self, property_id: str, fingerprint: str) -> None:
+        async with self._semaphore:
+            if property_id not in self._subscribers:
+                return
+            previous = await self.latest_known(property_id)
+            # Also detaches analyses started before the change, so the one
+            # below is computed from the new sources rather than joining them
+            for profile in PIPELINE_PROFILES:
+                self.cache.invalidate(cache_key(property_id, profile))
+            prefetcher.invalidate([property_id])
+            invalidate_comparables_cache([property_id])
+            try:
+                analysis = await self.cache.get_or_compute(
+                    cache_key(property_id),
+                    lambda: self._analyze_fresh(property_id)
+                )
+            except Exception:
+                # Keep the old baseline and retry on the next check
+                metrics.increment("watch.reanalysis_failed")
+                logger.warning("Re-analysis of %s after a source change failed", property_id, exc_info=True)
+                self._pending.add(property_id)
+                return
+            self._fingerprints[property_id] = fingerprint
+            changes = await offload(diff_analyses, previous, analysis) if previous is not None else None
+        for subscriber in list(self._subscribers.get(property_id, ())):
+            subscriber.offer(property_id, analysis, changes)
+        metrics.increment("watch.pushes")
+
+
+source_watcher = SourceWatcher(
+    cache=analysis_cache,
+    interval_seconds=settings.watch_interval_seconds,
+    max_concurrent=settings.watch_max_concurrent_analyses
+)
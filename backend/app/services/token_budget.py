@@ -0,0 +1,178 @@
+"""Prompt token budgeting and context-window sizing per pipeline stage"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.metrics import metrics
+
+# Rough average for English prose with llama-family tokenizers; good enough
+# for budgeting without shipping a tokenizer
+CHARS_PER_TOKEN = 4.0
+
+TRUNCATION_MARKER = " [...]"
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a piece of text"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Shorten text to roughly `max_tokens`, preferring sentence then word boundaries
+
+    Returns an empty string when `max_tokens` is zero or less.
+    """
+    if max_tokens <= 0:
+        return ""
+    max_chars = int(max_tokens * CHARS_PER_TOKEN) - len(TRUNCATION_MARKER)
+    if len(text) <= max_chars + len(TRUNCATION_MARKER):
+        return text
+    if max_chars <= 0:
+        return ""
+    cut = text[:max_chars]
+    sentence_end = max(cut.rfind(". "), cut.rfind(".\n"), cut.rfind("\n\n"))
+    if sentence_end > max_chars // 2:
+        cut = cut[:sentence_end + 1]
+    else:
+        space = cut.rfind(" ")
+        if space > max_chars // 2:
+            cut = cut[:space]
+    return cut.rstrip() + TRUNCATION_MARKER
+
+
+@dataclass
+class BudgetSection:
+    """A prompt section that may be trimmed to fit the budget"""
+
+    name: str
+    text: str
+    # Tokens to keep even when over budget (0 allows dropping the section)
+    min_tokens: int = 0
+
+
+@dataclass
+class BudgetDecision:
+    """What the budget did for one prompt"""
+
+    stage: str
+    budget_tokens: int
+    original_tokens: int
+    prompt_tokens: int
+    num_ctx: int
+    trimmed: Dict[str, int] = field(default_factory=dict)  # section -> tokens removed
+
+    @property
+    def over_budget(self) -> bool:
+        return self.prompt_tokens > self.budget_tokens
+
+
+class TokenBudget:
+    """
+    Fits stage prompts into a token budget and picks `num_ctx` to match
+
+    Sections are trimmed in the order given (least valuable first) until
+    the estimated prompt fits. The context window is the smallest power of
+    two that holds the prompt plus the expected output, so short prompts
+    don't make Ollama allocate a large KV cache.
+    """
+
+    def __init__(
+        self,
+        prompt_budget: int,
+        min_num_ctx: int,
+        max_num_ctx: int,
+        output_reserve: int,
+        stage_budgets: Optional[Dict[str, int]] = None
+    ):
+        self.prompt_budget = prompt_budget
+        self.min_num_ctx = min_num_ctx
+        self.max_num_ctx = max_num_ctx
+        self.output_reserve = output_reserve
+        self.stage_budgets = stage_budgets or {}
+
+    def budget_for(self, stage: str) -> int:
+        """Prompt token budget for a stage"""
+        return self.stage_budgets.get(stage, self.prompt_budget)
+
+    def choose_num_ctx(self, prompt_tokens: int, output_tokens: Optional[int] = None) -> int:
+        """Smallest power-of-two context that fits prompt and output, within limits"""
+        needed = prompt_tokens + (output_tokens if output_tokens is not None else self.output_reserve)
+        num_ctx = self.min_num_ctx
+        while num_ctx < needed and num_ctx < self.max_num_ctx:
+            num_ctx *= 2
+        return min(num_ctx, self.max_num_ctx)
+
+    def fit(
+        self,
+        stage: str,
+        fixed_text: str,
+        sections: List[BudgetSection],
+        output_tokens: Optional[int] = None
+    ) -> Tuple[Dict[str, str], BudgetDecision]:
+        """
+        Trim sections so the whole prompt fits the stage budget
+
+        Args:
+            stage: Pipeline stage name (for per-stage budgets and metrics)
+            fixed_text: Everything in the prompt that must not be trimmed
+            sections: Trimmable sections, least valuable first
+            output_tokens: Expected generation length (default: output reserve)
+
+        Returns:
+            (section name -> fitted text, decision)
+        """
+        budget = self.budget_for(stage)
+        fixed_tokens = estimate_tokens(fixed_text)
+        tokens = {s.name: estimate_tokens(s.text) for s in sections}
+        original = fixed_tokens + sum(tokens.values())
+
+        fitted = {s.name: s.text for s in sections}
+        trimmed: Dict[str, int] = {}
+        overflow = original - budget
+        for section in sections:
+            if overflow <= 0:
+                break
+            keep = max(section.min_tokens, tokens[section.name] - overflow)
+            if keep >= tokens[section.name]:
+                continue
+            fitted[section.name] = truncate_to_tokens(section.text, keep)
+            new_tokens = estimate_tokens(fitted[section.name])
+            trimmed[section.name] = tokens[section.name] - new_tokens
+            overflow -= trimmed[section.name]
+
+        prompt_tokens = fixed_tokens + sum(estimate_tokens(t) for t in fitted.values())
+        decision = BudgetDecision(
+            stage=stage,
+            budget_tokens=budget,
+            original_tokens=original,
+            prompt_tokens=prompt_tokens,
+            num_ctx=self.choose_num_ctx(prompt_tokens, output_tokens),
+            trimmed=trimmed
+        )
+        record_decision(decision)
+        return fitted, decision
+
+
+def record_decision(decision: BudgetDecision) -> None:
+    """Report a budget decision in metrics"""
+    prefix = f"token_budget.{decision.stage}"
+    metrics.observe(f"{prefix}.prompt_tokens", decision.prompt_tokens)
+    metrics.observe(f"{prefix}.num_ctx", decision.num_ctx)
+    if decision.trimmed:
+        metrics.increment(f"{prefix}.trimmed_prompts")
+        metrics.increment(f"{prefix}.trimmed_tokens", sum(decision.trimmed.values()))
+    if decision.over_budget:
+        metrics.increment(f"{prefix}.over_budget")
+
+
+token_budget = TokenBudget(
+    prompt_budget=settings.llm_prompt_token_budget,
+    min_num_ctx=settings.llm_min_num_ctx,
+    max_num_ctx=settings.llm_max_num_ctx,
+    output_reserve=settings.llm_output_token_reserve,
+    stage_budgets=settings.llm_stage_token_budgets
+)
@@ -0,0 +1,118 @@
+"""
+Benchmark: event-loop responsiveness with CPU-bound steps inline vs offloaded
+
+Builds a synthetic shared catalog, then runs concurrent "heavy" requests
+(broad catalog search plus response-model construction, and parsing a
+large structured LLM response) while a probe coroutine measures how late
+the loop wakes it up. The probe stands in for every other in-flight
+request on the worker: with inline execution it waits for whole steps,
+with the thread pool only for GIL switch intervals.
+
+Usage (from backend/):
+    python -m benchmarks.bench_executor --properties 200000 --requests 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import List
+
+from app.data.shared_catalog import SharedCatalog, build_catalog
+from app.models.property import PropertySearchResult
+from app.services.executor import CpuExecutor
+from app.services.llm_service import parse_structured_response
+
+CITIES = ["San Francisco", "Oakland", "Berkeley", "San Jose", "Palo Alto"]
+
+
+def make_properties(n: int):
+    for i in range(n):
+        yield {
+            "id": f"prop_{i:07d}",
+            "address": f"{i % 9000 + 100} Market Street, {CITIES[i % 5]}, CA 94{i % 1000:03d}",
+            "city": CITIES[i % 5],
+            "state": "CA",
+            "zip": f"94{i % 1000:03d}",
+            "latitude": 37.0 + (i % 1000) / 1000,
+            "longitude": -122.0 - (i % 997) / 1000,
+            "image_url": "",
+        }
+
+
+def search_step(catalog: SharedCatalog, query: str) -> int:
+    return len([PropertySearchResult(**prop) for prop in catalog.search_properties(query)])
+
+
+def make_response(items: int) -> str:
+    payload = {"field_analyses": [
+        {"field_name": f"field_{i}", "values": [i, i + 1], "conflicts": True,
+         "recommended_value": i, "confidence": 0.8, "reasoning": "x" * 80}
+        for i in range(items)
+    ]}
+    return "Here is the analysis:\n" + json.dumps(payload) + "\nDone."
+
+
+async def probe(stop: asyncio.Event, interval: float, lags: List[float]) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def run(executor: CpuExecutor, catalog: SharedCatalog, requests: int, response: str) -> dict:
+    lags: List[float] = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stop, 0.002, lags))
+
+    async def heavy(i: int) -> None:
+        await executor.run(search_step, catalog, "market")
+        await executor.run(parse_structured_response, response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(heavy(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe_task
+    executor.shutdown()
+
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "p50": statistics.median(lags) if lags else 0.0,
+        "p99": lags[int(len(lags) * 0.99)] if lags else 0.0,
+        "max": lags[-1] if lags else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--properties", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--response-items", type=int, default=5000, help="Entries in the fake LLM response")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.bin")
+        started = time.perf_counter()
+        build_catalog(path, make_properties(args.properties), lambda _pid: [])
+        print(f"built {args.properties} property catalog in {time.perf_counter() - started:.1f}s")
+        catalog = SharedCatalog(path)
+        response = make_response(args.response_items)
+
+        print(f"{'mode':<8} {'total s':>8} {'probe p50 ms':>13} {'p99 ms':>8} {'max ms':>8}")
+        for mode, workers in (("inline", 0), ("threads", args.workers)):
+            executor = CpuExecutor(workers=workers, heavy_kind="thread", heavy_workers=1)
+            result = asyncio.run(run(executor, catalog, args.requests, response))
+            print(
+                f"{mode:<8} {result['elapsed']:>8.2f} {result['p50']:>13.2f} "
+                f"{result['p99']:>8.2f} {result['max']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: generation throughput as Ollama hosts are added to the pool
+
+Starts in-process fake Ollama servers (one generation at a time each) and
+pushes the same number of concurrent generations through LLMService with
+1..N hosts. Throughput should grow roughly linearly with the host count.
+--kill-one stops one server halfway through the largest run to exercise
+ejection and retry.
+
+    python -m benchmarks.bench_ollama_pool --hosts 4 --requests 40 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from collections import Counter
+from typing import List
+
+from app.services.llm_service import LLMService
+from app.services.metrics import metrics
+from app.services.ollama_pool import OllamaPool
+from benchmarks.fake_ollama import make_server
+
+
+async def run(pool: OllamaPool, requests: int, concurrency: int, kill=None) -> dict:
+    slots = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    async def one(i: int) -> None:
+        nonlocal failed
+        async with slots:
+            if kill is not None and i == requests // 2:
+                kill()
+            try:
+                await LLMService(pool=pool).generate(f"Summarize property {i}")
+            except Exception:
+                failed += 1
+
+    def per_host() -> Counter:
+        return Counter({host.url: metrics.counter(f"ollama_pool.requests.{host.url}") for host in pool.hosts})
+
+    before = per_host()
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    served = per_host()
+    served.subtract(before)
+    return {"elapsed": elapsed, "per_second": requests / elapsed, "served": served, "failed": failed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=4, help="Largest pool size")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per fake generation")
+    parser.add_argument("--base-port", type=int, default=11600)
+    parser.add_argument("--kill-one", action="store_true", help="Stop a host midway through the last run")
+    args = parser.parse_args()
+
+    servers = []
+    for i in range(args.hosts):
+        server = make_server("127.0.0.1", args.base_port + i, args.latency)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    urls: List[str] = [f"http://127.0.0.1:{args.base_port + i}" for i in range(args.hosts)]
+
+    print(f"{'hosts':>5} {'seconds':>8} {'gen/s':>7} {'failed':>6}  distribution")
+    for n in range(1, args.hosts + 1):
+        pool = OllamaPool(urls[:n], affinity=False)
+        kill = None
+        if args.kill_one and n == args.hosts and n > 1:
+            def kill():
+                servers[0].shutdown()
+                servers[0].server_close()
+        result = asyncio.run(run(pool, args.requests, args.concurrency, kill))
+        distribution = " ".join(str(result["served"][url]) for url in urls[:n])
+        print(
+            f"{n:>5} {result['elapsed']:>8.2f} {result['per_second']:>7.1f} "
+            f"{result['failed']:>6}  {distribution}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: end-to-end PropertyService.analyze_property from recorded LLM traffic
+
+Record once against a real (or fake) Ollama, then replay offline:
+
+    LLM_CASSETTE_MODE=record python -m benchmarks.bench_pipeline_replay
+    LLM_CASSETTE_MODE=replay LLM_REPLAY_TIMING=none python -m benchmarks.bench_pipeline_replay --rounds 50
+
+With LLM_REPLAY_TIMING=none the numbers measure only our own work
+(prompt formatting, parsing, model construction, scheduling); --max-ms
+turns the run into a regression check, and --profile writes a cProfile
+dump for snakeviz/pstats.
+"""
+
+import argparse
+import asyncio
+import cProfile
+import statistics
+import sys
+import time
+
+from app.config import settings
+from app.data import iter_properties
+from app.services.property_service import PropertyService
+
+
+async def run(rounds: int, property_ids) -> list:
+    service = PropertyService()
+    latencies = []
+    for _ in range(rounds):
+        for property_id in property_ids:
+            started = time.perf_counter()
+            await service.analyze_property(property_id)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--property", action="append", help="Property id (default: all)")
+    parser.add_argument("--profile", help="Write a cProfile dump to this path")
+    parser.add_argument("--max-ms", type=float, help="Fail if median latency exceeds this")
+    args = parser.parse_args()
+
+    property_ids = args.property or [prop["id"] for prop in iter_properties()]
+    mode = settings.llm_cassette_mode
+    print(f"cassette mode={mode} timing={settings.llm_replay_timing} dir={settings.llm_cassette_dir}")
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    latencies = asyncio.run(run(args.rounds, property_ids))
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        print(f"profile written to {args.profile}")
+
+    latencies.sort()
+    median = statistics.median(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{len(latencies)} analyses: median {median:.1f} ms, p95 {p95:.1f} ms, max {latencies[-1]:.1f} ms")
+
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"REGRESSION: median {median:.1f} ms exceeds {args.max_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Benchmark: latency and throughput of the full vs fast pipeline profiles
+
+Runs the same set of analyses through each profile with a fixed number of
+concurrent requests, against whatever LLM backend is configured: a real
+Ollama, the fake server, or recorded cassettes.
+
+    python -m benchmarks.fake_ollama --port 11500 --latency 0.5 &
+    OLLAMA_HOST=http://127.0.0.1:11500 python -m benchmarks.bench_profiles --concurrency 4
+
+Because Ollama serves one generation per model at a time by default,
+throughput is dominated by the number of LLM calls per analysis; the
+report includes that count alongside the timings.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+from app.data import iter_properties
+from app.services.metrics import metrics
+from app.services.property_service import PIPELINE_PROFILES, PropertyService
+
+
+async def run_profile(profile: str, property_ids: List[str], concurrency: int) -> Dict[str, float]:
+    slots = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(property_id: str) -> None:
+        async with slots:
+            started = time.perf_counter()
+            await PropertyService().analyze_property(property_id, profile=profile)
+            latencies.append(time.perf_counter() - started)
+
+    calls_before = metrics.counter("llm.generations")
+    started = time.perf_counter()
+    await asyncio.gather(*(one(pid) for pid in property_ids))
+    elapsed = time.perf_counter() - started
+    calls = metrics.counter("llm.generations") - calls_before
+
+    latencies.sort()
+    return {
+        "analyses": len(latencies),
+        "median_s": statistics.median(latencies),
+        "p95_s": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "throughput_per_min": len(latencies) / elapsed * 60,
+        "llm_calls_per_analysis": calls / len(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=1, help="Passes over the property set")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--property", action="append", help="Property id (default: all)")
+    parser.add_argument(
+        "--profiles", default=",".join(PIPELINE_PROFILES),
+        help="Comma-separated profiles to run"
+    )
+    args = parser.parse_args()
+
+    property_ids = args.property or [prop["id"] for prop in iter_properties()]
+    property_ids = property_ids * args.rounds
+
+    print(f"{'profile':<8} {'n':>4} {'median s':>9} {'p95 s':>8} {'per min':>8} {'calls':>6}")
+    for profile in args.profiles.split(","):
+        result = asyncio.run(run_profile(profile, property_ids, args.concurrency))
+        print(
+            f"{profile:<8} {result['analyses']:>4} {result['median_s']:>9.2f} "
+            f"{result['p95_s']:>8.2f} {result['throughput_per_min']:>8.1f} "
+            f"{result['llm_calls_per_analysis']:>6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
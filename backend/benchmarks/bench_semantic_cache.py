@@ -0,0 +1,83 @@
+"""
+Benchmark: summary-stage LLM calls saved by the semantic cache
+
+Generates listings where a share of descriptions are near-duplicates of a
+few syndicated templates (with small edits), runs the summary stage for
+each with the cache off and on, and reports generations and wall time.
+Needs an Ollama (or the fake server, whose embeddings are hashed
+bag-of-words) with an embedding model:
+
+    python -m benchmarks.fake_ollama --port 11500 --latency 0.2 &
+    OLLAMA_HOST=http://127.0.0.1:11500 python -m benchmarks.bench_semantic_cache --listings 100
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from app.services.metrics import metrics
+from app.services.property_service import PropertyService
+from app.services.semantic_cache import summary_cache
+
+TEMPLATES = [
+    "Stunning modern condo in the heart of the city. Renovated kitchen with stainless steel appliances. Walking distance to transit and parks.",
+    "Charming Victorian home with original details. Hardwood floors throughout. Large backyard perfect for entertaining.",
+    "Spacious family home near top-rated schools. Open floor plan, two-car garage and a landscaped yard.",
+    "Bright top-floor unit with bay views. In-unit laundry, deeded parking and a shared roof deck.",
+]
+EDITS = ["", " Motivated seller.", " Open house Sunday.", " Priced to sell.", " Must see!"]
+WORDS = "quiet sunny corner lot updated bath skylight patio garden fireplace".split()
+
+
+def make_listings(n: int, duplicate_share: float, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(n):
+        if rng.random() < duplicate_share:
+            description = rng.choice(TEMPLATES) + rng.choice(EDITS)
+        else:
+            description = " ".join(rng.choice(WORDS) for _ in range(25)) + f" Listing {i}."
+        price = rng.randrange(500_000, 3_000_000, 1000)
+        yield [
+            {"source": "Zillow", "price": price, "bedrooms": rng.randint(1, 5), "bathrooms": 2,
+             "square_feet": rng.randint(700, 4000), "year_built": rng.randint(1900, 2020),
+             "property_type": "Residential", "description": description},
+            {"source": "Redfin", "price": price + 10_000, "property_type": "Residential",
+             "description": description},
+        ]
+
+
+async def run(listings, enabled: bool) -> dict:
+    from app.config import settings
+
+    settings.semantic_cache_enabled = enabled
+    service = PropertyService()
+    before = metrics.counter("llm.generations")
+    started = time.perf_counter()
+    for sources in listings:
+        resolution = service._basic_conflict_resolution(sources)
+        await service._generate_unified_summary(resolution, sources, "benchmark listing")
+    return {
+        "seconds": time.perf_counter() - started,
+        "generations": metrics.counter("llm.generations") - before,
+        "hits": metrics.counter("semantic_cache.summary.hits"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listings", type=int, default=100)
+    parser.add_argument("--duplicate-share", type=float, default=0.7)
+    args = parser.parse_args()
+
+    listings = list(make_listings(args.listings, args.duplicate_share))
+    print(f"{'cache':<6} {'seconds':>8} {'generations':>12} {'hits':>5}")
+    for enabled in (False, True):
+        result = asyncio.run(run(listings, enabled))
+        print(f"{'on' if enabled else 'off':<6} {result['seconds']:>8.2f} {result['generations']:>12.0f} "
+              f"{result['hits'] if enabled else 0:>5.0f}")
+    print(f"{len(summary_cache)} cached summaries (threshold {summary_cache.threshold})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Minimal stand-in for an Ollama server
+
+Answers /api/generate with canned, well-formed responses for each pipeline
+stage after a configurable delay, and /api/tags for health checks. Useful
+for recording cassettes, load tests and multi-host experiments without a
+GPU.
+
+Like Ollama with its default OLLAMA_NUM_PARALLEL=1, only `--parallel`
+generations run at once; the rest queue.
+
+Usage (from backend/):
+    python -m benchmarks.fake_ollama --port 11500 --latency 0.5
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESOLUTION = {
+    "field_analyses": [
+        {
+            "field_name": "price",
+            "values": [1250000, 1295000, 1180000],
+            "conflicts": True,
+            "recommended_value": 1295000,
+            "confidence": 0.85,
+            "reasoning": "Most recent listing price"
+        },
+        {
+            "field_name": "bedrooms",
+            "values": [3],
+            "conflicts": False,
+            "recommended_value": 3,
+            "confidence": 0.95,
+            "reasoning": "All sources agree"
+        }
+    ],
+    "missing_fields": ["lot_size"],
+    "conflict_summary": "Price differs across sources",
+    "overall_confidence": 0.8
+}
+
+SUMMARY = {
+    "key_features": ["Renovated kitchen", "Close to transit"],
+    "property_type": "Condo",
+    "condition": "Good",
+    "highlights": ["Central location"],
+    "concerns": ["Price conflict between sources"]
+}
+
+INSIGHTS = [
+    "Verify the listing price with the agent",
+    "Request HOA documents",
+    "Confirm square footage with a professional measurement",
+    "Schedule an inspection"
+]
+
+ANALYSIS = (
+    "The available data is broadly consistent apart from the price.\n\n"
+    "Sources agree on size and layout, which supports the valuation.\n\n"
+    "Obtain the missing lot information before deciding."
+)
+
+
+FAST_REPORT = {
+    **SUMMARY,
+    "analysis": "Data is consistent apart from the price; verify it before deciding.",
+    "insights": INSIGHTS[:3]
+}
+
+
+def canned_response(prompt: str) -> str:
+    """Pick a response shaped like what the pipeline stage expects"""
+    if '"insights"' in prompt:
+        return json.dumps(FAST_REPORT)
+    if "JSON array" in prompt:
+        return json.dumps(INSIGHTS)
+    if "field_analyses" in prompt:
+        return json.dumps(RESOLUTION)
+    if "key_features" in prompt:
+        return json.dumps(SUMMARY)
+    return ANALYSIS
+
+
+def fake_embedding(text: str, dim: int = 64) -> list:
+    """Hashed bag-of-words vector: texts sharing most words come out similar"""
+    vector = [0.0] * dim
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        bucket = int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % dim
+        vector[bucket] += 1.0
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    latency = 0.5
+    slots = threading.Semaphore(1)
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json(200, {"models": [{"name": "fake:latest"}]})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/api/embeddings":
+            self._send_json(200, {"embedding": fake_embedding(payload.get("prompt", ""))})
+            return
+        if self.path != "/api/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        started = time.perf_counter_ns()
+        with self.slots:
+            time.sleep(self.latency)
+        response = canned_response(payload.get("prompt", ""))
+        total = time.perf_counter_ns() - started
+        self._send_json(200, {
+            "model": payload.get("model"),
+            "response": response,
+            "done": True,
+            "total_duration": total,
+            "load_duration": 0,
+            "prompt_eval_count": len(payload.get("prompt", "")) // 4,
+            "prompt_eval_duration": total // 4,
+            "eval_count": len(response) // 4,
+            "eval_duration": total - total // 4,
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host: str, port: int, latency: float, parallel: int = 1) -> ThreadingHTTPServer:
+    """Build a fake server with its own latency and generation slots"""
+    handler = type(
+        "Handler",
+        (FakeOllamaHandler,),
+        {"latency": latency, "slots": threading.Semaphore(parallel)}
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per generation")
+    parser.add_argument("--parallel", type=int, default=1, help="Concurrent generations")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.latency, args.parallel)
+    print(f"Fake Ollama listening on http://{args.host}:{args.port} ({args.latency}s per generation)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
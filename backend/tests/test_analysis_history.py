@@ -0,0 +1,150 @@
+"""Tests for the append-only analysis history and its memory-mapped index"""
+
+import os
+import pytest
+from app.models.property import (
+    ConflictResolution, DataSourceInfo, PropertyAnalysis, PropertySummary
+)
+from app.services.analysis_history import (
+    INDEX_DATA_START, INDEX_ENTRY, AnalysisHistory, diff_analyses, property_key
+)
+
+T0 = 1_700_000_000.0
+
+
+def make_analysis(property_id: str, price: float = 500_000.0, confidence: float = 0.8) -> PropertyAnalysis:
+    return PropertyAnalysis(
+        property_id=property_id,
+        address=f"{property_id} Main Street",
+        data_sources=[DataSourceInfo(source="Zillow", price=price, bedrooms=3)],
+        conflict_resolution=ConflictResolution(
+            field_analyses=[], overall_confidence=confidence, missing_fields=[], conflict_summary=""
+        ),
+        property_summary=PropertySummary(price=price, bedrooms=3),
+        analysis=f"Listed at {price}",
+        confidence_score=confidence
+    )
+
+
+@pytest.fixture
+def history(tmp_path):
+    return AnalysisHistory(str(tmp_path), compact_threshold=1000)
+
+
+def reopen(history: AnalysisHistory) -> AnalysisHistory:
+    return AnalysisHistory(history.directory, compact_threshold=history.compact_threshold)
+
+
+def test_round_trip_after_reopen(history):
+    stored = make_analysis("prop_001")
+    entry = history.append(stored, timestamp=T0)
+
+    reopened = reopen(history)
+    assert len(reopened) == 1
+    latest_entry, latest = reopened.latest("prop_001")
+    assert (latest_entry.offset, latest_entry.timestamp_us) == (entry.offset, entry.timestamp_us)
+    # Stored as float32
+    assert latest_entry.confidence == pytest.approx(entry.confidence)
+    assert latest == stored
+    assert reopened.get("prop_001", entry.timestamp_us)[1] == stored
+
+
+def test_versions_are_ordered_and_unique(history):
+    first = history.append(make_analysis("prop_001", price=1), timestamp=T0)
+    # Same timestamp: bumped by a microsecond rather than overwriting
+    second = history.append(make_analysis("prop_001", price=2), timestamp=T0)
+    assert second.timestamp_us == first.timestamp_us + 1
+    assert history.entries("prop_001") == [first, second]
+    assert history.previous("prop_001", second.timestamp_us) == first
+    assert history.previous("prop_001", first.timestamp_us) is None
+
+
+def test_entries_time_range_and_limit(history):
+    appended = [history.append(make_analysis("prop_001", price=i), timestamp=T0 + i) for i in range(5)]
+    assert history.entries("prop_001", since=T0 + 1, until=T0 + 3) == appended[1:4]
+    assert history.entries("prop_001", limit=2) == appended[-2:]
+    assert history.entries("prop_missing") == []
+
+
+def test_compaction_writes_sorted_index(history):
+    for i in range(4):
+        history.append(make_analysis(f"prop_{i:03d}"), timestamp=T0 + i)
+    history.compact()
+
+    size = os.path.getsize(history.index_path)
+    assert size == INDEX_DATA_START + 4 * INDEX_ENTRY.size
+    reopened = reopen(history)
+    assert len(reopened) == 4
+    keys = [entry.key for entry, _ in reopened.scan()]
+    assert keys == sorted(keys)
+    # Answered from the mapped index, with nothing left in the tail
+    assert reopened._tail_size == 0
+    assert reopened.latest("prop_002")[1].property_id == "prop_002"
+
+
+def test_compaction_keeps_latest_versions(tmp_path):
+    history = AnalysisHistory(str(tmp_path), compact_threshold=3)
+    for version in range(7):
+        for property_id in ("prop_001", "prop_002"):
+            history.append(make_analysis(property_id, price=version), timestamp=T0 + version)
+
+    reopened = reopen(history)
+    for property_id in ("prop_001", "prop_002"):
+        entries = reopened.entries(property_id)
+        assert len(entries) == 7
+        assert reopened.latest(property_id)[1].property_summary.price == 6
+    # Compaction only merges the tail; every version stays readable
+    prices = [analysis.property_summary.price for _, analysis in reopened.scan()]
+    assert sorted(prices) == sorted(list(range(7)) * 2)
+    latest = [analysis.property_summary.price for _, analysis in reopened.scan(latest_only=True)]
+    assert latest == [6, 6]
+
+
+def test_tail_and_index_merge(history):
+    history.append(make_analysis("prop_001", price=1), timestamp=T0)
+    history.compact()
+    history.append(make_analysis("prop_001", price=2), timestamp=T0 + 1)
+
+    reopened = reopen(history)
+    assert [e.timestamp_us for e in reopened.entries("prop_001")] == [
+        int(T0 * 1_000_000), int((T0 + 1) * 1_000_000)
+    ]
+    assert reopened.latest("prop_001")[1].property_summary.price == 2
+
+
+def test_scan_time_range(history):
+    for i in range(3):
+        history.append(make_analysis("prop_001", price=i), timestamp=T0 + i)
+    history.append(make_analysis("prop_002", price=10), timestamp=T0 + 1)
+    scanned = [(a.property_id, a.property_summary.price) for _, a in history.scan(since=T0 + 1, until=T0 + 1)]
+    assert sorted(scanned) == [("prop_001", 1), ("prop_002", 10)]
+
+
+def test_sees_appends_from_another_instance(history):
+    history.append(make_analysis("prop_001", price=1), timestamp=T0)
+    other = reopen(history)
+    other.append(make_analysis("prop_001", price=2), timestamp=T0 + 1)
+    assert history.latest("prop_001")[1].property_summary.price == 2
+
+
+def test_torn_record_is_ignored_and_truncated(history):
+    history.append(make_analysis("prop_001", price=1), timestamp=T0)
+    with open(history.log_path, "ab") as f:
+        f.write(b"\x00" * 10)
+
+    reopened = reopen(history)
+    assert len(reopened) == 1
+    reopened.append(make_analysis("prop_001", price=2), timestamp=T0 + 1)
+    assert [a.property_summary.price for _, a in reopen(history).scan()] == [1, 2]
+
+
+def test_property_key_is_stable():
+    assert property_key("prop_001") == property_key("prop_001")
+    assert property_key("prop_001") != property_key("prop_002")
+
+
+def test_diff_matches_sources_by_name():
+    changes = diff_analyses(make_analysis("prop_001", price=1), make_analysis("prop_001", price=2))
+    paths = {change["path"] for change in changes}
+    assert "data_sources[Zillow].price" in paths
+    assert "property_summary.price" in paths
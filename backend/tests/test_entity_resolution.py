@@ -0,0 +1,140 @@
+"""Tests for address normalization, blocking and match scoring"""
+
+import pytest
+from app.data.entity_resolution import (
+    EntityResolver, NormalizedAddress, blocking_keys, new_property_id, normalize_address, score
+)
+from app.data.mock_properties import PROPERTIES
+
+EXTRA_PROPERTIES = [
+    {"id": "unit_1", "address": "500 Main St Apt 1", "city": "Springfield", "state": "OR", "zip": "97477"},
+    {"id": "unit_2", "address": "500 Main St Apt 2", "city": "Springfield", "state": "OR", "zip": "97477"},
+    {"id": "north_elm", "address": "12 North Elm Avenue", "city": "Portland", "state": "OR", "zip": "97201"},
+]
+
+
+@pytest.fixture
+def resolver():
+    return EntityResolver([dict(p) for p in PROPERTIES] + EXTRA_PROPERTIES)
+
+
+def test_normalize_full_address():
+    assert normalize_address("123 Market Street, San Francisco, CA 94102-1234") == NormalizedAddress(
+        number="123", street=("market",), suffix="st", city="san francisco", state="ca", zip="94102"
+    )
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("123 Market St., SF, California", {"city": "san francisco", "state": "ca", "zip": None}),
+    ("12 N Elm Ave", {"direction": "n", "street": ("elm",), "suffix": "ave"}),
+    ("12 Elm Ave N, Portland, OR", {"direction": "n", "street": ("elm",), "city": "portland", "state": "or"}),
+    ("500 Main St #2", {"unit": "2", "street": ("main",)}),
+    ("500 Main Street Apartment 2B", {"unit": "2b", "suffix": "st"}),
+    ("12B Martin Luther King Jr Blvd", {"number": "12", "street": ("martin", "luther", "king", "jr"), "suffix": "blvd"}),
+    ("Market Street", {"number": None, "street": ("market",)}),
+])
+def test_normalize_variants(text, expected):
+    normalized = normalize_address(text)
+    for name, value in expected.items():
+        assert getattr(normalized, name) == value, name
+
+
+def test_columns_override_parsed_locality():
+    normalized = normalize_address("123 Market St, Oakland, CA 94607", city="SF", state="California", zip_code="94102")
+    assert (normalized.city, normalized.state, normalized.zip) == ("san francisco", "ca", "94102")
+
+
+def test_blocking_keys():
+    address = normalize_address("123 Market St, San Francisco, CA 94102")
+    assert blocking_keys(address) == [("zip", "94102", "123"), ("street", "123", "market")]
+    assert blocking_keys(normalize_address("123 Market St")) == [("street", "123", "market")]
+    # Without a street number nothing can be blocked on
+    assert blocking_keys(normalize_address("Market Street, 94102")) == []
+
+
+def test_score_components():
+    base = normalize_address("123 Market St, San Francisco, CA 94102")
+    assert score(base, base) == pytest.approx(1.0)
+    # Missing locality on one side is neutral-ish, a conflicting zip is not
+    assert score(normalize_address("123 Market St"), base) == pytest.approx(0.9)
+    assert score(normalize_address("123 Market St, 94999"), base) == pytest.approx(0.75)
+    # A unit on one side only is a partial match; two different units never agree
+    with_unit = normalize_address("123 Market St Apt 4, 94102")
+    assert score(with_unit, base) == pytest.approx(0.955)
+    assert score(with_unit, normalize_address("123 Market St Apt 5, 94102")) == pytest.approx(0.85)
+    assert score(normalize_address("123 Market Ave, 94102"), base) < score(normalize_address("123 Market, 94102"), base)
+
+
+@pytest.mark.parametrize("address, property_id", [
+    ("123 Market St", "prop_001"),
+    ("123 MARKET STREET, SAN FRANCISCO, CA 94102", "prop_001"),
+    ("123 Market St., SF, California", "prop_001"),
+    ("123 Market Street Apt 4, San Francisco", "prop_001"),
+    ("123 Market St, San Francisco, CA 94102-1234", "prop_001"),
+    ("456 Oak Ave, Palo Alto CA", "prop_002"),
+    ("654 maple ct berkeley ca 94704", "prop_005"),
+    ("500 Main St #2, Springfield, OR", "unit_2"),
+    ("500 Main St Apt 1, 97477", "unit_1"),
+    ("12 Elm Ave N, Portland, OR", "north_elm"),
+    ("12 N Elm Ave, 97201", "north_elm"),
+])
+def test_links_address_variants(resolver, address, property_id):
+    match = resolver.resolve(address)
+    assert (match.status, match.property_id) == ("linked", property_id)
+    assert match.confidence >= resolver.link_threshold
+
+
+def test_separate_columns(resolver):
+    match = resolver.resolve("321 Elm Dr", city="San Jose", state="CA", zip_code="95112")
+    assert (match.status, match.property_id) == ("linked", "prop_004")
+
+
+@pytest.mark.parametrize("address, status", [
+    # Wrong zip or city: found through the street block, but only a near miss
+    ("123 Market St, 94999", "review"),
+    ("123 Market St, Los Angeles, CA", "review"),
+    # Building address without a unit fits both units equally
+    ("500 Main Street, Springfield OR 97477", "ambiguous"),
+    ("500 Main St Unit 3, Springfield", "ambiguous"),
+    ("999 Nowhere Rd", "unmatched"),
+    ("Market Street", "unmatched"),
+])
+def test_unlinked_outcomes(resolver, address, status):
+    match = resolver.resolve(address)
+    assert match.status == status
+    if status != "review":
+        assert match.property_id is None
+
+
+def test_typo_is_scored_within_zip_block(resolver):
+    match = resolver.resolve("123 Markt St, San Francisco, CA 94102")
+    assert match.property_id == "prop_001"
+    assert match.status in ("linked", "review")
+    assert match.candidates == 1
+    # Without a zip the misspelt first token lands in an empty street block
+    assert resolver.resolve("123 Markt St, San Francisco").status == "unmatched"
+
+
+def test_blocking_limits_candidates(resolver):
+    # Scored against the one property sharing (zip, number) or (number, street)
+    assert resolver.resolve("123 Market St, 94102").candidates == 1
+    assert resolver.resolve("500 Main St, 97477").candidates == 2
+
+
+def test_max_block_size():
+    properties = [{"id": f"p{i}", "address": f"0 Road {i}", "zip": "10001"} for i in range(50)]
+    resolver = EntityResolver(properties, max_block_size=10)
+    assert resolver.resolve("0 Road 7, 10001").candidates == 10
+
+
+def test_properties_added_later_are_found(resolver):
+    assert resolver.resolve("77 Harbor Way, Oakland, CA 94607").status == "unmatched"
+    resolver.add_property({"id": "harbor", "address": "77 Harbor Way", "city": "Oakland", "state": "CA", "zip": "94607"})
+    assert resolver.resolve("77 Harbor Way, 94607").property_id == "harbor"
+
+
+def test_new_property_id_is_stable_across_spellings():
+    a = normalize_address("77 Harbor Way, Oakland, CA 94607")
+    b = normalize_address("77 HARBOR WAY, oakland ca 94607")
+    assert new_property_id(a) == new_property_id(b)
+    assert new_property_id(a) != new_property_id(normalize_address("78 Harbor Way, Oakland, CA 94607"))
@@ -0,0 +1,196 @@
+"""Tests for streaming ingest: normalization, staging, checkpoints and the sorted merge"""
+
+import copy
+import csv
+import json
+import os
+import pytest
+from app.data.ingest import (
+    IngestStats, SortedSourceMerge, ingest_file, iter_staged, normalize_row, sort_staged
+)
+
+BASE_PROPERTIES = {
+    "prop_001": {"id": "prop_001", "address": "123 Market Street", "city": "San Francisco", "state": "CA", "zip": "94102"},
+    "prop_002": {"id": "prop_002", "address": "456 Oak Avenue", "city": "Palo Alto", "state": "CA", "zip": "94301"},
+}
+EXISTING = {
+    "prop_001": [{"source": "Zillow", "price": 1_000_000, "bedrooms": 2}],
+    "prop_002": [],
+}
+FIELDNAMES = ["prop_id", "address", "city", "state", "zip", "source", "list_price", "beds"]
+
+
+def write_export(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def export_rows(count):
+    """Price updates for known properties, plus address-only rows for new streets"""
+    rows = []
+    for i in range(count):
+        if i % 50 == 7:
+            rows.append({"prop_id": "prop_001", "source": "Zillow", "list_price": "not a price"})
+        elif i % 4 == 3:
+            rows.append({
+                "address": f"{i} Harbor Way", "city": "Oakland", "state": "CA", "zip": "94607",
+                "source": "County", "list_price": f"${400_000 + i:,}", "beds": "3"
+            })
+        else:
+            rows.append({
+                "prop_id": "prop_001" if i % 2 else "prop_002",
+                "source": "Redfin" if i % 3 else "Zillow",
+                "list_price": str(900_000 + i), "beds": str(i % 5)
+            })
+    return rows
+
+
+def crash_after(rows):
+    """Progress callback that interrupts the run once `rows` rows were read"""
+    def progress(stats, rate):
+        if stats.rows_read >= rows:
+            raise KeyboardInterrupt
+    return progress
+
+
+class Catalog:
+    """Collects what `ingest_file` would write, as the CLI's build_catalog does"""
+
+    def __init__(self, properties):
+        self.properties = properties
+        self.sources = None
+
+    def merge(self, staged):
+        get_sources = SortedSourceMerge(lambda pid: EXISTING.get(pid, []), staged)
+        self.sources = {pid: get_sources(pid) for pid in sorted(self.properties)}
+
+
+def run_ingest(export_path, checkpoint_path=None, **kwargs):
+    catalog = Catalog(copy.deepcopy(BASE_PROPERTIES))
+    stats = ingest_file(
+        export_path, catalog.properties, catalog.merge, checkpoint_path=checkpoint_path,
+        create_unmatched=True, **kwargs
+    )
+    return stats, catalog
+
+
+def test_normalize_row_aliases_and_types():
+    record = normalize_row(
+        {"Prop ID": " prop_001 ", "List Price": "$1,250,000", "Beds": "3", "sqft": "", "lat": "-37.5"},
+        default_source="Zillow"
+    )
+    assert record == {
+        "property_id": "prop_001", "price": 1_250_000.0, "bedrooms": 3,
+        "square_feet": None, "latitude": -37.5, "source": "Zillow"
+    }
+    assert type(record["bedrooms"]) is int
+
+
+@pytest.mark.parametrize("row, message", [
+    ({"source": "Zillow"}, "missing property_id and address"),
+    ({"prop_id": "p"}, "missing source"),
+    ({"prop_id": "p", "source": "Zillow", "beds": "2.5"}, "not an integer"),
+    ({"prop_id": "p", "source": "Zillow", "list_price": "-1"}, "negative"),
+    ({"prop_id": "p", "source": "Zillow", "sqft": "big"}, "not a number"),
+])
+def test_normalize_row_rejects(row, message):
+    with pytest.raises(ValueError, match=message):
+        normalize_row(row, default_source=None)
+
+
+def test_public_records_value_used_as_price():
+    record = normalize_row({"address": "1 Main St", "assessed_value": "500000"}, default_source="County")
+    assert record["price"] == 500_000.0
+    assert record["assessed_value"] == 500_000.0
+
+
+def test_ingest_merges_and_links(tmp_path):
+    export = tmp_path / "export.csv"
+    write_export(export, export_rows(40))
+    stats, catalog = run_ingest(str(export), chunk_size=8)
+
+    assert stats.rows_read == 40
+    assert stats.rows_rejected == 1
+    assert stats.rows_created == 9
+    assert stats.rows_upserted == 39
+    # Last row per (property, source) wins, existing sources from other feeds are kept
+    assert catalog.sources["prop_001"] == [
+        {"source": "Zillow", "price": 900_033.0, "bedrooms": 3},
+        {"source": "Redfin", "price": 900_037.0, "bedrooms": 2},
+    ]
+    created = [pid for pid in catalog.properties if pid not in BASE_PROPERTIES]
+    assert len(created) == 9
+    for pid in created:
+        assert catalog.properties[pid]["city"] == "Oakland"
+        assert [s["source"] for s in catalog.sources[pid]] == ["County"]
+
+
+def test_resume_after_partial_ingest(tmp_path):
+    export = tmp_path / "export.csv"
+    write_export(export, export_rows(200))
+    _, expected = run_ingest(str(export), chunk_size=10)
+
+    checkpoint = str(tmp_path / "ingest.checkpoint")
+    # Dies between checkpoints, with records staged past the last one
+    with pytest.raises(KeyboardInterrupt):
+        run_ingest(str(export), checkpoint, chunk_size=10, checkpoint_every=50, progress=crash_after(130))
+    with open(checkpoint, encoding="utf-8") as f:
+        saved = IngestStats(**json.load(f))
+    assert saved.rows_read == 100
+    assert os.path.getsize(f"{checkpoint}.staged") > saved.staged_bytes
+
+    stats, resumed = run_ingest(str(export), checkpoint, chunk_size=10, checkpoint_every=50)
+    assert stats.rows_read == 200
+    assert resumed.sources == expected.sources
+    # Properties created before the crash are restored from the staging file
+    assert resumed.properties == expected.properties
+    assert not os.path.exists(checkpoint)
+    assert not os.path.exists(f"{checkpoint}.staged")
+
+
+def test_checkpoint_for_another_file_is_ignored(tmp_path):
+    first, second = tmp_path / "a.csv", tmp_path / "b.csv"
+    write_export(first, export_rows(20))
+    write_export(second, export_rows(20))
+    checkpoint = str(tmp_path / "ingest.checkpoint")
+    with pytest.raises(KeyboardInterrupt):
+        run_ingest(str(first), checkpoint, chunk_size=5, checkpoint_every=5, progress=crash_after(10))
+    stats, _ = run_ingest(str(second), checkpoint, chunk_size=5)
+    assert stats.rows_read == 20
+
+
+def write_staged(path, entries):
+    with open(path, "wb") as f:
+        for property_id, record in entries:
+            f.write(json.dumps([property_id, record, {}]).encode("utf-8") + b"\n")
+
+
+def test_sort_staged_spills_and_keeps_input_order(tmp_path):
+    entries = [(f"p{(i * 7) % 13:02d}", {"source": "S", "n": i}) for i in range(100)]
+    path = str(tmp_path / "staged")
+    write_staged(path, entries)
+    assert [pid for pid, _, _ in iter_staged(path)] == [pid for pid, _ in entries]
+
+    in_memory = list(sort_staged(path, run_size=1000))
+    spilled = list(sort_staged(path, run_size=9))
+    assert spilled == in_memory
+    assert in_memory == sorted(entries, key=lambda entry: entry[0])  # sort is stable
+    assert sorted(os.listdir(tmp_path)) == ["staged"]
+
+
+def test_sorted_merge_upserts_by_source():
+    existing = {
+        "a": [{"source": "Zillow", "price": 1}, {"source": "Redfin", "price": 2}],
+        "b": [{"source": "Zillow", "price": 3}],
+    }
+    staged = [("a", {"source": "Redfin", "price": 20}), ("a", {"source": "County", "price": 30}),
+              ("c", {"source": "Zillow", "price": 40})]
+    merge = SortedSourceMerge(lambda pid: existing.get(pid, []), staged)
+    assert merge("a") == [{"source": "Zillow", "price": 1}, {"source": "Redfin", "price": 20},
+                          {"source": "County", "price": 30}]
+    assert merge("b") == [{"source": "Zillow", "price": 3}]
+    assert merge("c") == [{"source": "Zillow", "price": 40}]
+    # Existing records are copied, not modified
+    assert existing["a"][1]["price"] == 2
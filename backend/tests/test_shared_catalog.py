@@ -0,0 +1,134 @@
+"""Tests for the memory-mapped columnar property catalog"""
+
+import json
+import struct
+import pytest
+from app.data import mock_properties, mock_sources
+from app.data.shared_catalog import MAGIC, SharedCatalog, _SpooledColumn, build_catalog
+
+
+def mock_source_dicts(property_id):
+    return [dict(record) for record in mock_sources.get_property_data_from_sources(property_id)]
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    build_catalog(path, mock_properties.PROPERTIES, mock_source_dicts)
+    return path
+
+
+@pytest.fixture
+def catalog(catalog_path):
+    return SharedCatalog(catalog_path)
+
+
+def test_properties_round_trip(catalog):
+    assert catalog.property_count == len(mock_properties.PROPERTIES)
+    for prop in mock_properties.PROPERTIES:
+        stored = catalog.get_property_by_id(prop["id"])
+        for field in ("id", "address", "city", "state", "zip", "latitude", "longitude"):
+            assert stored[field] == prop[field]
+    assert [p["id"] for p in catalog.iter_properties()] == sorted(p["id"] for p in mock_properties.PROPERTIES)
+    assert catalog.get_property_by_id("prop_missing") is None
+
+
+def test_source_records_read_back_exactly(catalog):
+    for property_id in mock_sources.MOCK_PROPERTY_IDS:
+        expected = mock_source_dicts(property_id)
+        stored = [record.to_dict() for record in catalog.get_property_data_from_sources(property_id)]
+        assert stored == expected
+        # Same key order and numeric types, not just equal values
+        for before, after in zip(expected, stored):
+            assert list(before) == list(after)
+            assert [type(v) for v in before.values()] == [type(v) for v in after.values()]
+    assert catalog.get_property_data_from_sources("prop_missing") == []
+
+
+def test_fields_without_a_column_are_kept(tmp_path):
+    path = str(tmp_path / "catalog.bin")
+    records = {
+        "p1": [
+            {"source": "Redfin", "price": 100, "days_on_market": 12, "tags": ["corner"]},
+            {"source": "Zillow", "price": 99.5, "bedrooms": "3", "description": ""},
+        ]
+    }
+    build_catalog(path, [{"id": "p1", "address": "1 A St"}], lambda pid: records[pid])
+
+    stored = [record.to_dict() for record in SharedCatalog(path).get_property_data_from_sources("p1")]
+    assert stored == records["p1"]
+    assert type(stored[0]["price"]) is int
+    assert type(stored[1]["price"]) is float
+
+
+def test_search(catalog):
+    prop = mock_properties.PROPERTIES[0]
+    results = catalog.search_properties(prop["city"].upper())
+    assert prop["id"] in [r["id"] for r in results]
+    assert [r["id"] for r in catalog.search_properties(prop["zip"])] == [
+        p["id"] for p in sorted(mock_properties.PROPERTIES, key=lambda p: p["id"]) if p["zip"] == prop["zip"]
+    ]
+    assert catalog.search_properties("no such street anywhere") == []
+
+
+def test_spilled_columns_match(tmp_path, monkeypatch):
+    # Force several buffer flushes per column
+    monkeypatch.setattr(_SpooledColumn, "BUFFER_ROWS", 7)
+    properties = [
+        {"id": f"p{i:04d}", "address": f"{i} Elm St", "city": "Springfield", "zip": f"{i % 50:05d}",
+         "latitude": 40 + i / 1000, "longitude": None if i % 3 else -75.0}
+        for i in range(100)
+    ]
+
+    def sources(pid):
+        i = int(pid[1:])
+        return [{"source": "Zillow", "price": i * 1000, "bedrooms": i % 5 or None}] * (i % 3)
+
+    path = str(tmp_path / "catalog.bin")
+    assert build_catalog(path, reversed(properties), sources) == 100
+    catalog = SharedCatalog(path)
+    assert catalog.source_count == sum(i % 3 for i in range(100))
+    for prop in properties:
+        stored = catalog.get_property_by_id(prop["id"])
+        assert (stored["address"], stored["latitude"], stored["longitude"]) == (
+            prop["address"], prop["latitude"], prop["longitude"]
+        )
+        assert [r.to_dict() for r in catalog.get_property_data_from_sources(prop["id"])] == sources(prop["id"])
+
+
+def test_sources_requested_in_id_order(tmp_path):
+    requested = []
+    properties = [{"id": pid, "address": pid} for pid in ("c", "a", "b")]
+    build_catalog(str(tmp_path / "catalog.bin"), properties, lambda pid: requested.append(pid) or [])
+    assert requested == ["a", "b", "c"]
+
+
+def test_rejects_other_format_versions(catalog_path, tmp_path):
+    with open(catalog_path, "rb") as f:
+        data = f.read()
+    (length,) = struct.unpack_from("<Q", data, len(MAGIC))
+    start = len(MAGIC) + 8
+    header = json.loads(data[start:start + length])
+    header["version"] = 1
+    # Same length, so column offsets stay valid
+    encoded = json.dumps(header).encode("utf-8").ljust(length)
+    old_path = tmp_path / "old.bin"
+    old_path.write_bytes(data[:start] + encoded + data[start + length:])
+    with pytest.raises(ValueError, match="rebuild"):
+        SharedCatalog(str(old_path))
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not_a_catalog.bin"
+    path.write_bytes(b"hello world, not a catalog")
+    with pytest.raises(ValueError):
+        SharedCatalog(str(path))
+
+
+def test_is_stale_after_rebuild(catalog_path, catalog):
+    assert not catalog.is_stale()
+    build_catalog(catalog_path, mock_properties.PROPERTIES[:2], mock_source_dicts)
+    assert catalog.is_stale()
+    # The old mapping keeps serving its own snapshot
+    assert catalog.property_count == len(mock_properties.PROPERTIES)
+    assert SharedCatalog(catalog_path).property_count == 2
@@ -8,6 +8,8 @@ export interface PropertySearchResult {
   city: string
   state: string
   zip: string
+  latitude?: number
+  longitude?: number
   image_url?: string
 }
 
@@ -64,6 +66,10 @@ export interface PropertyAnalysis {
   analysis: string
   insights: string[]
   confidence_score: number
+  profile: 'full' | 'fast'
+  degraded_stages: Record<string, 'deadline' | 'timeout' | 'error'>
+  difficulty: number | null
+  stage_models: Record<string, string>
 }
 
 export interface ApiError {